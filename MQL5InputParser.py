@@ -1,146 +1,275 @@
+import hashlib
+import os
 import re
+import threading
+from collections import namedtuple
 from typing import Dict, List, Any
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Parsed contents of one source file: its enums, and its input declarations and
+# #include directives in source order
+FileParse = namedtuple('FileParse', ['digest', 'enums', 'items'])
+
+INCLUDE_PATTERN = re.compile(r'#\s*include\s*([<"])([^>"]+)[>"]')
+TOKEN_PATTERN = re.compile(r"""
+    (?P<skip>\s+|//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*"?)
+  | (?P<char>'(?:\\.|[^'\\\n])*'?)
+  | (?P<directive>\#[^\n]*)
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<number>0[xX][0-9a-fA-F]+|\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+)
+  | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Per-file parse cache shared by every parser: path -> ((mtime_ns, size), FileParse)
+_file_cache = {}
+_cache_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def tokenize(content):
+    """Yield (kind, text, start, end) for each token of MQL5 source in one linear scan.
+
+    Comments and whitespace are skipped, string and char literals are single
+    tokens (so '//' inside a string is not a comment) and preprocessor lines
+    come through whole as 'directive' tokens.
+    """
+    for match in TOKEN_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind != 'skip':
+            yield kind, match.group(), match.start(), match.end()
+
+
+def _read_expression(content, tokens):
+    """Source text of an initializer up to the next top-level ',' or ';' (and that terminator)"""
+    depth = 0
+    first = last = None
+    for kind, text, start, end in tokens:
+        if kind == 'punct' and text in '([{':
+            depth += 1
+        elif kind == 'punct' and text in ')]}':
+            depth -= 1
+        elif depth <= 0 and text in (',', ';'):
+            return (content[first:last] if first is not None else ''), text
+        if first is None:
+            first = start
+        last = end
+    return (content[first:last] if first is not None else ''), ';'
+
+
+def _enum_value(expression, values):
+    """Value of an explicit enum initializer: an integer literal or an earlier member"""
+    if not expression:
+        return None
+    if expression in values:
+        return values[expression]
+    for base in (10, 0):
+        try:
+            return int(expression, base)
+        except ValueError:
+            pass
+    return None
+
+
+def invalidate_cache(path=None):
+    """Forget the cached parse of one file, or of every file"""
+    with _cache_lock:
+        if path is None:
+            _file_cache.clear()
+        else:
+            _file_cache.pop(os.path.normcase(os.path.abspath(path)), None)
+
+
+def find_include_dir(mql5_file_path):
+    """The MQL5/Include directory of the terminal data folder holding the EA, if any"""
+    directory = os.path.dirname(os.path.abspath(mql5_file_path))
+    while True:
+        if os.path.basename(directory).lower() == 'mql5':
+            return os.path.join(directory, 'Include')
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
 class MQL5InputParser:
     """Parse MQL5 files to extract input variables and their properties"""
     
-    def __init__(self, mql5_file_path: str):
+    def __init__(self, mql5_file_path: str, include_dir: str = None):
         self.mql5_file_path = mql5_file_path
+        self.include_dir = include_dir or find_include_dir(mql5_file_path)
         self.inputs = []
         self.enums = {}  # Store parsed enums
+        self.files = []  # Every file in the include graph, EA first
         
     def parse_inputs(self) -> List[Dict[str, Any]]:
-        """Parse the MQL5 file and extract all input variables"""
+        """Parse the MQL5 file and its #includes and extract all input variables.
+
+        Each file in the include graph is parsed once and memoized on its mtime,
+        size and content hash, so re-parsing an unchanged EA only costs a stat()
+        per file.
+        """
         if not os.path.exists(self.mql5_file_path):
             raise FileNotFoundError(f"MQL5 file not found: {self.mql5_file_path}")
-            
-        with open(self.mql5_file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            
-        # Remove comments to avoid parsing commented input lines
-        content = self._remove_comments(content)
-        
-        # First, parse all enum declarations
-        self.enums = self._parse_enums(content)
-        
-        # Find all input declarations
-        input_pattern = r'input\s+(\w+)\s+(\w+)\s*=\s*([^;]+);'
-        matches = re.finditer(input_pattern, content, re.MULTILINE)
-        
-        inputs = []
-        for match in matches:
-            data_type = match.group(1).strip()
-            var_name = match.group(2).strip()
-            default_value = match.group(3).strip()
-            
-            # Parse the default value and determine HTML input type
-            parsed_input = self._parse_input_variable(data_type, var_name, default_value)
-            inputs.append(parsed_input)
-            
-        self.inputs = inputs
-        return inputs
-    
-    def _parse_enums(self, content: str) -> Dict[str, Dict[str, int]]:
-        """Parse enum declarations from MQL5 code"""
+
+        declarations = []
         enums = {}
-        
-        # Find enum declarations with more flexible pattern
-        # Handle both: enum name { ... }; and enum name\n{\n...\n};
-        enum_pattern = r'enum\s+(\w+)\s*\{([^}]+)\}'
-        enum_matches = re.finditer(enum_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for enum_match in enum_matches:
-            enum_name = enum_match.group(1)
-            enum_body = enum_match.group(2)
-            
-            print(f"Found enum: {enum_name}")  # Debug print
-            print(f"Enum body: {enum_body}")   # Debug print
-            
-            # Parse enum values more robustly
-            enum_values = {}
-            value_counter = 0
-            
-            # Clean up the enum body - remove comments and extra whitespace
-            lines = enum_body.split('\n')
-            clean_lines = []
-            for line in lines:
-                # Remove inline comments
-                if '//' in line:
-                    line = line[:line.index('//')]
-                clean_lines.append(line.strip())
-            
-            clean_body = ' '.join(clean_lines)
-            
-            # Split by comma and process each entry
-            entries = [entry.strip() for entry in clean_body.split(',') if entry.strip()]
-            
-            for entry in entries:
-                entry = entry.strip()
-                if not entry:
-                    continue
-                    
-                # Check if there's an explicit value assignment
-                if '=' in entry:
-                    parts = entry.split('=')
-                    enum_key = parts[0].strip()
-                    try:
-                        enum_value = int(parts[1].strip())
-                        value_counter = enum_value
-                        enum_values[enum_key] = value_counter
-                    except ValueError:
-                        # If it's not a number, use auto-increment
-                        enum_values[enum_key] = value_counter
-                else:
-                    # No explicit value, use auto-increment
-                    enum_key = entry.strip()
-                    if enum_key:  # Make sure it's not empty
-                        enum_values[enum_key] = value_counter
-                
-                value_counter += 1
-            
-            if enum_values:  # Only add if we found values
-                enums[enum_name] = enum_values
-                print(f"Parsed enum {enum_name}: {enum_values}")  # Debug print
-        
-        print(f"Total enums found: {enums}")  # Debug print
-        return enums
-        
-    def parse_inputs(self) -> List[Dict[str, Any]]:
-        """Parse the MQL5 file and extract all input variables"""
-        if not os.path.exists(self.mql5_file_path):
-            raise FileNotFoundError(f"MQL5 file not found: {self.mql5_file_path}")
-            
-        with open(self.mql5_file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            
-        # Remove comments to avoid parsing commented input lines
-        content = self._remove_comments(content)
-        
-        # Find all input declarations
-        input_pattern = r'input\s+(\w+)\s+(\w+)\s*=\s*([^;]+);'
-        matches = re.finditer(input_pattern, content, re.MULTILINE)
-        
+        files = []
+        self._collect(os.path.abspath(self.mql5_file_path), declarations, enums, files, set())
+        self.enums = enums
+        self.files = files
+
         inputs = []
-        for match in matches:
-            data_type = match.group(1).strip()
-            var_name = match.group(2).strip()
-            default_value = match.group(3).strip()
-            
+        for data_type, var_name, default_value, group in declarations:
             # Parse the default value and determine HTML input type
             parsed_input = self._parse_input_variable(data_type, var_name, default_value)
+            if group:
+                parsed_input['group'] = group
             inputs.append(parsed_input)
             
         self.inputs = inputs
         return inputs
-    
-    def _remove_comments(self, content: str) -> str:
-        """Remove single-line and multi-line comments from MQL5 code"""
-        # Remove multi-line comments /* ... */
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-        # Remove single-line comments //
-        content = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-        return content
-    
+
+    def _collect(self, path, declarations, enums, files, seen):
+        """Walk the include graph depth-first, gathering enums and input declarations in source order"""
+        key = os.path.normcase(path)
+        if key in seen:
+            return
+        seen.add(key)
+        files.append(path)
+        parsed = self._load_file(path)
+        enums.update(parsed.enums)
+        for item in parsed.items:
+            if item[0] == 'include':
+                include_path = self._resolve_include(path, item[1], item[2])
+                if include_path:
+                    self._collect(include_path, declarations, enums, files, seen)
+            else:
+                declarations.append(item[1:])
+
+    def _resolve_include(self, including_file, name, system):
+        """Path of an #include: "file" is relative to the including file, <file> to MQL5/Include"""
+        name = name.replace('\\', os.sep)
+        candidates = []
+        if not system:
+            candidates.append(os.path.join(os.path.dirname(including_file), name))
+        if self.include_dir:
+            candidates.append(os.path.join(self.include_dir, name))
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return os.path.abspath(candidate)
+        return None
+
+    def _load_file(self, path):
+        """Cached parse of one file, re-parsed only when its content actually changed"""
+        key = os.path.normcase(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            cached = _file_cache.get(key)
+        if cached and cached[0] == signature:
+            cache_stats['hits'] += 1
+            return cached[1]
+
+        with open(path, 'rb') as file:
+            raw = file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cached and cached[1].digest == digest:
+            # Touched but unchanged
+            parsed = cached[1]
+            cache_stats['hits'] += 1
+        else:
+            parsed = self._parse_file(raw.decode('utf-8', errors='replace'), digest)
+            cache_stats['misses'] += 1
+        with _cache_lock:
+            _file_cache[key] = (signature, parsed)
+        return parsed
+
+    def _parse_file(self, content: str, digest: str) -> FileParse:
+        """Parse one file's enums, input declarations and #include directives in a single scan"""
+        enums = {}
+        items = []
+        group = None
+        tokens = tokenize(content)
+
+        for kind, text, start, end in tokens:
+            if kind == 'directive':
+                include = INCLUDE_PATTERN.match(text)
+                if include:
+                    items.append(('include', include.group(2).strip(), include.group(1) == '<'))
+            elif kind == 'ident' and text == 'enum':
+                name, values = self._parse_enum(tokens)
+                if name and values:
+                    enums[name] = values
+            elif kind == 'ident' and text in ('input', 'sinput'):
+                group = self._parse_declaration(content, tokens, items, group)
+        return FileParse(digest, enums, items)
+
+    def _parse_enum(self, tokens):
+        """Parse 'Name { A, B = 5, C }' after the enum keyword; returns (name, {member: value})"""
+        name = None
+        for kind, text, _, _ in tokens:
+            if text == '{':
+                break
+            if kind == 'ident':
+                name = text
+            elif text == ';':
+                # Forward declaration
+                return name, {}
+
+        values = {}
+        next_value = 0
+        member = None
+        expression = []
+        for kind, text, _, _ in tokens:
+            if text in (',', '}'):
+                if member:
+                    value = _enum_value(''.join(expression), values)
+                    if value is not None:
+                        next_value = value
+                    values[member] = next_value
+                    next_value += 1
+                member = None
+                expression = []
+                if text == '}':
+                    break
+            elif member is None and kind == 'ident':
+                member = text
+            elif text != '=':
+                expression.append(text)
+        return name, values
+
+    def _parse_declaration(self, content, tokens, items, group):
+        """Parse the rest of an input/sinput statement, including 'input group' and comma lists.
+
+        Appends ('input', type, name, default, group) items and returns the current group.
+        """
+        idents = []
+        data_type = None
+        for kind, text, start, end in tokens:
+            if kind == 'string' and idents == ['group']:
+                # 'input group "Name"' has no terminating semicolon
+                return text[1:-1]
+            elif kind == 'ident':
+                idents.append(text)
+            elif text in ('=', ',', ';'):
+                if len(idents) >= 2 or (data_type and idents):
+                    # 'const int Name': the type is the ident before the name
+                    data_type = idents[-2] if len(idents) >= 2 else data_type
+                    default_value = ''
+                    if text == '=':
+                        default_value, text = _read_expression(content, tokens)
+                    items.append(('input', data_type, idents[-1], default_value, group))
+                idents = []
+                if text == ';':
+                    break
+        return group
+
     def _parse_input_variable(self, data_type: str, var_name: str, default_value: str) -> Dict[str, Any]:
         """Parse individual input variable and determine HTML properties"""
         
@@ -195,6 +324,14 @@ class MQL5InputParser:
             # Parse MQL5 datetime format D'2024.02.03 13:01:00'
             html_input['datetime_value'] = self._parse_mql5_datetime(default_value)
             
+        elif data_type in self.enums:
+            # Enum declared in the EA or one of its includes
+            enum_values = self.enums[data_type]
+            html_input['html_type'] = 'select'
+            html_input['is_enum'] = True
+            html_input['enum_values'] = enum_values
+            html_input['enum_numeric_value'] = enum_values.get(default_value, 0)
+            
         # Special handling for time-related variables (convert to time inputs)
         if 'time' in var_name.lower() and data_type.lower() in ['int', 'long', 'uint', 'ulong']:
             html_input['html_type'] = 'time_timestamp'
@@ -230,7 +367,7 @@ class MQL5InputParser:
         return label
     
     def get_grouped_inputs(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Group inputs by common prefixes (e.g., xau, xag, dxau)"""
+        """Group inputs by their 'input group', else by common prefixes (e.g., xau, xag, dxau)"""
         if not self.inputs:
             self.parse_inputs()
             
@@ -241,6 +378,10 @@ class MQL5InputParser:
         prefixes = ['xau', 'xag', 'dxau', 'prev', 'double']
         
         for input_var in self.inputs:
+            if input_var.get('group'):
+                groups.setdefault(input_var['group'], []).append(input_var)
+                continue
+
             var_name = input_var['name'].lower()
             grouped = False
             
@@ -259,4 +400,103 @@ class MQL5InputParser:
         if ungrouped:
             groups['General'] = ungrouped
             
-        return groups
\ No newline at end of file
+        return groups
+
+
+class _SourceChangeHandler(FileSystemEventHandler):
+    # Opening or reading a file (which parsing itself does) is not a change
+    CHANGE_EVENTS = ('created', 'modified', 'moved', 'deleted', 'closed')
+
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in self.CHANGE_EVENTS:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path:
+                self.watcher.file_changed(path)
+
+
+class MQL5InputWatcher:
+    """Watch an EA and its includes, invalidating only the files that change.
+
+    on_change() is called once per burst of changes (editors often write a file
+    several times per save). Uses filesystem notifications when watchdog is
+    installed and polls file signatures every poll_interval seconds otherwise.
+    """
+
+    def __init__(self, on_change, debounce=0.3, poll_interval=2.0):
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._tracked = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._observer = None
+        self._stopped = threading.Event()
+
+    def watch(self, files):
+        """Replace the set of watched files (call again when the include graph changes)"""
+        tracked = {}
+        for path in files:
+            try:
+                stat = os.stat(path)
+                tracked[os.path.normcase(os.path.abspath(path))] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                tracked[os.path.normcase(os.path.abspath(path))] = None
+        with self._lock:
+            self._tracked = tracked
+        if self._observer:
+            self._observer.unschedule_all()
+            self._schedule()
+
+    def start(self):
+        if Observer is not None:
+            self._observer = Observer()
+            self._schedule()
+            self._observer.start()
+        else:
+            threading.Thread(target=self._poll, name='mql5-input-poller', daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+
+    def file_changed(self, path):
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            if key not in self._tracked:
+                return
+            invalidate_cache(key)
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.on_change)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _schedule(self):
+        with self._lock:
+            directories = {os.path.dirname(path) for path in self._tracked}
+        for directory in directories:
+            if os.path.isdir(directory):
+                self._observer.schedule(_SourceChangeHandler(self), directory, recursive=False)
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            with self._lock:
+                tracked = dict(self._tracked)
+            for path, signature in tracked.items():
+                try:
+                    stat = os.stat(path)
+                    current = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    current = None
+                if current != signature:
+                    with self._lock:
+                        if path in self._tracked:
+                            self._tracked[path] = current
+                    self.file_changed(path)
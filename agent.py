@@ -0,0 +1,122 @@
+"""Worker agent: runs backtests on this host for a coordinator on another.
+
+    python agent.py --coordinator http://coordinator:5000 [--port 5101] [--url http://this-host:5101] [--id NAME]
+
+The terminal is configured with the usual MT5_* environment variables; with
+MT5_WORKERS_DIR set the agent offers one slot per terminal install there.
+The coordinator is the main app started with MT5_COORDINATOR=1.
+"""
+import argparse
+import base64
+import os
+import socket
+import threading
+import time
+import uuid
+
+from flask import Flask, jsonify, request
+
+import main
+from coordinator import post_json
+
+app = Flask(__name__)
+agent_id = None
+agent_url = None
+coordinator_url = None
+instance = uuid.uuid4().hex
+capacity = 1
+slots = None
+running = {}
+running_lock = threading.Lock()
+
+
+def run_task(task):
+    """Run one dispatched backtest and post its result (with the compressed report) to the coordinator"""
+    params = dict(task['params'])
+    run_backtest = None if task.get('cache', True) else main.run_single_backtest
+    with slots:
+        try:
+            if main.worker_pool:
+                result = main.worker_pool.run_single(task['report_name'], task['from_date'], task['to_date'],
+                                                     run_backtest=run_backtest, **params)
+            elif run_backtest:
+                result = run_backtest(task['report_name'], task['from_date'], task['to_date'], **params)
+            else:
+                result = main.run_cached_backtest(task['report_name'], task['from_date'], task['to_date'], **params)
+        except Exception as e:
+            result = {'success': False, 'error': f'Agent {agent_id} failed: {str(e)}',
+                      'period': f"{task['from_date']} to {task['to_date']}"}
+
+    report_path = result.get('report_path')
+    if report_path and report_path.endswith('.gz') and os.path.exists(report_path):
+        with open(report_path, 'rb') as f:
+            result['report_gz'] = base64.b64encode(f.read()).decode('ascii')
+
+    payload = {'task_id': task['task_id'], 'result': result}
+    for attempt in range(5):
+        try:
+            post_json(f"{coordinator_url}/api/agents/{agent_id}/results", payload, timeout=60)
+            break
+        except (OSError, ValueError) as e:
+            print(f"Could not post result of {task['task_id']}: {e}")
+            time.sleep(2 ** attempt)
+    with running_lock:
+        running.pop(task['task_id'], None)
+
+
+@app.route('/tasks', methods=['POST'])
+def accept_task():
+    task = request.get_json(force=True)
+    with running_lock:
+        running[task['task_id']] = task
+    threading.Thread(target=run_task, args=(task,), daemon=True).start()
+    return jsonify({'accepted': task['task_id']}), 202
+
+
+@app.route('/health')
+def health():
+    with running_lock:
+        tasks = list(running)
+    return jsonify({'agent_id': agent_id, 'instance': instance, 'capacity': capacity, 'running': tasks})
+
+
+def send_heartbeats(interval):
+    """Tell the coordinator this agent is alive, where it listens and how many backtests it can run"""
+    while True:
+        try:
+            post_json(f"{coordinator_url}/api/agents/heartbeat",
+                      {'agent_id': agent_id, 'url': agent_url, 'capacity': capacity, 'instance': instance},
+                      timeout=10)
+        except (OSError, ValueError) as e:
+            print(f"Heartbeat to {coordinator_url} failed: {e}")
+        time.sleep(interval)
+
+
+def main_cli(argv=None):
+    global agent_id, agent_url, coordinator_url, capacity, slots
+    parser = argparse.ArgumentParser(description="Run backtests for a remote coordinator")
+    parser.add_argument('--coordinator', required=True, help="base URL of the coordinator app")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5101)
+    parser.add_argument('--url', help="URL the coordinator reaches this agent at (default http://<hostname>:<port>)")
+    parser.add_argument('--id', help="agent name (default: hostname:port)")
+    parser.add_argument('--heartbeat', type=float, default=5.0, help="seconds between heartbeats")
+    args = parser.parse_args(argv)
+
+    coordinator_url = args.coordinator.rstrip('/')
+    agent_id = args.id or f"{socket.gethostname()}:{args.port}"
+    agent_url = args.url or f"http://{socket.gethostname()}:{args.port}"
+
+    main.load_result_cache()
+    main.load_report_archive()
+    main.load_worker_pool()
+    capacity = main.worker_pool.size if main.worker_pool else 1
+    slots = threading.BoundedSemaphore(capacity)
+
+    threading.Thread(target=send_heartbeats, args=(args.heartbeat,), daemon=True).start()
+    print(f"Agent {agent_id} serving {capacity} slots for {coordinator_url}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main_cli()
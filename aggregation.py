@@ -0,0 +1,122 @@
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# Heatmaps of continuous parameters would have a cell per row; cap each axis
+MAX_HEATMAP_LEVELS = 200
+
+
+def to_column(values):
+    """Float array from a sequence of numbers, with None (failed runs) as NaN"""
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+def _number(value):
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+def describe(values):
+    """Count, total, mean, spread and percentiles of a column, ignoring NaNs"""
+    values = np.asarray(values, dtype=float)
+    valid = values[~np.isnan(values)]
+    if not valid.size:
+        return {'count': 0}
+    percentiles = np.percentile(valid, PERCENTILES)
+    return {
+        'count': int(valid.size),
+        'total': _number(valid.sum()),
+        'mean': _number(valid.mean()),
+        'std': _number(valid.std()),
+        'min': _number(valid.min()),
+        'max': _number(valid.max()),
+        'percentiles': {f"p{q}": _number(value) for q, value in zip(PERCENTILES, percentiles)},
+    }
+
+
+def period_summary(results):
+    """Totals across a job's period results: profit, worst drawdown, win rate, best and worst period"""
+    names = [result.get('period_name') for result in results]
+    metrics = [result.get('metrics', {}) if result.get('success') else {} for result in results]
+    profit = to_column(m.get('total_net_profit') for m in metrics)
+    drawdown = to_column(m.get('balance_drawdown_maximal') for m in metrics)
+    valid = ~np.isnan(profit)
+
+    summary = {
+        'periods': len(results),
+        'successful': int(valid.sum()),
+        'profit': describe(profit),
+        'drawdown': describe(drawdown),
+    }
+    if valid.any():
+        summary['win_rate'] = _number((profit[valid] > 0).mean())
+        summary['worst_drawdown'] = _number(np.nanmax(drawdown)) if (~np.isnan(drawdown)).any() else None
+        summary['best_period'] = names[int(np.nanargmax(profit))]
+        summary['worst_period'] = names[int(np.nanargmin(profit))]
+    return summary
+
+
+def sensitivity(param_values, metric_values):
+    """Metric statistics for each distinct value of one parameter, in value order"""
+    metric_values = np.asarray(metric_values, dtype=float)
+    keep = ~np.isnan(metric_values)
+    params = np.asarray(param_values, dtype=object)[keep]
+    metric_values = metric_values[keep]
+    if not metric_values.size:
+        return []
+
+    levels, inverse = _levels(params)
+    counts = np.bincount(inverse, minlength=len(levels))
+    sums = np.bincount(inverse, weights=metric_values, minlength=len(levels))
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(metric_values[order], np.cumsum(counts)[:-1])
+    return [
+        {
+            'value': level,
+            'count': int(count),
+            'mean': _number(total / count),
+            'median': _number(np.median(group)),
+            'min': _number(group.min()),
+            'max': _number(group.max()),
+        }
+        for level, count, total, group in zip(levels, counts, sums, groups)
+    ]
+
+
+def heatmap(x_values, y_values, metric_values):
+    """Mean metric for every (x, y) parameter pair: {'x': levels, 'y': levels, 'mean': rows by y}"""
+    metric_values = np.asarray(metric_values, dtype=float)
+    keep = ~np.isnan(metric_values)
+    x_levels, x_index = _levels(np.asarray(x_values, dtype=object)[keep])
+    y_levels, y_index = _levels(np.asarray(y_values, dtype=object)[keep])
+    if max(len(x_levels), len(y_levels)) > MAX_HEATMAP_LEVELS:
+        raise ValueError(f"Heatmap axes are limited to {MAX_HEATMAP_LEVELS} distinct values")
+    cells = y_index * len(x_levels) + x_index
+    size = len(x_levels) * len(y_levels)
+    counts = np.bincount(cells, minlength=size)
+    sums = np.bincount(cells, weights=metric_values[keep], minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums / counts).reshape(len(y_levels), len(x_levels))
+    return {
+        'x': x_levels,
+        'y': y_levels,
+        'mean': [[_number(value) for value in row] for row in means],
+        'count': counts.reshape(len(y_levels), len(x_levels)).tolist(),
+    }
+
+
+def _levels(values):
+    """Distinct values (sorted, numbers before text) and each value's index into them"""
+    try:
+        numeric = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        numeric = None
+    if numeric is not None and not np.isnan(numeric).any():
+        levels, inverse = np.unique(numeric, return_inverse=True)
+        return [int(level) if level.is_integer() else float(level) for level in levels], inverse.ravel()
+
+    keys = [(0, value, '') if isinstance(value, (int, float)) and not isinstance(value, bool)
+            else (1, 0, str(value)) for value in values]
+    unique = sorted(set(keys))
+    positions = {key: index for index, key in enumerate(unique)}
+    inverse = np.fromiter((positions[key] for key in keys), dtype=np.intp, count=len(keys))
+    levels = [key[1] if key[0] == 0 else key[2] for key in unique]
+    return levels, inverse
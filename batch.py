@@ -0,0 +1,220 @@
+"""Run backtest configurations from a file without the web interface.
+
+    python batch.py configs.jsonl -o results.jsonl --workers 4
+
+Configurations come from a .json (a list), .jsonl (one object per line) or .csv
+file. Each has the general settings report, expert, symbol, period, from_date,
+to_date, deposit and period_type (overall, weekly or monthly); EA inputs go in an
+'inputs' object or, for CSV, in any other column. An 'id' identifies a
+configuration in the output; without one a hash of its settings is used.
+
+One JSON line is written per period as it completes. With -o, periods already
+recorded successfully in the output file are skipped, so an interrupted batch
+resumes where it stopped. Each process drives its own terminal from
+MT5_WORKERS_DIR; without worker installs the batch runs on the default terminal
+one period at a time.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import main
+from input_schema import is_plain_file_name
+from worker_pool import discover_workers
+
+GENERAL_SETTINGS = ('report', 'expert', 'symbol', 'period', 'from_date', 'to_date', 'deposit', 'period_type')
+SETTING_DEFAULTS = {
+    'report': 'x.htm', 'expert': 'prev-2.ex5', 'symbol': 'XAUUSD', 'period': 'H1',
+    'from_date': '2025.01.02', 'to_date': '2025.04.24', 'deposit': 50000, 'period_type': 'overall',
+}
+
+# The terminal install used by this process (set by init_process)
+process_worker = None
+
+
+def load_configs(path):
+    """Read configurations from a .json, .jsonl or .csv file"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            rows = list(csv.DictReader(f))
+        elif extension == '.jsonl':
+            rows = [json.loads(line) for line in f if line.strip()]
+        elif extension == '.json':
+            rows = json.load(f)
+            if isinstance(rows, dict):
+                rows = rows.get('configs', [rows])
+        else:
+            raise ValueError(f"Unsupported config file type: {extension}")
+    return [normalize_config(row) for row in rows]
+
+
+def normalize_config(row):
+    """Split a raw configuration into its id, general settings and EA inputs"""
+    row = dict(row)
+    config_id = row.pop('id', None)
+    inputs = dict(row.pop('inputs', None) or {})
+    settings = dict(SETTING_DEFAULTS)
+    for name, value in row.items():
+        if name in GENERAL_SETTINGS:
+            if value not in (None, ''):
+                settings[name] = value
+        else:
+            inputs[name] = value
+    settings['deposit'] = int(float(settings['deposit']))
+    if not is_plain_file_name(settings['report']):
+        raise ValueError(f"report must be a file name without directories: {settings['report']!r}")
+    if config_id in (None, ''):
+        digest = hashlib.sha256(json.dumps([settings, inputs], sort_keys=True, default=str).encode('utf-8'))
+        config_id = digest.hexdigest()[:12]
+    return {'id': str(config_id), 'settings': settings, 'inputs': inputs}
+
+
+def completed_periods(output_path):
+    """(config id, period name) pairs already finished in output_path: successful, or stopped by the abort limits"""
+    done = set()
+    if not output_path or not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by the interruption
+                continue
+            if record.get('success') or record.get('outcome') == 'aborted':
+                done.add((record['config_id'], record['period_name']))
+    return done
+
+
+def period_tasks(configs, done):
+    """One task per configuration period that still needs running"""
+    for config in configs:
+        settings = config['settings']
+        date_ranges = main.get_date_ranges(settings['from_date'], settings['to_date'], settings['period_type'])
+        for period_name, start_date, end_date in date_ranges:
+            if (config['id'], period_name) not in done:
+                yield config, period_name, start_date, end_date
+
+
+def init_process(workers, use_cache):
+    """Claim a terminal install for this process and open the shared stores"""
+    global process_worker
+    # Progress messages go to stderr; stdout may be carrying the results
+    sys.stdout = sys.stderr
+    process_worker = workers.get() if workers is not None else None
+    if use_cache:
+        main.load_result_cache()
+    main.load_run_store()
+    main.load_report_archive()
+    main.load_curve_store()
+
+
+def run_period(config, period_name, start_date, end_date):
+    """Run one period of a configuration in a pool process"""
+    settings = config['settings']
+    params = {
+        'expert': settings['expert'], 'symbol': settings['symbol'],
+        'period': settings['period'], 'deposit': settings['deposit'],
+        **config['inputs']
+    }
+    report_name = f"{settings['report'].split('.')[0]}_{config['id']}_{period_name}.htm"
+    location = {}
+    if process_worker is not None:
+        location = {
+            'terminal_path': process_worker.terminal_path, 'data_dir': process_worker.data_dir,
+            'ini_path': process_worker.ini_path(report_name), 'portable': True,
+        }
+    try:
+        result = main.run_cached_backtest(report_name, start_date, end_date, **location, **params)
+    except Exception as e:
+        result = {'success': False, 'error': str(e), 'period': f"{start_date} to {end_date}"}
+    if process_worker is not None:
+        result['worker'] = process_worker.worker_id
+    main.record_run(result, start_date, end_date, params, period_name=period_name)
+    return {'config_id': config['id'], 'period_name': period_name, 'start_date': start_date,
+            'end_date': end_date, **result}
+
+
+def run_batch(configs, output, processes=1, workers=None, use_cache=True, done=frozenset()):
+    """Run every pending period across a process pool, writing each result line to output.
+
+    Returns (succeeded, failed) counts.
+    """
+    context = multiprocessing.get_context()
+    worker_queue = None
+    if workers:
+        processes = min(processes, len(workers))
+        worker_queue = context.Queue()
+        for worker in workers[:processes]:
+            worker_queue.put(worker)
+    else:
+        # Every run on the default terminal shares its config.ini and data directory
+        processes = 1
+
+    tasks = period_tasks(configs, done)
+    succeeded = failed = 0
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=init_process, initargs=(worker_queue, use_cache)) as executor:
+        pending = set()
+        try:
+            while True:
+                # Keep a bounded number of periods queued so huge batches stay cheap to schedule
+                for task in tasks:
+                    pending.add(executor.submit(run_period, *task))
+                    if len(pending) >= processes * 2:
+                        break
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = future.result()
+                    output.write(json.dumps(record) + '\n')
+                    output.flush()
+                    if record.get('success'):
+                        succeeded += 1
+                    else:
+                        failed += 1
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return succeeded, failed
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run MT5 backtest configurations headlessly")
+    parser.add_argument('configs', help="configuration file (.json, .jsonl or .csv)")
+    parser.add_argument('-o', '--output', help="JSONL results file, appended to and used to resume (default stdout)")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="number of processes (default: one per terminal in MT5_WORKERS_DIR)")
+    parser.add_argument('--restart', action='store_true', help="ignore results already in the output file")
+    parser.add_argument('--no-cache', action='store_true', help="always launch the terminal")
+    args = parser.parse_args(argv)
+
+    configs = load_configs(args.configs)
+    workers = discover_workers(main.WORKERS_DIR, main.WORKER_TERMINAL_EXE) if main.WORKERS_DIR else []
+    processes = args.workers or max(len(workers), 1)
+    done = set() if args.restart else completed_periods(args.output)
+    if done:
+        print(f"Resuming: {len(done)} periods already completed", file=sys.stderr)
+
+    output = open(args.output, 'w' if args.restart else 'a', encoding='utf-8') if args.output else sys.stdout
+    try:
+        succeeded, failed = run_batch(configs, output, processes, workers, not args.no_cache, done)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"{succeeded} periods succeeded, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,101 @@
+"""Measure backtest throughput and per-phase latency with fake_terminal.py as the terminal.
+
+    python benchmarks/bench_end_to_end.py [runs] [workers]
+
+Runs the same number of backtests on the default terminal (one at a time) and on a
+pool of portable stand-in terminals, reporting backtests per minute and the
+median and 95th percentile of each phase of run_single_backtest. The stand-in
+sleeps FAKE_TERMINAL_DELAY seconds (default 0.2 here) per run.
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('FAKE_TERMINAL_DELAY', '0.2')
+FAKE_TERMINAL = os.path.join(ROOT, 'fake_terminal.py')
+
+
+def load_main(tmp):
+    """Import main pointed at a stand-in terminal whose reports go to tmp"""
+    os.environ['MT5_TERMINAL_PATH'] = FAKE_TERMINAL
+    os.environ['MT5_DATA_DIR'] = tmp
+    os.environ['FAKE_TERMINAL_DATA_DIR'] = tmp
+    import main
+    return main
+
+
+def make_workers(tmp, count):
+    from worker_pool import discover_workers
+    workers_dir = os.path.join(tmp, 'workers')
+    for i in range(count):
+        os.makedirs(os.path.join(workers_dir, f"w{i}"))
+        shutil.copy(FAKE_TERMINAL, os.path.join(workers_dir, f"w{i}", 'terminal64.py'))
+    return discover_workers(workers_dir, 'terminal64.py')
+
+
+def date_ranges(runs):
+    """runs distinct one-week periods, so every backtest is a separate configuration"""
+    from main import get_date_ranges
+    return get_date_ranges('2024.01.01', '2025.12.31', 'weekly')[:runs]
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1] if len(values) > 1 else values[0]
+
+
+def throughput(results, seconds):
+    failed = [r for r in results if not r['success']]
+    if failed:
+        raise RuntimeError(f"{len(failed)} backtests failed: {failed[0].get('error')}")
+    return len(results) / seconds * 60
+
+
+def collect(runs=12, workers=4):
+    """Throughput and phase latencies, for run_benchmarks.py"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            main = load_main(tmp)
+            ranges = date_ranges(runs)
+
+            start = time.perf_counter()
+            sequential = [main.run_single_backtest(f"seq_{name}.htm", from_date, to_date)
+                          for name, from_date, to_date in ranges]
+            sequential_rate = throughput(sequential, time.perf_counter() - start)
+
+            pool = main.BacktestWorkerPool(make_workers(tmp, workers), main.run_single_backtest)
+            start = time.perf_counter()
+            pooled = pool.run_periods(ranges, 'pool.htm')
+            pool_rate = throughput(pooled, time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+
+    results = {
+        'e2e_sequential_backtests_per_min': round(sequential_rate, 1),
+        f'e2e_pool{workers}_backtests_per_min': round(pool_rate, 1),
+    }
+    timings = [r['timings'] for r in sequential + pooled]
+    for phase in timings[0]:
+        values = [t[phase] * 1000 for t in timings if phase in t]
+        results[f'e2e_{phase}_p50_ms'] = round(percentile(values, 50), 2)
+        results[f'e2e_{phase}_p95_ms'] = round(percentile(values, 95), 2)
+    return results
+
+
+def main(runs, workers):
+    results = collect(runs, workers)
+    print(f"{runs} backtests, terminal delay {os.environ['FAKE_TERMINAL_DELAY']} s")
+    for name, value in results.items():
+        print(f"{name:<40} {value:>10}")
+
+
+if __name__ == "__main__":
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [12, 4][len(args):]))
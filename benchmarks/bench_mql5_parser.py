@@ -0,0 +1,96 @@
+"""Time MQL5InputParser on generated EAs to show parsing scales linearly with file size.
+
+    python benchmarks/bench_mql5_parser.py [line counts...]
+
+Each EA mixes enums, input groups, comma-separated inputs, comments and function
+bodies with string literals. Cold parses bypass the parse cache; the warm
+column is a repeat parse_inputs() of the unchanged file.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import MQL5InputParser as parser_module
+from MQL5InputParser import MQL5InputParser
+
+BLOCK = """\
+// Block {n}: settings for strategy {n}
+enum ENUM_MODE_{n}
+{{
+   MODE_{n}_A,      // first
+   MODE_{n}_B = 5,  // explicit
+   MODE_{n}_C
+}};
+input group "Strategy {n}"
+input ENUM_MODE_{n} Mode{n} = MODE_{n}_B;
+input double xauLots{n} = 0.1, xauRisk{n} = 1.5; // two inputs
+sinput string Comment{n} = "s{n} // not a comment; really";
+input bool Use{n} = true;
+/* input int Disabled{n} = 1; */
+double Calc{n}(double price)
+{{
+   string note = "input int Fake{n} = 3;";
+   double result = price * {n};
+   for(int i = 0; i < 10; i++)
+      result += MathSqrt(i + 1.0);
+   return result;
+}}
+"""
+BLOCK_LINES = BLOCK.count('\n')
+
+
+def write_ea(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(max(1, lines // BLOCK_LINES)):
+            f.write(BLOCK.format(n=n))
+
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def collect(line_counts=(10000, 50000)):
+    """Cold parse time per EA size, for run_benchmarks.py"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for lines in line_counts:
+            path = os.path.join(tmp, f"ea_{lines}.mq5")
+            write_ea(path, lines)
+            parser = MQL5InputParser(path)
+
+            def cold():
+                parser_module.invalidate_cache()
+                parser.parse_inputs()
+
+            results[f'mql5_parse_{lines}_lines_ms'] = round(best_of(3, cold) * 1000, 2)
+    return results
+
+
+def main(line_counts):
+    print(f"{'lines':>8} {'inputs':>8} {'enums':>7} {'cold s':>8} {'us/line':>8} {'warm ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for lines in line_counts:
+            path = os.path.join(tmp, f"ea_{lines}.mq5")
+            write_ea(path, lines)
+            parser = MQL5InputParser(path)
+
+            def cold():
+                parser_module.invalidate_cache()
+                parser.parse_inputs()
+
+            cold_time = best_of(3, cold)
+            warm_time = best_of(5, parser.parse_inputs)
+            print(f"{lines:>8} {len(parser.inputs):>8} {len(parser.enums):>7} {cold_time:>8.3f} "
+                  f"{cold_time / lines * 1e6:>8.2f} {warm_time * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 25000, 50000, 100000])
@@ -0,0 +1,85 @@
+"""Time provisioning worker directories from a template versus copying the template.
+
+    python benchmarks/bench_provisioning.py [workers] [history MB] [install MB]
+
+The generated template looks like a portable install: a Bases history tree, an
+MQL5 tree of compiled experts and includes, config files and the terminal.
+Space per worker counts files that are not hardlinks of the template, so it is
+an upper bound when the filesystem supports reflinks.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import provisioning
+from provisioning import add_worker, provision_workers
+
+
+def write_file(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(min(size, 1 << 20)) * max(1, size >> 20))
+
+
+def make_template(path, history_mb, install_mb):
+    os.makedirs(path)
+    shutil.copy(os.path.join(ROOT, 'fake_terminal.py'), os.path.join(path, 'terminal64.py'))
+    for i in range(max(1, history_mb // 64)):
+        write_file(os.path.join(path, 'Bases', 'Server', 'history', 'XAUUSD', f"{2000 + i}.hcc"), 64 << 20)
+    for i in range(max(1, install_mb // 4)):
+        write_file(os.path.join(path, 'MQL5', 'Experts', f"ea{i}.ex5"), 4 << 20)
+    for i in range(200):
+        write_file(os.path.join(path, 'MQL5', 'Include', f"lib{i}.mqh"), 4096)
+    write_file(os.path.join(path, 'config', 'common.ini'), 4096)
+    write_file(os.path.join(path, 'config', 'servers.dat'), 64 << 10)
+    os.makedirs(os.path.join(path, 'logs'))
+
+
+def tree_size(path, unshared_only=False):
+    """Bytes of regular files under path, optionally only those not hardlinked elsewhere"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            stat = os.lstat(os.path.join(dirpath, filename))
+            if not unshared_only or stat.st_nlink == 1:
+                total += stat.st_size
+    return total
+
+
+def main(workers, history_mb, install_mb):
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, 'template')
+        make_template(template, history_mb, install_mb)
+        print(f"template: {tree_size(template) / 1e6:.0f} MB")
+
+        start = time.perf_counter()
+        shutil.copytree(template, os.path.join(tmp, 'copy'), symlinks=True)
+        print(f"{'full copy':<28} {time.perf_counter() - start:>8.3f} s/worker")
+
+        workers_dir = os.path.join(tmp, 'workers')
+        start = time.perf_counter()
+        provision_workers(template, workers_dir, workers)
+        elapsed = time.perf_counter() - start
+        method = 'reflink' if provisioning._reflink_supported else 'hardlink'
+        print(f"{f'provision {workers} ({method})':<28} {elapsed / workers:>8.3f} s/worker")
+
+        start = time.perf_counter()
+        add_worker(template, workers_dir)
+        print(f"{'add one worker':<28} {time.perf_counter() - start:>8.3f} s")
+
+        start = time.perf_counter()
+        provision_workers(template, workers_dir, workers)
+        print(f"{'reuse all (reset only)':<28} {time.perf_counter() - start:>8.3f} s")
+
+        unshared = tree_size(os.path.join(workers_dir, 'w0'), unshared_only=True)
+        print(f"{'space per worker':<28} {unshared / 1e6:>8.2f} MB")
+
+
+if __name__ == "__main__":
+    args = [int(n) for n in sys.argv[1:]]
+    main(*(args + [8, 1024, 200][len(args):]))
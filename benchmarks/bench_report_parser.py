@@ -0,0 +1,87 @@
+"""Compare the streaming summary reader with the old full BeautifulSoup parse.
+
+    python benchmarks/bench_report_parser.py [trade counts...]
+
+Reports are generated with fake_terminal.py, so their size is dominated by the
+deals table just like real tester reports.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import fake_terminal
+from report_parser import read_report_summary
+
+
+def beautifulsoup_extract(path):
+    """The extraction run_single_backtest used before report_parser"""
+    with open(path, encoding='utf-16') as f:
+        soup = BeautifulSoup(f, 'html.parser')
+    profit = soup.find('td', string='Total Net Profit:')
+    draw = soup.find('td', string='Balance Drawdown Maximal:')
+    return profit.find_next_sibling('td').text.strip(), draw.find_next_sibling('td').text.strip()
+
+
+def streaming_extract(path):
+    fields, _ = read_report_summary(path)
+    return fields['Total Net Profit'], fields['Balance Drawdown Maximal']
+
+
+def write_report(path, trade_count):
+    tester = {'Expert': 'bench.ex5', 'Symbol': 'XAUUSD', 'Period': 'H1',
+              'FromDate': '2024.01.01', 'ToDate': '2024.12.31', 'Deposit': '50000'}
+    deposit, deals = fake_terminal.simulate_deals(tester, {}, trade_count)
+    with open(path, 'w', encoding='utf-16') as f:
+        f.write(fake_terminal.render_report(tester, fake_terminal.summarize(deposit, deals), deals))
+
+
+def measure(extract, path, repeat):
+    """Best wall time over repeat runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = extract(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    extract(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, best, peak
+
+
+def collect(trade_counts=(1000, 20000)):
+    """Streaming extraction time per report size, for run_benchmarks.py"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for trade_count in trade_counts:
+            path = os.path.join(tmp, f"report_{trade_count}.htm")
+            write_report(path, trade_count)
+            _, best, _ = measure(streaming_extract, path, repeat=5)
+            results[f'report_extract_{trade_count}_trades_ms'] = round(best * 1000, 3)
+    return results
+
+
+def main(trade_counts):
+    print(f"{'trades':>8} {'size MB':>8} {'bs4 s':>9} {'bs4 MB':>8} {'stream s':>9} {'stream MB':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for trade_count in trade_counts:
+            path = os.path.join(tmp, f"report_{trade_count}.htm")
+            write_report(path, trade_count)
+            size = os.path.getsize(path) / 1e6
+
+            soup_value, soup_time, soup_peak = measure(beautifulsoup_extract, path, repeat=1)
+            stream_value, stream_time, stream_peak = measure(streaming_extract, path, repeat=5)
+            assert soup_value == stream_value, (soup_value, stream_value)
+
+            print(f"{trade_count:>8} {size:>8.1f} {soup_time:>9.3f} {soup_peak / 1e6:>8.1f} "
+                  f"{stream_time:>9.5f} {stream_peak / 1e6:>9.2f} {soup_time / stream_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1000, 5000, 20000])
@@ -0,0 +1,82 @@
+"""Run every benchmark, record the numbers against the current commit and compare with the last run.
+
+    python benchmarks/run_benchmarks.py [--no-save] [--quick]
+
+Results are appended to benchmarks/history.jsonl, one line per run with the
+commit it measured; commit that file alongside changes to track performance
+over time. Timings (_ms) are better lower, rates (_per_min) better higher.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import bench_end_to_end
+import bench_mql5_parser
+import bench_report_parser
+
+HISTORY_PATH = os.path.join(BENCH_DIR, 'history.jsonl')
+
+
+def git_commit():
+    """Short hash of HEAD, marked dirty when the tree has uncommitted changes"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        commit = git('rev-parse', '--short', 'HEAD')
+        dirty = git('status', '--porcelain', '--untracked-files=no')
+    except OSError:
+        return None
+    return f"{commit}-dirty" if commit and dirty else commit or None
+
+
+def last_record(quick):
+    """The most recent run of the same size, or None"""
+    if not os.path.exists(HISTORY_PATH):
+        return None
+    with open(HISTORY_PATH, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    matching = [record for record in records if record.get('quick') == quick]
+    return matching[-1] if matching else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--no-save', action='store_true', help="do not append to history.jsonl")
+    parser.add_argument('--quick', action='store_true', help="smaller inputs for a fast check")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.quick:
+        results.update(bench_report_parser.collect((1000,)))
+        results.update(bench_mql5_parser.collect((10000,)))
+        results.update(bench_end_to_end.collect(runs=4, workers=2))
+    else:
+        results.update(bench_report_parser.collect())
+        results.update(bench_mql5_parser.collect())
+        results.update(bench_end_to_end.collect())
+
+    previous = last_record(args.quick)
+    previous_results = previous['results'] if previous else {}
+    label = f"vs {previous['commit']}" if previous else ''
+    print(f"{'benchmark':<40} {'value':>10} {label:>16}")
+    for name, value in results.items():
+        change = ''
+        if previous_results.get(name):
+            change = f"{(value - previous_results[name]) / previous_results[name] * 100:+.1f}%"
+        print(f"{name:<40} {value:>10} {change:>16}")
+
+    if not args.no_save:
+        record = {'commit': git_commit(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'quick': args.quick, 'results': results}
+        with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import json
+import threading
+import time
+import urllib.request
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# Upper bound on threads waiting for remote periods of one job
+MAX_JOB_THREADS = 64
+
+
+def post_json(url, payload, timeout=10):
+    """POST payload as JSON and return the decoded JSON response"""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+    return json.loads(body) if body else None
+
+
+class RemoteTask:
+    """One backtest waiting for, or running on, a worker agent"""
+
+    def __init__(self, report_name, from_date, to_date, params, use_cache=True):
+        self.id = uuid.uuid4().hex[:12]
+        self.report_name = report_name
+        self.from_date = from_date
+        self.to_date = to_date
+        self.params = params
+        self.use_cache = use_cache
+        self.agent_id = None
+        self.dispatches = 0
+        self.result = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def payload(self):
+        return {'task_id': self.id, 'report_name': self.report_name, 'from_date': self.from_date,
+                'to_date': self.to_date, 'params': self.params, 'cache': self.use_cache}
+
+    def finish(self, result):
+        self.result = result
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        return self.result
+
+
+class RemoteAgent:
+    """A worker agent as last reported by its heartbeats"""
+
+    def __init__(self, agent_id, url, capacity, instance):
+        self.agent_id = agent_id
+        self.url = url
+        self.capacity = capacity
+        self.instance = instance
+        self.last_seen = time.time()
+        self.alive = True
+        self.tasks = {}
+
+    @property
+    def free(self):
+        return self.capacity - len(self.tasks) if self.alive else 0
+
+    def to_dict(self):
+        return {
+            'agent_id': self.agent_id,
+            'url': self.url,
+            'capacity': self.capacity,
+            'running': len(self.tasks),
+            'alive': self.alive,
+            'last_seen': self.last_seen,
+        }
+
+
+class AgentCoordinator:
+    """Dispatch backtests to worker agents (agent.py) on other hosts over HTTP.
+
+    Agents announce themselves, their URL and their capacity with periodic
+    heartbeats. Tasks go to the live agent with the most free slots; an agent
+    that misses heartbeats for heartbeat_timeout seconds, restarts, or refuses
+    a dispatch has its tasks rescheduled on the others, up to max_dispatches
+    times per task. Offers the run_single/run_periods interface of
+    BacktestWorkerPool, so jobs and sweeps use it unchanged.
+    """
+
+    def __init__(self, heartbeat_timeout=30, max_dispatches=3, dispatch_timeout=10, on_result=None,
+                 scheduler=None):
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_dispatches = max_dispatches
+        self.dispatch_timeout = dispatch_timeout
+        # Called with (agent_id, result) before a remote result is handed back
+        self.on_result = on_result
+        self.scheduler = scheduler
+        self.agents = {}
+        self._tasks = {}
+        self._pending = deque()
+        self._condition = threading.Condition()
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+        threading.Thread(target=self._watch_agents, daemon=True).start()
+
+    @property
+    def size(self):
+        """Backtest slots across live agents"""
+        with self._condition:
+            return sum(agent.capacity for agent in self.agents.values() if agent.alive)
+
+    @property
+    def busy(self):
+        """Backtests currently dispatched to agents"""
+        with self._condition:
+            return sum(len(agent.tasks) for agent in self.agents.values())
+
+    @property
+    def queued(self):
+        with self._condition:
+            return len(self._pending)
+
+    def heartbeat(self, agent_id, url, capacity, instance):
+        """Register or refresh an agent; a new instance id means it restarted and lost its tasks"""
+        with self._condition:
+            agent = self.agents.get(agent_id)
+            if agent is not None and agent.instance != instance:
+                self._reschedule(agent, f"agent {agent_id} restarted")
+                agent = None
+            if agent is None:
+                agent = RemoteAgent(agent_id, url, capacity, instance)
+                self.agents[agent_id] = agent
+                print(f"Agent {agent_id} joined at {url} with {capacity} slots")
+            elif not agent.alive:
+                print(f"Agent {agent_id} is back")
+            agent.url = url
+            agent.capacity = capacity
+            agent.last_seen = time.time()
+            agent.alive = True
+            self._condition.notify_all()
+
+    def complete(self, agent_id, task_id, result):
+        """Accept a result posted by an agent; returns False for tasks already finished or unknown"""
+        with self._condition:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return False
+            for agent in self.agents.values():
+                agent.tasks.pop(task_id, None)
+            if task in self._pending:
+                # A result from an agent presumed lost still counts
+                self._pending.remove(task)
+            agent = self.agents.get(agent_id)
+            if agent is not None:
+                agent.last_seen = time.time()
+            self._condition.notify_all()
+        result['worker'] = f"{agent_id}/{result['worker']}" if result.get('worker') else agent_id
+        if self.on_result:
+            self.on_result(agent_id, result)
+        task.finish(result)
+        return True
+
+    def run_single(self, report_name, from_date, to_date, run_backtest=None, ticket=None, **params):
+        """Run one backtest on the next free agent and wait for its result.
+
+        run_backtest is only used as a flag: passing one (as the sliced-job path
+        does with run_single_backtest) asks the agent to bypass its result cache.
+        """
+        task = RemoteTask(report_name, from_date, to_date, params, use_cache=run_backtest is None)
+        with self.scheduler.slot(ticket) if self.scheduler else nullcontext():
+            with self._condition:
+                self._tasks[task.id] = task
+                self._pending.append(task)
+                self._condition.notify_all()
+            return task.wait()
+
+    def run_periods(self, date_ranges, base_report, on_result=None, ticket=None, **common_params):
+        """Run every (period_name, start_date, end_date) and return results in period order.
+
+        on_result(index, result) is called as each period completes, in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(len(date_ranges), MAX_JOB_THREADS))) as executor:
+            futures = [
+                executor.submit(self._run_period, index, period_name, start_date, end_date,
+                                base_report, common_params, on_result, ticket)
+                for index, (period_name, start_date, end_date) in enumerate(date_ranges)
+            ]
+            return [future.result() for future in futures]
+
+    def agent_status(self):
+        with self._condition:
+            return [agent.to_dict() for agent in self.agents.values()]
+
+    def _run_period(self, index, period_name, start_date, end_date, base_report, common_params, on_result,
+                    ticket=None):
+        report_name = f"{base_report.split('.')[0]}_{period_name}.htm"
+        result = self.run_single(report_name, start_date, end_date, ticket=ticket, **common_params)
+        result['period_name'] = period_name
+        result['start_date'] = start_date
+        result['end_date'] = end_date
+        if on_result:
+            on_result(index, result)
+        return result
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                agent = None
+                while agent is None:
+                    if self._pending:
+                        agent = max(self.agents.values(), key=lambda a: a.free, default=None)
+                        if agent is not None and agent.free <= 0:
+                            agent = None
+                    if agent is None:
+                        self._condition.wait()
+                task = self._pending.popleft()
+                task.agent_id = agent.agent_id
+                task.dispatches += 1
+                agent.tasks[task.id] = task
+                url = agent.url
+
+            try:
+                post_json(f"{url.rstrip('/')}/tasks", task.payload(), timeout=self.dispatch_timeout)
+            except (OSError, ValueError) as e:
+                print(f"Could not dispatch {task.report_name} to agent {agent.agent_id}: {e}")
+                with self._condition:
+                    # Take the agent out of rotation until its next heartbeat
+                    agent.alive = False
+                    if agent.tasks.pop(task.id, None) is not None:
+                        self._retry(task, f"dispatch to agent {agent.agent_id} failed: {e}")
+
+    def _watch_agents(self):
+        while True:
+            time.sleep(max(self.heartbeat_timeout / 3, 0.1))
+            cutoff = time.time() - self.heartbeat_timeout
+            with self._condition:
+                for agent in self.agents.values():
+                    if agent.alive and agent.last_seen < cutoff:
+                        print(f"Agent {agent.agent_id} missed its heartbeats, rescheduling {len(agent.tasks)} tasks")
+                        agent.alive = False
+                        self._reschedule(agent, f"agent {agent.agent_id} stopped responding")
+
+    def _reschedule(self, agent, reason):
+        """Put an agent's tasks back in the queue (caller holds the condition)"""
+        tasks = list(agent.tasks.values())
+        agent.tasks.clear()
+        for task in tasks:
+            self._retry(task, reason)
+        self._condition.notify_all()
+
+    def _retry(self, task, reason):
+        if task.done:
+            return
+        if task.dispatches >= self.max_dispatches:
+            self._tasks.pop(task.id, None)
+            task.finish({
+                'success': False,
+                'outcome': 'lost',
+                'error': f"Gave up after {task.dispatches} dispatches: {reason}",
+                'period': f"{task.from_date} to {task.to_date}",
+            })
+            return
+        # Rescheduled work goes ahead of tasks that have not started yet
+        self._pending.appendleft(task)
+        self._condition.notify_all()
@@ -0,0 +1,92 @@
+import calendar
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from report_parser import iter_report_deals
+
+# One row per deal; times are the tester's (broker) clock as seconds since the epoch
+CURVE_DTYPE = np.dtype([('time', '<i8'), ('balance', '<f8'), ('equity', '<f8')])
+CURVE_COLUMNS = ('balance', 'equity')
+KEY_PATTERN = re.compile(r'[0-9a-f]{8,64}')
+
+
+def extract_curve(report_path):
+    """Balance curve of a report's deals table as a CURVE_DTYPE array.
+
+    The deals table has no floating profit, so equity equals balance at each
+    deal; the column is kept so curves from sources that do report equity fit
+    the same layout.
+    """
+    times = []
+    balances = []
+    for deal in iter_report_deals(report_path):
+        times.append(calendar.timegm(deal['time'].timetuple()))
+        balances.append(deal['balance'])
+    curve = np.empty(len(times), dtype=CURVE_DTYPE)
+    curve['time'] = times
+    curve['balance'] = balances
+    curve['equity'] = curve['balance']
+    return curve
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw (x, y) with threshold points"""
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket i covers edges[i]:edges[i + 1]; the last "bucket" is the last point, always kept like the first
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.intp) + 1
+    edges = np.append(edges, n)
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end, next_end = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(curve, width, column='balance'):
+    """(times, values) of a curve reduced to about width points for drawing"""
+    keep = lttb(curve['time'], curve[column], max(int(width), 2))
+    return curve['time'][keep], curve[column][keep]
+
+
+class CurveStore:
+    """Equity curves as one .npy file per report, memory-mapped when read"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid curve key {key!r}")
+        return os.path.join(self.root, key[:2], key + '.npy')
+
+    def save(self, key, curve):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, curve)
+        os.replace(temp_path, path)
+
+    def load(self, key):
+        """The curve stored under key, memory-mapped read-only, or None"""
+        try:
+            return np.load(self.path(key), mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
@@ -0,0 +1,207 @@
+"""Stand-in for terminal64.exe that reads a tester .ini and writes a fake report.
+
+Invoked the same way as the real terminal:
+
+    python fake_terminal.py /config:config.ini [/portable]
+
+The report is written relative to the data directory: the directory holding this
+script in portable mode, otherwise FAKE_TERMINAL_DATA_DIR or the working directory.
+Results are derived from a hash of the tester settings, so identical configurations
+always produce identical reports.
+
+Environment:
+    FAKE_TERMINAL_DELAY  seconds to "test" before writing the report (default 0.5)
+    FAKE_TERMINAL_DELAY_PER_DAY  extra seconds per tested day (default 0)
+    FAKE_TERMINAL_DEALS  number of closed trades in the deals table (default 50)
+    FAKE_TERMINAL_PROGRESS_DIR  where a ProgressFile input is written to, one
+        'time,balance,equity' line per deal spread over the delay (like MT5_PROGRESS_DIR)
+"""
+import configparser
+import hashlib
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def read_config(ini_path):
+    """Read a UTF-16 tester .ini into (tester, inputs) dicts"""
+    config = configparser.ConfigParser(interpolation=None)
+    config.optionxform = str
+    with open(ini_path, encoding='utf-16') as f:
+        config.read_file(f)
+    tester = dict(config['Tester']) if config.has_section('Tester') else {}
+    inputs = dict(config['TesterInputs']) if config.has_section('TesterInputs') else {}
+    return tester, inputs
+
+
+def format_money(value):
+    """Format a number the way the tester report does (space thousands separator)"""
+    return f"{value:,.2f}".replace(',', ' ')
+
+
+def simulate_deals(tester, inputs, trade_count):
+    """Generate a deterministic deal sequence for the given settings"""
+    seed_source = repr(sorted((k, v) for k, v in tester.items() if k != 'Report'))
+    # The progress file name differs on every run but does not change what the EA trades
+    seed_source += repr(sorted((k, v) for k, v in inputs.items() if k != 'ProgressFile'))
+    rng = random.Random(hashlib.sha256(seed_source.encode('utf-8')).hexdigest())
+
+    deposit = float(tester.get('Deposit', 50000))
+    start = datetime.strptime(tester.get('FromDate', '2025.01.02'), "%Y.%m.%d")
+    end = datetime.strptime(tester.get('ToDate', '2025.04.24'), "%Y.%m.%d") + timedelta(days=1)
+    span = max((end - start).total_seconds(), 1)
+    symbol = tester.get('Symbol', 'XAUUSD')
+    bias = rng.uniform(-15, 20)
+
+    deals = [{
+        'time': start, 'deal': 1, 'symbol': '', 'type': 'balance', 'direction': '',
+        'volume': '', 'price': '', 'order': '', 'profit': deposit, 'balance': deposit,
+    }]
+    balance = deposit
+    times = sorted(start + timedelta(seconds=rng.uniform(0, span)) for _ in range(trade_count))
+    for i, open_time in enumerate(times):
+        close_time = min(open_time + timedelta(minutes=rng.randint(5, 600)), end - timedelta(seconds=1))
+        side = rng.choice(['buy', 'sell'])
+        price = round(2600 + rng.uniform(-100, 100), 2)
+        profit = round(rng.gauss(bias, 150), 2)
+        deals.append({
+            'time': open_time, 'deal': 2 * i + 2, 'symbol': symbol, 'type': side, 'direction': 'in',
+            'volume': '0.10', 'price': f"{price:.2f}", 'order': 2 * i + 2, 'profit': 0.0, 'balance': balance,
+        })
+        balance = round(balance + profit, 2)
+        deals.append({
+            'time': close_time, 'deal': 2 * i + 3, 'symbol': symbol,
+            'type': 'sell' if side == 'buy' else 'buy', 'direction': 'out',
+            'volume': '0.10', 'price': f"{price + profit / 10:.2f}", 'order': 2 * i + 3,
+            'profit': profit, 'balance': balance,
+        })
+    return deposit, deals
+
+
+def summarize(deposit, deals):
+    """Compute the summary block of the report from the deal sequence"""
+    closed = [d['profit'] for d in deals if d['direction'] == 'out']
+    gross_profit = sum(p for p in closed if p > 0)
+    gross_loss = sum(p for p in closed if p < 0)
+    net = gross_profit + gross_loss
+
+    peak = deposit
+    max_dd = 0.0
+    max_dd_pct = 0.0
+    lowest = deposit
+    for d in deals:
+        balance = d['balance']
+        peak = max(peak, balance)
+        lowest = min(lowest, balance)
+        if peak - balance > max_dd:
+            max_dd = peak - balance
+            max_dd_pct = max_dd / peak * 100
+
+    wins = sum(1 for p in closed if p > 0)
+    trades = len(closed)
+    return [
+        ('Initial Deposit:', format_money(deposit)),
+        ('Total Net Profit:', format_money(net)),
+        ('Gross Profit:', format_money(gross_profit)),
+        ('Gross Loss:', format_money(gross_loss)),
+        ('Profit Factor:', f"{gross_profit / -gross_loss:.2f}" if gross_loss else '0.00'),
+        ('Expected Payoff:', f"{net / trades:.2f}" if trades else '0.00'),
+        ('Recovery Factor:', f"{net / max_dd:.2f}" if max_dd else '0.00'),
+        ('Balance Drawdown Absolute:', format_money(deposit - lowest)),
+        ('Balance Drawdown Maximal:', f"{format_money(max_dd)} ({max_dd_pct:.2f}%)"),
+        ('Balance Drawdown Relative:', f"{max_dd_pct:.2f}% ({format_money(max_dd)})"),
+        ('Total Trades:', str(trades)),
+        ('Total Deals:', str(len(deals))),
+        ('Profit Trades (% of total):', f"{wins} ({wins / trades * 100 if trades else 0:.2f}%)"),
+        ('Loss Trades (% of total):', f"{trades - wins} ({(trades - wins) / trades * 100 if trades else 0:.2f}%)"),
+    ]
+
+
+def write_progress(path, deals, duration):
+    """Append each deal's balance to the progress file while "testing" for duration seconds"""
+    step = duration / max(len(deals), 1)
+    for d in deals:
+        with open(path, 'a', encoding='ascii') as f:
+            f.write(f"{d['time'].strftime('%Y.%m.%d %H:%M:%S')},{d['balance']:.2f},{d['balance']:.2f}\n")
+        time.sleep(step)
+
+
+def render_report(tester, summary, deals):
+    """Render an MT5-style strategy tester report"""
+    rows = [
+        '<html>',
+        '<head><meta http-equiv="Content-Type" content="text/html; charset=utf-16"><title>Strategy Tester Report</title></head>',
+        '<body>',
+        '<table width="1200" cellspacing="1" cellpadding="3" border="0">',
+        f'<tr align="right"><td nowrap colspan="3">Expert:</td><td nowrap colspan="10"><b>{tester.get("Expert", "")}</b></td></tr>',
+        f'<tr align="right"><td nowrap colspan="3">Symbol:</td><td nowrap colspan="10"><b>{tester.get("Symbol", "")}</b></td></tr>',
+        f'<tr align="right"><td nowrap colspan="3">Period:</td><td nowrap colspan="10"><b>{tester.get("Period", "")} '
+        f'({tester.get("FromDate", "")} - {tester.get("ToDate", "")})</b></td></tr>',
+    ]
+    for label, value in summary:
+        rows.append(f'<tr align="right"><td nowrap colspan="3">{label}</td><td nowrap><b>{value}</b></td></tr>')
+    rows.append('</table>')
+
+    rows.append('<table width="1200" cellspacing="1" cellpadding="3" border="0">')
+    rows.append('<tr align="center"><th colspan="13"><div style="font: 10pt Tahoma"><b>Deals</b></div></th></tr>')
+    rows.append('<tr bgcolor="#E5F0FC" align="center"><td nowrap><b>Time</b></td><td nowrap><b>Deal</b></td>'
+                '<td nowrap><b>Symbol</b></td><td nowrap><b>Type</b></td><td nowrap><b>Direction</b></td>'
+                '<td nowrap><b>Volume</b></td><td nowrap><b>Price</b></td><td nowrap><b>Order</b></td>'
+                '<td nowrap><b>Commission</b></td><td nowrap><b>Swap</b></td><td nowrap><b>Profit</b></td>'
+                '<td nowrap><b>Balance</b></td><td nowrap><b>Comment</b></td></tr>')
+    for i, d in enumerate(deals):
+        bgcolor = '#F7F7F7' if i % 2 else '#FFFFFF'
+        rows.append(
+            f'<tr bgcolor="{bgcolor}" align="right"><td>{d["time"].strftime("%Y.%m.%d %H:%M:%S")}</td>'
+            f'<td>{d["deal"]}</td><td>{d["symbol"]}</td><td>{d["type"]}</td><td>{d["direction"]}</td>'
+            f'<td>{d["volume"]}</td><td>{d["price"]}</td><td>{d["order"]}</td><td>0.00</td><td>0.00</td>'
+            f'<td>{format_money(d["profit"])}</td><td>{format_money(d["balance"])}</td><td></td></tr>'
+        )
+    rows.append('</table>')
+    rows.append('</body>')
+    rows.append('</html>')
+    return '\n'.join(rows)
+
+
+def main(argv):
+    ini_path = None
+    portable = False
+    for arg in argv:
+        if arg.lower().startswith('/config:'):
+            ini_path = arg[len('/config:'):]
+        elif arg.lower() == '/portable':
+            portable = True
+    if not ini_path:
+        print("usage: fake_terminal.py /config:<ini> [/portable]")
+        return 2
+
+    if portable:
+        data_dir = os.path.dirname(os.path.abspath(__file__))
+    else:
+        data_dir = os.environ.get('FAKE_TERMINAL_DATA_DIR', os.getcwd())
+
+    tester, inputs = read_config(ini_path)
+    start = datetime.strptime(tester.get('FromDate', '2025.01.02'), "%Y.%m.%d")
+    end = datetime.strptime(tester.get('ToDate', '2025.04.24'), "%Y.%m.%d")
+    days = (end - start).days + 1
+    delay = (float(os.environ.get('FAKE_TERMINAL_DELAY', 0.5))
+             + float(os.environ.get('FAKE_TERMINAL_DELAY_PER_DAY', 0)) * days)
+
+    deposit, deals = simulate_deals(tester, inputs, int(os.environ.get('FAKE_TERMINAL_DEALS', 50)))
+    progress_dir = os.environ.get('FAKE_TERMINAL_PROGRESS_DIR')
+    if progress_dir and inputs.get('ProgressFile'):
+        write_progress(os.path.join(progress_dir, inputs['ProgressFile']), deals, delay)
+    else:
+        time.sleep(delay)
+    report = render_report(tester, summarize(deposit, deals), deals)
+
+    report_path = os.path.join(data_dir, tester.get('Report', 'x.htm'))
+    with open(report_path, 'w', encoding='utf-16') as f:
+        f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
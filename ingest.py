@@ -0,0 +1,158 @@
+"""Add existing tester reports to the run history.
+
+    python ingest.py /path/to/terminal/reports --workers 8 --archive
+
+Walks the directory tree for .htm/.html reports, reads each one's summary
+metrics the way run_single_backtest does, and its settings (expert, symbol,
+timeframe, dates, deposit and EA inputs) from the report header, then records
+it as a run queryable through /api/runs. Reports are parsed across a process
+pool while the parent writes to the history, printing progress as it goes.
+
+A file is skipped when its path, modification time and size match an earlier
+ingest, or when a report with the same contents (SHA-256) was already
+ingested, so rerunning over the same tree only reads new or changed files.
+With --archive a compressed copy of each report goes into the report archive;
+the originals are never moved.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import main
+from report_parser import read_report_settings
+from result_cache import file_hash
+from run_store import GENERAL_PARAMS
+
+REPORT_SUFFIXES = ('.htm', '.html')
+# History writes are committed in batches of this many reports
+COMMIT_EVERY = 500
+PROGRESS_SECONDS = 5
+
+
+def find_reports(root):
+    """Absolute paths of the reports under root, in a stable order"""
+    for directory, subdirectories, files in os.walk(os.path.abspath(root)):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(REPORT_SUFFIXES):
+                yield os.path.join(directory, name)
+
+
+def changed_reports(paths, known):
+    """(paths that need reading, number skipped as unchanged since their last ingest)"""
+    pending = []
+    unchanged = 0
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        record = known.get(path)
+        if record and record[0] == stat.st_mtime and record[1] == stat.st_size:
+            unchanged += 1
+        else:
+            pending.append(path)
+    return pending, unchanged
+
+
+def init_process(archive):
+    """Open the report archive in this pool process when reports are copied into it"""
+    # Progress messages go to stderr
+    sys.stdout = sys.stderr
+    if archive:
+        main.load_report_archive()
+        main.load_curve_store()
+
+
+def read_report(path):
+    """Metrics, settings and digest of one report, read in a pool process"""
+    try:
+        stat = os.stat(path)
+        result = main.parse_report(path)
+        settings = read_report_settings(path) if result['success'] else {}
+        if result['success'] and main.report_archive is not None:
+            main.archive_report(result, path, remove_source=False)
+        digest = result.get('report_hash') or file_hash(path)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+    return {'path': path, 'mtime': stat.st_mtime, 'size': stat.st_size, 'digest': digest,
+            'settings': settings, 'result': result}
+
+
+def record_report(store, record, digests):
+    """Add a report read by read_report to the history; returns 'ingested', 'duplicate' or 'failed'"""
+    if 'error' in record:
+        print(f"Could not read {record['path']}: {record['error']}", file=sys.stderr)
+        return 'failed'
+    digest = record['digest']
+    if digest in digests:
+        # The same report under another name, or touched since it was ingested
+        store.mark_ingested(record['path'], record['mtime'], record['size'], digest, digests[digest], commit=False)
+        return 'duplicate'
+    run_id = None
+    result = record['result']
+    if result['success']:
+        settings = record['settings']
+        params = {key: settings[key] for key in GENERAL_PARAMS if key in settings}
+        params.update(settings['inputs'])
+        run_id = store.add_run(result, settings.get('from_date'), settings.get('to_date'), params, commit=False)
+    store.mark_ingested(record['path'], record['mtime'], record['size'], digest, run_id, commit=False)
+    digests[digest] = run_id
+    return 'ingested' if run_id else 'failed'
+
+
+def run_ingest(root, processes=None, archive=False):
+    """Ingest every new or changed report under root; returns counts per outcome"""
+    store = main.load_run_store()
+    if store is None:
+        raise RuntimeError("The run history could not be opened")
+    known = store.ingested_reports()
+    digests = {record[2]: record[3] for record in known.values()}
+    paths, unchanged = changed_reports(find_reports(root), known)
+    counts = {'ingested': 0, 'duplicate': 0, 'failed': 0, 'unchanged': unchanged}
+    print(f"{len(paths)} reports to read, {unchanged} unchanged since the last ingest", file=sys.stderr)
+
+    start = last_progress = time.monotonic()
+    processes = processes or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_process, initargs=(archive,)) as executor:
+            # Small reports parse in milliseconds; hand them out in chunks to keep the pool busy
+            chunksize = max(1, min(64, len(paths) // (processes * 4)))
+            for done, record in enumerate(executor.map(read_report, paths, chunksize=chunksize), 1):
+                counts[record_report(store, record, digests)] += 1
+                if done % COMMIT_EVERY == 0:
+                    store.commit()
+                now = time.monotonic()
+                if now - last_progress >= PROGRESS_SECONDS or done == len(paths):
+                    last_progress = now
+                    rate = done / max(now - start, 1e-9)
+                    print(f"{done} / {len(paths)} reports ({rate:.0f}/s, "
+                          f"about {(len(paths) - done) / rate:.0f}s left)", file=sys.stderr)
+    finally:
+        # Whatever was read before an interruption is kept; a rerun picks up the rest
+        store.commit()
+    return counts
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Add existing MT5 tester reports to the run history")
+    parser.add_argument('directory', help="directory searched recursively for .htm/.html reports")
+    parser.add_argument('-w', '--workers', type=int, help="number of processes (default: one per CPU)")
+    parser.add_argument('--archive', action='store_true',
+                        help="also copy each report into the compressed report archive")
+    args = parser.parse_args(argv)
+
+    try:
+        counts = run_ingest(args.directory, args.workers, args.archive)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to ingest the rest", file=sys.stderr)
+        return 130
+    print(f"{counts['ingested']} reports ingested, {counts['duplicate']} duplicates, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} unreadable", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
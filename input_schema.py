@@ -0,0 +1,305 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# Inclusive ranges of the MQL5 integer types
+INTEGER_BOUNDS = {
+    'char': (-2 ** 7, 2 ** 7 - 1), 'uchar': (0, 2 ** 8 - 1),
+    'short': (-2 ** 15, 2 ** 15 - 1), 'ushort': (0, 2 ** 16 - 1),
+    'int': (-2 ** 31, 2 ** 31 - 1), 'uint': (0, 2 ** 32 - 1),
+    'long': (-2 ** 63, 2 ** 63 - 1), 'ulong': (0, 2 ** 64 - 1),
+}
+TIMEFRAMES = ('M1', 'M2', 'M3', 'M4', 'M5', 'M6', 'M10', 'M12', 'M15', 'M20', 'M30',
+              'H1', 'H2', 'H3', 'H4', 'H6', 'H8', 'H12', 'D1', 'W1', 'MN1')
+PERIOD_TYPES = ('overall', 'weekly', 'monthly')
+# Symbol x timeframe combinations one configuration may fan out to
+MAX_TARGETS = 64
+TIME_OF_DAY = re.compile(r'^(\d{1,2}):(\d{2})$')
+TESTER_DATE = re.compile(r'^\d{4}\.\d{2}\.\d{2}$')
+
+
+def is_plain_file_name(name):
+    """True for a bare file name such as 'x.htm': no directories, drive or parent references"""
+    return (isinstance(name, str) and bool(name) and name not in ('.', '..')
+            and not any(char in name for char in '/\\:\0'))
+
+
+def time_to_timestamp(hour, minute, base_date="2025-01-01"):
+    """Convert hour and minute to timestamp with base date 2025-01-01"""
+    try:
+        dt = datetime.strptime(f"{base_date} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M")
+        return int(dt.timestamp())
+    except ValueError:
+        return 0
+
+
+def datetime_to_timestamp(datetime_str: str) -> int:
+    """Convert HTML datetime-local format to Unix timestamp"""
+    try:
+        # Parse HTML datetime-local format: YYYY-MM-DDTHH:MM
+        dt = datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M")
+        return int(dt.timestamp())
+    except ValueError:
+        # Return default timestamp if parsing fails
+        return int(datetime(2025, 1, 1, 0, 0).timestamp())
+
+
+# Batches repeat the same few dates and times of day, so parsed values are memoized
+@lru_cache(maxsize=4096)
+def _tester_date(value):
+    return datetime.strptime(value, "%Y.%m.%d")
+
+
+@lru_cache(maxsize=4096)
+def _time_of_day(hour, minute):
+    return time_to_timestamp(hour, minute)
+
+
+def _integer(mql_type):
+    low, high = INTEGER_BOUNDS.get(mql_type.lower(), INTEGER_BOUNDS['long'])
+
+    def coerce(value):
+        if isinstance(value, bool):
+            raise ValueError("expected an integer, got a boolean")
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f"expected an integer, got {value}")
+            value = int(value)
+        elif not isinstance(value, int):
+            value = int(str(value).strip())
+        if not low <= value <= high:
+            raise ValueError(f"{value} is outside the {mql_type} range {low}..{high}")
+        return value
+    return coerce
+
+
+_long = _integer('long')
+
+
+def positive_int(value):
+    """value (a JSON number or numeric string) as a positive integer; raises ValueError otherwise"""
+    try:
+        value = _long(value)
+    except TypeError:
+        raise ValueError(f"expected an integer, got {type(value).__name__}") from None
+    if value <= 0:
+        raise ValueError("must be positive")
+    return value
+
+
+def _float(value):
+    if isinstance(value, bool):
+        raise ValueError("expected a number, got a boolean")
+    value = float(value)
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError("expected a finite number")
+    return value
+
+
+def _bool(value):
+    if isinstance(value, bool) or value in (0, 1):
+        return 1 if value else 0
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return 1
+    if text in ('false', '0', 'no', 'off', ''):
+        return 0
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+def _string(value):
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError(f"expected a string, got {type(value).__name__}")
+    return str(value)
+
+
+def _enum(enum_values):
+    numeric = set(enum_values.values())
+
+    def coerce(value):
+        # Accept the enum member name or its numeric value
+        if isinstance(value, str) and value in enum_values:
+            return enum_values[value]
+        if isinstance(value, int) and not isinstance(value, bool) and value in numeric:
+            return value
+        raise ValueError(f"{value!r} is not one of {', '.join(enum_values)}")
+    return coerce
+
+
+def _timestamp(value):
+    """Seconds since the epoch, or a time of day as HH:MM on the base date"""
+    if isinstance(value, str):
+        match = TIME_OF_DAY.match(value.strip())
+        if match:
+            hour, minute = int(match.group(1)), int(match.group(2))
+            if hour > 23 or minute > 59:
+                raise ValueError(f"{value} is not a time of day")
+            return _time_of_day(hour, minute)
+    return _long(value)
+
+
+def _datetime(value):
+    """Seconds since the epoch, or YYYY-MM-DDTHH:MM"""
+    if isinstance(value, str) and 'T' in value:
+        try:
+            return int(datetime.strptime(value.strip(), "%Y-%m-%dT%H:%M").timestamp())
+        except ValueError:
+            raise ValueError(f"{value!r} is not a YYYY-MM-DDTHH:MM datetime") from None
+    return _long(value)
+
+
+class InputSchema:
+    """Validators for an EA's inputs, compiled once from MQL5InputParser.get_grouped_inputs() output.
+
+    Each input gets a coercer that turns a JSON or form value into the value
+    written to the tester .ini, plus its default for when it is omitted.
+    """
+
+    def __init__(self, grouped_inputs):
+        self.source = grouped_inputs
+        self.coercers = {}
+        self.defaults = {}
+        self.inputs = {}
+        for inputs in (grouped_inputs or {}).values():
+            for input_var in inputs:
+                name = input_var['name']
+                self.inputs[name] = input_var
+                self.coercers[name] = self._compile(input_var)
+                self.defaults[name] = self._default(input_var)
+
+    def _compile(self, input_var):
+        mql_type = input_var['mql_type'].lower()
+        if input_var.get('is_timestamp'):
+            return _timestamp
+        if input_var.get('is_datetime'):
+            return _datetime
+        if input_var.get('is_enum') and input_var.get('enum_values'):
+            return _enum(input_var['enum_values'])
+        if mql_type in INTEGER_BOUNDS:
+            return _integer(mql_type)
+        if mql_type in ('double', 'float'):
+            return _float
+        if mql_type == 'bool':
+            return _bool
+        return _string
+
+    def _default(self, input_var):
+        """The .ini value of an input left at its default"""
+        if input_var.get('is_enum', False):
+            return input_var.get('enum_numeric_value', 0)
+        if input_var.get('is_datetime', False):
+            return datetime_to_timestamp(input_var.get('datetime_value') or "2025-01-01T00:00")
+        if input_var['html_type'] == 'checkbox':
+            return 1 if input_var['default_value'] else 0
+        return input_var['default_value']
+
+    def validate_inputs(self, values):
+        """(ini values for every input, errors) for a mapping of input names to JSON values"""
+        params = dict(self.defaults)
+        errors = []
+        for name, value in (values or {}).items():
+            coerce = self.coercers.get(name)
+            if coerce is None:
+                errors.append({'field': f"inputs.{name}", 'error': 'unknown input'})
+                continue
+            try:
+                params[name] = coerce(value)
+            except (ValueError, TypeError) as e:
+                errors.append({'field': f"inputs.{name}", 'error': str(e)})
+        return params, errors
+
+    def validate(self, config):
+        """Validate one backtest configuration.
+
+        Returns (settings, params, errors): the general settings, the
+        create_dynamic_ini_file parameters (general settings plus every input),
+        and a list of {'field', 'error'} dicts that is empty when the config is valid.
+        """
+        if not isinstance(config, dict):
+            return None, None, [{'field': '', 'error': 'configuration must be an object'}]
+        errors = []
+        settings = {
+            'report': config.get('report', 'x.htm'),
+            'expert': config.get('expert', 'prev-2.ex5'),
+            'symbol': config.get('symbol', 'XAUUSD'),
+            'period': config.get('period', 'H1'),
+            'from_date': config.get('from_date', '2025.01.02'),
+            'to_date': config.get('to_date', '2025.04.24'),
+            'deposit': config.get('deposit', 50000),
+            'period_type': config.get('period_type', 'overall'),
+            'single_launch': bool(config.get('single_launch', False)),
+        }
+        if not isinstance(settings['expert'], str) or not settings['expert']:
+            errors.append({'field': 'expert', 'error': 'expected a non-empty string'})
+        # The report name becomes a path in the terminal's data directory, which is cleared before each run
+        if not is_plain_file_name(settings['report']):
+            errors.append({'field': 'report', 'error': 'expected a file name without directories'})
+        if settings['period_type'] not in PERIOD_TYPES:
+            errors.append({'field': 'period_type', 'error': f"expected one of {', '.join(PERIOD_TYPES)}"})
+        # symbol and period may be lists; every symbol runs on every timeframe
+        symbols = settings['symbol'] if isinstance(settings['symbol'], list) else [settings['symbol']]
+        timeframes = settings['period'] if isinstance(settings['period'], list) else [settings['period']]
+        symbols_valid = bool(symbols) and all(isinstance(symbol, str) and symbol for symbol in symbols)
+        timeframes_valid = bool(timeframes) and all(timeframe in TIMEFRAMES for timeframe in timeframes)
+        if not symbols_valid:
+            errors.append({'field': 'symbol', 'error': 'expected a non-empty string or list of strings'})
+        if not timeframes_valid:
+            errors.append({'field': 'period', 'error': f"unknown timeframe in {settings['period']!r}"})
+        settings['targets'] = [
+            (symbol, timeframe) for symbol in dict.fromkeys(symbols) for timeframe in dict.fromkeys(timeframes)
+        ] if symbols_valid and timeframes_valid else []
+        if len(settings['targets']) > MAX_TARGETS:
+            errors.append({'field': 'symbol', 'error': f"at most {MAX_TARGETS} symbol and timeframe combinations"})
+        elif settings['targets']:
+            settings['symbol'], settings['period'] = settings['targets'][0]
+        dates_valid = True
+        for field in ('from_date', 'to_date'):
+            value = settings[field]
+            if not isinstance(value, str) or not TESTER_DATE.match(value):
+                errors.append({'field': field, 'error': 'expected a YYYY.MM.DD date'})
+                dates_valid = False
+        if dates_valid:
+            try:
+                if _tester_date(settings['from_date']) > _tester_date(settings['to_date']):
+                    errors.append({'field': 'to_date', 'error': 'must not be before from_date'})
+            except ValueError as e:
+                errors.append({'field': 'from_date', 'error': str(e)})
+        try:
+            settings['deposit'] = _long(settings['deposit'])
+            if settings['deposit'] <= 0:
+                raise ValueError("must be positive")
+        except (ValueError, TypeError) as e:
+            errors.append({'field': 'deposit', 'error': str(e)})
+
+        unknown = set(config) - set(settings) - {'inputs'}
+        errors.extend({'field': field, 'error': 'unknown setting'} for field in sorted(unknown))
+        inputs, input_errors = self.validate_inputs(config.get('inputs'))
+        errors.extend(input_errors)
+
+        params = {
+            'expert': settings['expert'], 'symbol': settings['symbol'],
+            'period': settings['period'], 'deposit': settings['deposit'],
+            **inputs
+        }
+        return settings, params, errors
+
+    def from_form(self, form):
+        """ini values for every input from the /backtest form; bad values fall back to the default"""
+        params = {}
+        for name, input_var in self.inputs.items():
+            if input_var.get('is_timestamp', False):
+                # Time inputs arrive as separate hour and minute fields
+                try:
+                    params[name] = time_to_timestamp(int(form.get(f"{name}Hour", 0)), int(form.get(f"{name}Minute", 0)))
+                except ValueError:
+                    params[name] = self.defaults[name]
+            elif input_var['html_type'] == 'checkbox':
+                # Unticked checkboxes are not submitted at all
+                params[name] = 1 if form.get(name) else 0
+            else:
+                value = form.get(name)
+                try:
+                    params[name] = self.coercers[name](value) if value is not None else self.defaults[name]
+                except (ValueError, TypeError):
+                    params[name] = self.defaults[name]
+        return params
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BacktestJob:
+    """A queued or running backtest whose per-period results arrive over time.
+
+    With several (symbol, timeframe) targets every target runs every period;
+    the result for a target's period has index target_index * len(date_ranges) + period_index.
+    """
+
+    def __init__(self, date_ranges, period_type, targets=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.date_ranges = list(date_ranges)
+        self.period_type = period_type
+        self.targets = [tuple(target) for target in targets or ()]
+        self.status = 'queued'
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Results in completion order; each carries its period 'index'
+        self.events = []
+        self._condition = threading.Condition()
+
+    @property
+    def total(self):
+        return len(self.date_ranges) * max(len(self.targets), 1)
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def add_result(self, index, result):
+        """Record the result for the period at position index"""
+        with self._condition:
+            result['index'] = index
+            self.events.append(result)
+            self._condition.notify_all()
+
+    def results(self):
+        """Results received so far, in period order"""
+        with self._condition:
+            return sorted(self.events, key=lambda r: r['index'])
+
+    def _set_status(self, status, error=None):
+        with self._condition:
+            self.status = status
+            self.error = error
+            if status == 'running':
+                self.started_at = time.time()
+            elif status in ('done', 'failed'):
+                self.finished_at = time.time()
+            self._condition.notify_all()
+
+    def wait_for_events(self, since, timeout=15):
+        """Block until there are results past position since or the job finishes.
+
+        Returns (new_results, finished). An empty list with finished False means
+        the timeout expired, which callers use to send keep-alives.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.events) > since or self.finished, timeout)
+            return list(self.events[since:]), self.finished
+
+    def to_dict(self):
+        with self._condition:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'error': self.error,
+                'period_type': self.period_type,
+                'targets': [list(target) for target in self.targets],
+                'total': self.total,
+                'completed': len(self.events),
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+
+class JobManager:
+    """Run backtest jobs on background threads so requests return immediately"""
+
+    def __init__(self, max_concurrent_jobs=1, max_finished_jobs=100):
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_jobs, thread_name_prefix='backtest-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished_jobs = max_finished_jobs
+
+    def submit(self, run_job, date_ranges, period_type, *args, targets=None, **kwargs):
+        """Queue run_job(job, *args, **kwargs) and return the job straight away"""
+        job = BacktestJob(date_ranges, period_type, targets)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, run_job, args, kwargs)
+        return job
+
+    def submit_many(self, submissions):
+        """Queue several jobs at once; submissions are ((run_job, date_ranges, period_type, *args), kwargs) pairs.
+
+        A 'targets' entry in kwargs is taken as the job's targets, as with submit().
+        """
+        jobs = []
+        with self._lock:
+            for (run_job, date_ranges, period_type, *args), kwargs in submissions:
+                kwargs = dict(kwargs)
+                job = BacktestJob(date_ranges, period_type, kwargs.pop('targets', None))
+                self._jobs[job.id] = job
+                jobs.append((job, run_job, args, kwargs))
+            self._prune()
+        for job, run_job, args, kwargs in jobs:
+            self._executor.submit(self._run, job, run_job, args, kwargs)
+        return [job for job, _, _, _ in jobs]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queued_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == 'queued')
+
+    def running_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == 'running')
+
+    def _run(self, job, run_job, args, kwargs):
+        job._set_status('running')
+        try:
+            run_job(job, *args, **kwargs)
+        except Exception as e:
+            job._set_status('failed', str(e))
+        else:
+            job._set_status('done')
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -1,28 +1,184 @@
+import base64
+import glob
+import gzip
+import inspect
+import itertools
+import json
+import re
 import subprocess
+import sys
+import tempfile
+import threading
 import time
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-from flask import Flask, request, render_template, jsonify
-import MQL5InputParser
+from aggregation import describe, heatmap, period_summary, sensitivity, to_column
+from coordinator import AgentCoordinator
+from equity_curves import CURVE_COLUMNS, CurveStore, downsample, extract_curve
+from flask import Flask, Response, g, request, render_template, jsonify, redirect, url_for, abort
+from MQL5InputParser import MQL5InputParser, MQL5InputWatcher, cache_stats
+from input_schema import MAX_TARGETS, TIMEFRAMES, InputSchema, is_plain_file_name, positive_int
+from jobs import JobManager
+from metrics import (BACKTEST_PHASE_SECONDS, BACKTEST_RUNS, BACKTEST_SECONDS, HTTP_REQUEST_SECONDS,
+                     JOB_QUEUE_WAIT_SECONDS, Gauge, JobTracer, PhaseTimer, registry)
+from optimizer import GRANULARITIES, OptimizationRun
+from period_slicing import slice_deals
+from progress_monitor import ProgressMonitor, abort_limits
+from provisioning import add_worker, provision_workers
+from report_archive import ReportArchive
+from report_parser import detect_encoding, iter_report_deals, open_report, read_report_summary
+from report_watcher import wait_for_report
+from result_cache import BacktestCache, file_hash
+from run_store import FILTERS, RunStore
+from scheduler import PRIORITIES, BacktestScheduler, Ticket
+from sweep import SweepSpace, SweepStore, run_sweep
+from timeouts import DurationModel, TimeoutPolicy
+from worker_pool import BacktestWorkerPool, TerminalWorker, discover_workers
 
 app = Flask(__name__)
 
 # Global variable to store parsed inputs
 mql5_inputs = None
-MQL5_FILE_PATH = r"C:\Users\UserName\AppData\Roaming\MetaQuotes\Terminal\D0E8209F77C8CF37AD8BF550E51FF075\MQL5\Experts\prev-2.mq5"
+input_schema = None
+input_watcher = None
+# Terminal locations; override with MT5_TERMINAL_PATH, MT5_DATA_DIR (where reports are written),
+# MT5_EXPERTS_DIR and MT5_EA_SOURCE (the .mq5 whose inputs build the form)
+TERMINAL_PATH = os.environ.get('MT5_TERMINAL_PATH', r"C:\Program Files\MetaTrader 5\terminal64.exe")
+TERMINAL_DATA_DIR = os.environ.get(
+    'MT5_DATA_DIR', r"C:\Users\UserName\AppData\Roaming\MetaQuotes\Terminal\D0E8209F77C8CF37AD8BF550E51FF075")
+EXPERTS_DIR = os.environ.get('MT5_EXPERTS_DIR', os.path.join(TERMINAL_DATA_DIR, "MQL5", "Experts"))
+MQL5_FILE_PATH = os.environ.get('MT5_EA_SOURCE', os.path.join(EXPERTS_DIR, "prev-2.mq5"))
+
+# Results of identical runs (same .ex5 build and tester settings) are reused from here
+CACHE_PATH = os.environ.get('MT5_CACHE_PATH', 'backtest_cache.sqlite')
+result_cache = None
+
+# Every run is recorded here for later querying through /api/runs
+RUNS_DB_PATH = os.environ.get('MT5_RUNS_DB', 'runs.sqlite')
+run_store = None
+
+# Reports are moved out of the terminal directory into a compressed, content-addressed archive;
+# the least recently used are deleted beyond MT5_ARCHIVE_MAX_MB, and any older than MT5_ARCHIVE_MAX_DAYS
+REPORT_ARCHIVE_DIR = os.environ.get('MT5_REPORT_ARCHIVE', 'report_archive')
+ARCHIVE_MAX_BYTES = int(float(os.environ.get('MT5_ARCHIVE_MAX_MB', 5 * 1024)) * 1024 * 1024)
+ARCHIVE_MAX_AGE = float(os.environ.get('MT5_ARCHIVE_MAX_DAYS', 90)) * 24 * 3600
+report_archive = None
+
+# Each archived report's balance/equity curve is kept as a memory-mappable .npy file for the charts
+CURVE_DIR = os.environ.get('MT5_CURVE_DIR', 'curves')
+MAX_CURVE_WIDTH = 4000
+MAX_CURVES = 1000
+curve_store = None
+
+# Runs are abandoned after MT5_TIMEOUT_MULTIPLE times their expected duration (learned from
+# earlier runs) and retried with exponential backoff when they time out or the terminal dies
+timeout_policy = TimeoutPolicy(
+    DurationModel(startup_seconds=float(os.environ.get('MT5_STARTUP_SECONDS', 10))),
+    multiple=float(os.environ.get('MT5_TIMEOUT_MULTIPLE', 3)),
+    min_timeout=float(os.environ.get('MT5_MIN_TIMEOUT', 30)),
+    max_retries=int(os.environ.get('MT5_MAX_RETRIES', 2)),
+    retry_backoff=float(os.environ.get('MT5_RETRY_BACKOFF', 5)),
+)
+RETRY_OUTCOMES = ('timeout', 'exited')
+
+# With MT5_PROGRESS_DIR set (the terminal's Common/Files), EAs that take a ProgressFile input
+# append balance and equity there while they run (see README), and a run is stopped as soon as
+# its equity drawdown or loss crosses these limits; sweeps can set their own
+PROGRESS_DIR = os.environ.get('MT5_PROGRESS_DIR')
+PROGRESS_INPUT = os.environ.get('MT5_PROGRESS_INPUT', 'ProgressFile')
+ABORT_LIMITS = abort_limits(defaults={
+    'max_drawdown_percent': os.environ.get('MT5_ABORT_DRAWDOWN_PCT'),
+    'max_loss': os.environ.get('MT5_ABORT_LOSS'),
+})
+
+# Worker-pool mode: a directory of portable terminal installs, one per sub-directory
+WORKERS_DIR = os.environ.get('MT5_WORKERS_DIR')
+WORKER_TERMINAL_EXE = os.environ.get('MT5_WORKER_TERMINAL', 'terminal64.exe')
+# With a template install, worker directories are built from it (linked, not copied)
+WORKER_TEMPLATE = os.environ.get('MT5_WORKER_TEMPLATE')
+WORKER_COUNT = int(os.environ.get('MT5_WORKER_COUNT', os.cpu_count() or 1))
+# Coordinator mode: backtests go to worker agents (agent.py) on other hosts instead of local terminals;
+# agents that miss heartbeats for MT5_AGENT_TIMEOUT seconds have their work rescheduled
+COORDINATOR = os.environ.get('MT5_COORDINATOR', '').lower() in ('1', 'true', 'yes')
+AGENT_TIMEOUT = float(os.environ.get('MT5_AGENT_TIMEOUT', 30))
+worker_pool = None
+default_terminal_lock = threading.Lock()
+
+# Parameter sweeps and their configurations are kept on disk, not in memory
+SWEEP_DB_PATH = os.environ.get('MT5_SWEEP_DB', 'sweeps.sqlite')
+sweep_store = None
+running_sweeps = set()
+
+# Successive-halving optimizations (in memory; candidates are bounded)
+MAX_OPTIMIZER_CANDIDATES = 20000
+optimizations = {}
+
+# Backtests run in the background. Jobs run side by side, but every terminal run waits for a
+# slot from the scheduler: interactive form submissions first, then fair share between users.
+# MT5_INTERACTIVE_SLOTS slots are kept free of batch work (API batches, sweeps, optimizations).
+job_manager = JobManager(max_concurrent_jobs=int(os.environ.get('MT5_MAX_JOBS', 16)))
+scheduler = BacktestScheduler(capacity=lambda: worker_pool.size if worker_pool else 1,
+                              reserved=int(os.environ.get('MT5_INTERACTIVE_SLOTS', 0)))
+
+# Optional per-job trace log: one JSON line per job event in MT5_TRACE_DIR/<job_id>.jsonl
+TRACE_DIR = os.environ.get('MT5_TRACE_DIR')
+job_tracer = JobTracer(TRACE_DIR) if TRACE_DIR else None
+
+registry.register(Gauge('mt5_jobs_queued', 'Jobs waiting to start', job_manager.queued_count))
+registry.register(Gauge('mt5_jobs_running', 'Jobs currently running', job_manager.running_count))
+registry.register(Gauge('mt5_scheduler_waiting', 'Backtests waiting for a terminal slot', scheduler.waiting_count))
+registry.register(Gauge('mt5_workers', 'Terminal workers in the pool',
+                        lambda: worker_pool.size if worker_pool else 0))
+registry.register(Gauge('mt5_workers_busy', 'Terminal workers currently running a backtest',
+                        lambda: worker_pool.busy if worker_pool else 0))
 
 def load_mql5_inputs():
-    """Load and parse MQL5 inputs"""
+    """Load and parse MQL5 inputs (unchanged files come from the parse cache)"""
     global mql5_inputs
+    parser = MQL5InputParser(MQL5_FILE_PATH)
     try:
-        parser = MQL5InputParser(MQL5_FILE_PATH)
         mql5_inputs = parser.get_grouped_inputs()
         return True
     except Exception as e:
         print(f"Error parsing MQL5 file: {e}")
         mql5_inputs = {}
         return False
+    finally:
+        if input_watcher:
+            # Follow the include graph as it is now
+            input_watcher.watch([MQL5_FILE_PATH] + parser.files)
+
+def get_input_schema():
+    """Validators for the current EA inputs, recompiled only when the inputs are reloaded"""
+    global input_schema
+    if input_schema is None or input_schema.source is not mql5_inputs:
+        input_schema = InputSchema(mql5_inputs)
+    return input_schema
+
+def start_input_watcher():
+    """Refresh mql5_inputs automatically whenever the EA or one of its includes changes"""
+    global input_watcher
+    input_watcher = MQL5InputWatcher(load_mql5_inputs)
+    input_watcher.start()
+    input_watcher.watch([MQL5_FILE_PATH])
+    return input_watcher
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.monotonic()
+
+@app.after_request
+def observe_request(response):
+    if 'request_start' in g:
+        HTTP_REQUEST_SECONDS.observe(time.monotonic() - g.request_start, request.endpoint or 'unknown')
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics: run outcomes, phase durations, queue depth and busy workers"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def index():
@@ -47,27 +203,17 @@ def debug_enums():
     global mql5_inputs
     
     try:
+        # Served from the parse cache unless a file in the include graph changed
         parser = MQL5InputParser(MQL5_FILE_PATH)
-        
-        # Read the file content
-        with open(MQL5_FILE_PATH, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
-        # Remove comments
-        clean_content = parser._remove_comments(content)
-        
-        # Parse enums
-        enums = parser._parse_enums(clean_content)
-        
-        # Parse inputs
         inputs = parser.parse_inputs()
         
         debug_info = {
             'file_exists': os.path.exists(MQL5_FILE_PATH),
             'file_path': MQL5_FILE_PATH,
-            'content_length': len(content),
-            'clean_content_length': len(clean_content),
-            'enums_found': enums,
+            'content_length': os.path.getsize(MQL5_FILE_PATH),
+            'files': parser.files,
+            'parse_cache': cache_stats,
+            'enums_found': parser.enums,
             'total_inputs': len(inputs),
             'enum_inputs': [inp for inp in inputs if inp.get('is_enum', False)]
         }
@@ -83,29 +229,13 @@ def reload_inputs():
     success = load_mql5_inputs()
     return jsonify({'success': success, 'groups': list(mql5_inputs.keys()) if mql5_inputs else []})
 
-def time_to_timestamp(hour, minute, base_date="2025-01-01"):
-    """Convert hour and minute to timestamp with base date 2025-01-01"""
-    try:
-        dt = datetime.strptime(f"{base_date} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M")
-        return int(dt.timestamp())
-    except ValueError:
-        return 0
-
-def datetime_to_timestamp(datetime_str: str) -> int:
-    """Convert HTML datetime-local format to Unix timestamp"""
-    try:
-        # Parse HTML datetime-local format: YYYY-MM-DDTHH:MM
-        dt = datetime.strptime(datetime_str, "%Y-%m-%dT%H:%M")
-        return int(dt.timestamp())
-    except ValueError:
-        # Return default timestamp if parsing fails
-        return int(datetime(2025, 1, 1, 0, 0).timestamp())
-    """Convert hour and minute to timestamp with base date 2025-01-01"""
-    try:
-        dt = datetime.strptime(f"{base_date} {hour:02d}:{minute:02d}", "%Y-%m-%d %H:%M")
-        return int(dt.timestamp())
-    except ValueError:
-        return 0
+@app.route('/clear_cache')
+def clear_cache():
+    """Drop every cached backtest result"""
+    if result_cache is None:
+        return jsonify({'success': False, 'error': 'Result cache is disabled'})
+    result_cache.clear()
+    return jsonify({'success': True})
 
 def parse_date(date_str):
     """Parse date string in format YYYY.MM.DD to datetime object"""
@@ -196,6 +326,7 @@ Leverage=100
 ExecutionMode=0
 OptimizationCriterion=0
 Visual=0
+ShutdownTerminal=1
 [TesterInputs]
 """
 
@@ -207,89 +338,390 @@ Visual=0
     with open(ini_file_path, 'w', encoding='utf-16') as f:
         f.write(ini_content)
 
-def run_single_backtest(report_name, from_date, to_date, **kwargs):
-    """Run a single backtest and return results"""
-    mt4_path = r"C:\Program Files\MetaTrader 5\terminal64.exe"
-    
+def terminal_command(terminal_path):
+    """Build the command that launches a terminal (or a .py stand-in for one)"""
+    if terminal_path.endswith('.py'):
+        return [sys.executable, terminal_path]
+    return [terminal_path]
+
+def run_single_backtest(report_name, from_date, to_date, terminal_path=None, data_dir=None,
+                        ini_path="config.ini", portable=False, abort=None, **kwargs):
+    """Run a single backtest and return results.
+
+    Runs that time out or whose terminal dies are retried up to
+    timeout_policy.max_retries times with exponential backoff. abort overrides
+    ABORT_LIMITS for this run.
+    """
+    if terminal_path is None and data_dir is None:
+        # The default terminal shares one config.ini and data dir, so runs on it take turns
+        with default_terminal_lock:
+            return run_single_backtest(report_name, from_date, to_date, TERMINAL_PATH, TERMINAL_DATA_DIR,
+                                       ini_path, portable, abort, **kwargs)
+    terminal_path = terminal_path or TERMINAL_PATH
+    data_dir = data_dir or TERMINAL_DATA_DIR
+    timeout = timeout_policy.timeout(kwargs.get('expert', 'prev-2.ex5'), kwargs.get('symbol', 'XAUUSD'),
+                                     kwargs.get('period', 'H1'), from_date, to_date)
+
+    attempt = 1
+    while True:
+        result = run_terminal(report_name, from_date, to_date, terminal_path, data_dir, ini_path, portable,
+                              timeout, abort, **kwargs)
+        if result['success'] or result['outcome'] not in RETRY_OUTCOMES or attempt > timeout_policy.max_retries:
+            break
+        delay = timeout_policy.backoff(attempt)
+        print(f"Backtest {report_name} {result['outcome']} ({result['error']}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
+
+    result['attempts'] = attempt
+    if result['success']:
+        timeout_policy.observe(kwargs.get('expert', 'prev-2.ex5'), kwargs.get('symbol', 'XAUUSD'),
+                               kwargs.get('period', 'H1'), from_date, to_date, result['duration'])
+    return result
+
+def run_terminal(report_name, from_date, to_date, terminal_path, data_dir, ini_path, portable, timeout,
+                 abort=None, **kwargs):
+    """Launch the terminal once for a backtest, giving up on the report after timeout seconds"""
+    started_at = time.time()
+    timer = PhaseTimer()
+    monitor = progress_monitor(report_name, abort, kwargs.get('deposit', 50000))
+    if monitor:
+        kwargs[PROGRESS_INPUT] = os.path.basename(monitor.path)
+
     # Create the complete .ini file with form data
+    timer.start('write_ini')
     create_dynamic_ini_file(
-        ini_file_path="config.ini",
+        ini_file_path=ini_path,
         report=report_name,
         from_date=from_date,
         to_date=to_date,
         **kwargs
     )
     
-    ini_path = r"config.ini"
-    report_path = rf"C:\Users\UserName\AppData\Roaming\MetaQuotes\Terminal\D0E8209F77C8CF37AD8BF550E51FF075\{report_name}"
+    report_path = os.path.join(data_dir, report_name)
+    # Drop a report left over from an earlier run so it is not mistaken for this one
+    if os.path.exists(report_path):
+        os.remove(report_path)
 
-    # Launch MetaTrader with config
-    mt_process = subprocess.Popen([mt4_path, f"/config:{ini_path}"])
+    result = None
+    try:
+        # Launch MetaTrader with config
+        timer.start('launch')
+        command = terminal_command(terminal_path) + [f"/config:{ini_path}"]
+        if portable:
+            command.append("/portable")
+        mt_process = subprocess.Popen(command)
 
-    # Wait for report to be created and stabilized
-    print(f"Waiting for report file {report_name} to be ready...")
-    if wait_for_file(report_path):
-        mt_process.terminate()
-        try:
-            with open(report_path, encoding='utf-16') as f:
-                soup = BeautifulSoup(f, 'html.parser')
+        # Wait for the report to be finalized (or the terminal to exit)
+        timer.start('tester')
+        print(f"Waiting for report file {report_name} to be ready...")
+        completion = wait_for_report(report_path, mt_process, timeout=timeout, monitor=monitor)
+        timer.start('shutdown')
+        # A terminal that never produced its report is hung (or being aborted); do not wait for it to shut down
+        exit_code = stop_terminal(mt_process, grace=2 if completion.ready else 0)
 
-            profit = soup.find('td', string='Total Net Profit:')
-            draw = soup.find('td', string='Balance Drawdown Maximal:')
-            
-            if profit and draw:
-                profitValue = profit.find_next_sibling('td').text.strip()
-                drawValue = draw.find_next_sibling('td').text.strip()
-                return {
-                    'success': True,
-                    'profit': profitValue,
-                    'drawdown': drawValue,
-                    'period': f"{from_date} to {to_date}"
-                }
+        if completion.reason == 'aborted':
+            print(f"Backtest {report_name} aborted: {monitor.breach}")
+            result = {'success': False, 'outcome': 'aborted', 'error': f'aborted: threshold, {monitor.breach}',
+                      'metrics': monitor.metrics()}
+        elif not completion.ready:
+            if completion.reason == 'exited':
+                error = f'Terminal exited with code {exit_code} before writing the report'
             else:
-                return {
-                    'success': False,
-                    'error': 'Could not find profit data in report',
-                    'period': f"{from_date} to {to_date}"
-                }
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f'Error reading report: {str(e)}',
-                'period': f"{from_date} to {to_date}"
-            }
+                error = f'Timeout waiting for report after {timeout:.0f}s'
+            result = {'success': False, 'error': error, 'outcome': completion.reason}
+        else:
+            timer.start('parse_report')
+            result = parse_report(report_path)
+            if report_archive is not None:
+                timer.start('archive')
+                archive_report(result, report_path)
+    finally:
+        if monitor:
+            monitor.remove()
+        if portable:
+            # Worker directories are reused for every job; only a report a result still points at is kept
+            keep_report = result is not None and result.get('report_path') == report_path
+            remove_run_files(ini_path, report_path, keep_report)
+
+    timings = timer.stop()
+    result.update({
+        'exit_code': exit_code,
+        'period': f"{from_date} to {to_date}",
+        'started_at': started_at,
+        'duration': round(sum(timings.values()), 3),
+        'timings': timings,
+    })
+    observe_backtest(result)
+    return result
+
+def remove_run_files(ini_path, report_path, keep_report=False):
+    """Delete a run's .ini, the images the tester saves beside its report, and the report unless kept"""
+    stem = os.path.splitext(report_path)[0]
+    paths = [ini_path] + glob.glob(glob.escape(stem) + '.png') + glob.glob(glob.escape(stem) + '-*.png')
+    if not keep_report:
+        paths.append(report_path)
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def progress_monitor(report_name, abort, deposit):
+    """Monitor for a run's progress file when early abort is configured, or None"""
+    limits = abort_limits(abort, ABORT_LIMITS)
+    if not PROGRESS_DIR or not limits:
+        return None
+    # Runs on different terminals share the Common/Files directory, so every run gets its own file
+    name = f"{os.path.splitext(report_name)[0]}_{uuid.uuid4().hex[:8]}.progress.csv"
+    return ProgressMonitor(os.path.join(PROGRESS_DIR, name), deposit, **limits)
+
+def parse_report(report_path):
+    """Result of a finished tester report: net profit, drawdown and every summary metric"""
+    try:
+        # Only the summary section is read; the deal tables are never parsed
+        fields, metrics = read_report_summary(report_path)
+    except Exception as e:
+        return {'success': False, 'outcome': 'failed', 'error': f'Error reading report: {str(e)}'}
+    if 'Total Net Profit' not in fields or 'Balance Drawdown Maximal' not in fields:
+        return {'success': False, 'outcome': 'failed', 'error': 'Could not find profit data in report'}
+    return {
+        'success': True,
+        'outcome': 'success',
+        'profit': fields['Total Net Profit'],
+        'drawdown': fields['Balance Drawdown Maximal'],
+        'metrics': metrics,
+        'report_path': report_path,
+    }
+
+def archive_report(result, report_path, remove_source=True):
+    """Move (or copy) a parsed report into the archive, pointing the result at the archived copy"""
+    try:
+        digest = report_archive.add(report_path, remove_source=remove_source)
+    except OSError as e:
+        print(f"Could not archive report {report_path}: {e}")
+        return
+    result['report_hash'] = digest
+    result['report_path'] = report_archive.path(digest)
+    load_curve(digest)
+
+def load_curve(digest):
+    """Equity curve of an archived report, extracted from the report the first time it is asked for"""
+    if curve_store is None:
+        return None
+    curve = curve_store.load(digest)
+    if curve is not None:
+        return curve
+    path = report_archive.get(digest) if report_archive else None
+    if path is None:
+        return None
+    try:
+        curve_store.save(digest, extract_curve(path))
+    except Exception as e:
+        print(f"Could not extract equity curve from {path}: {e}")
+        return None
+    return curve_store.load(digest)
+
+def observe_backtest(result):
+    """Count a finished terminal run and record its phase durations"""
+    BACKTEST_RUNS.inc(result['outcome'])
+    BACKTEST_SECONDS.observe(result['duration'])
+    for phase, seconds in result['timings'].items():
+        BACKTEST_PHASE_SECONDS.observe(seconds, phase)
+
+def backtest_cache_params(from_date, to_date, **kwargs):
+    """Normalized create_dynamic_ini_file parameters that decide a backtest's outcome"""
+    params = {
+        name: param.default
+        for name, param in inspect.signature(create_dynamic_ini_file).parameters.items()
+        if param.default is not inspect.Parameter.empty
+    }
+    params.update(kwargs)
+    params['from_date'] = from_date
+    params['to_date'] = to_date
+    # The report name only decides where the output goes
+    params.pop('report', None)
+    return params
+
+def run_cached_backtest(report_name, from_date, to_date, ticket=None, abort=None, launch=None, **kwargs):
+    """Run a backtest, reusing the cached result of an identical earlier run.
+
+    On the default terminal a cache miss waits for a scheduler slot for ticket;
+    a worker pool passes launch, which takes the slot and a terminal only on a
+    miss. abort limits do not change the cache key; aborted runs are never cached.
+    """
+    location = {name: kwargs.pop(name) for name in ('terminal_path', 'data_dir', 'ini_path', 'portable') if name in kwargs}
+
+    def run():
+        if launch:
+            return launch(report_name, from_date, to_date, ticket=ticket, abort=abort, **kwargs)
+        if location:
+            return run_single_backtest(report_name, from_date, to_date, abort=abort, **location, **kwargs)
+        with scheduler.slot(ticket):
+            return run_single_backtest(report_name, from_date, to_date, abort=abort, **kwargs)
+
+    if result_cache is None:
+        return run()
+    expert_path = os.path.join(EXPERTS_DIR, kwargs.get('expert', 'prev-2.ex5'))
+    key = result_cache.make_key(expert_path, backtest_cache_params(from_date, to_date, **kwargs))
+    if key is None:
+        return run()
+    result = result_cache.get_or_run(key, run)
+    if result['cached']:
+        BACKTEST_RUNS.inc('cached')
+    return result
+
+def load_result_cache():
+    """Open the persistent result cache"""
+    global result_cache
+    try:
+        result_cache = BacktestCache(CACHE_PATH)
+    except Exception as e:
+        print(f"Result cache disabled: {e}")
+        result_cache = None
+    return result_cache
+
+def load_report_archive():
+    """Open the report archive"""
+    global report_archive
+    try:
+        report_archive = ReportArchive(REPORT_ARCHIVE_DIR, max_bytes=ARCHIVE_MAX_BYTES, max_age=ARCHIVE_MAX_AGE)
+    except Exception as e:
+        print(f"Report archive disabled: {e}")
+        report_archive = None
+    return report_archive
+
+def load_curve_store():
+    """Open the equity curve store"""
+    global curve_store
+    try:
+        curve_store = CurveStore(CURVE_DIR)
+    except Exception as e:
+        print(f"Equity curves disabled: {e}")
+        curve_store = None
+    return curve_store
+
+def load_run_store():
+    """Open the persistent run history and learn expected run durations from it"""
+    global run_store
+    try:
+        run_store = RunStore(RUNS_DB_PATH)
+    except Exception as e:
+        print(f"Run history disabled: {e}")
+        run_store = None
+        return None
+    for run in run_store.recent_durations():
+        timeout_policy.observe(run['expert'], run['symbol'], run['timeframe'], run['from_date'], run['to_date'],
+                               run['duration'])
+    return run_store
+
+def record_run(result, from_date, to_date, params, **context):
+    """Add a backtest result to the run history (period_name, job_id or sweep_id as context)"""
+    if run_store is None:
+        return None
+    try:
+        ea_hash = file_hash(os.path.join(EXPERTS_DIR, params.get('expert', 'prev-2.ex5')))
+    except OSError:
+        ea_hash = None
+    try:
+        return run_store.add_run(result, from_date, to_date, params, ea_hash=ea_hash, **context)
+    except Exception as e:
+        print(f"Could not record run: {e}")
+        return None
+
+def stop_terminal(process, grace=2, kill_grace=5):
+    """Give the terminal a moment to exit on its own, then terminate it, then kill it.
+
+    The process is always waited for, so no zombie is left behind. Returns the
+    terminal's exit code, or None if it had to be stopped.
+    """
+    try:
+        return process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    process.terminate()
+    try:
+        process.wait(timeout=kill_grace)
+    except subprocess.TimeoutExpired:
+        print(f"Terminal {process.pid} ignored terminate, killing it")
+        process.kill()
+        process.wait()
+    return None
+
+def load_worker_pool():
+    """Build the terminal worker pool when MT5_WORKERS_DIR is configured"""
+    global worker_pool
+    if COORDINATOR:
+        worker_pool = AgentCoordinator(heartbeat_timeout=AGENT_TIMEOUT, on_result=import_agent_report,
+                                       scheduler=scheduler)
+        print("Coordinating remote agents; backtests wait for agents to join")
+        return worker_pool
+    if not WORKERS_DIR:
+        return None
+    if WORKER_TEMPLATE:
+        provision_workers(WORKER_TEMPLATE, WORKERS_DIR, WORKER_COUNT)
+    workers = discover_workers(WORKERS_DIR, WORKER_TERMINAL_EXE)
+    if workers:
+        worker_pool = BacktestWorkerPool(workers, run_single_backtest, scheduler, run_cached=run_cached_backtest)
+        print(f"Worker pool ready with {worker_pool.size} terminals")
     else:
-        mt_process.terminate()
-        return {
-            'success': False,
-            'error': 'Timeout waiting for report',
-            'period': f"{from_date} to {to_date}"
-        }
+        print(f"No terminal installs found in {WORKERS_DIR}, running backtests sequentially")
+    return worker_pool
 
-def wait_for_file(path, timeout=60, poll_interval=1):
-    """Wait until a file exists and stops growing (stable size)."""
-    start_time = time.time()
-    last_size = -1
+def import_agent_report(agent_id, result):
+    """Move the compressed report an agent sent with its result into the local archive"""
+    report_gz = result.pop('report_gz', None)
+    # The agent's path means nothing on this host
+    result.pop('report_path', None)
+    if not report_gz or report_archive is None:
+        return
+    fd, temp_path = tempfile.mkstemp(suffix='.htm')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(gzip.decompress(base64.b64decode(report_gz)))
+        archive_report(result, temp_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
 
-    while time.time() - start_time < timeout:
-        if os.path.exists(path):
-            size = os.path.getsize(path)
-            if size == last_size:
-                return True
-            last_size = size
-        time.sleep(poll_interval)
-    return False
+@app.route('/api/workers', methods=['POST'])
+def create_worker():
+    """Provision one more worker from MT5_WORKER_TEMPLATE and add it to the pool"""
+    global worker_pool
+    if COORDINATOR:
+        return jsonify({'error': 'In coordinator mode workers join by starting agent.py'}), 400
+    if not (WORKERS_DIR and WORKER_TEMPLATE):
+        return jsonify({'error': 'Set MT5_WORKERS_DIR and MT5_WORKER_TEMPLATE to provision workers'}), 400
+    start = time.monotonic()
+    worker_dir = add_worker(WORKER_TEMPLATE, WORKERS_DIR)
+    worker = TerminalWorker(os.path.basename(worker_dir), os.path.join(worker_dir, WORKER_TERMINAL_EXE))
+    if worker_pool:
+        worker_pool.add_worker(worker)
+    else:
+        worker_pool = BacktestWorkerPool([worker], run_single_backtest, scheduler, run_cached=run_cached_backtest)
+    return jsonify({'worker': worker.worker_id, 'workers': worker_pool.size,
+                    'seconds': round(time.monotonic() - start, 3)}), 201
 
 @app.route('/backtest', methods=['POST'])
 def backtest():
-    """Handle dynamic backtest requests"""
+    """Queue a dynamic backtest request and return its job id"""
     global mql5_inputs
     
     # Get general inputs from form
     base_report = request.form.get('report', 'x.htm')
+    if not is_plain_file_name(base_report):
+        return jsonify({'error': 'Report must be a file name without directories'}), 400
     expert = request.form.get('expert', 'prev-2.ex5')
-    symbol = request.form.get('symbol', 'XAUUSD')
-    period = request.form.get('period', 'H1')
+    # Several symbols (comma separated) and timeframes fan out into one job covering every combination
+    symbols = split_list(request.form.getlist('symbol')) or ['XAUUSD']
+    timeframes = split_list(request.form.getlist('period')) or ['H1']
+    unknown = [timeframe for timeframe in timeframes if timeframe not in TIMEFRAMES]
+    if unknown:
+        return jsonify({'error': f"Unknown timeframe {', '.join(unknown)}"}), 400
+    targets = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+    if len(targets) > MAX_TARGETS:
+        return jsonify({'error': f"At most {MAX_TARGETS} symbol and timeframe combinations"}), 400
+    symbol, period = targets[0]
     from_date = request.form.get('from_date', '2025.01.02')
     to_date = request.form.get('to_date', '2025.04.24')
     deposit = int(request.form.get('deposit', 50000))
@@ -300,64 +732,11 @@ def backtest():
         period_type = "weekly"
     elif request.form.get('monthly'):
         period_type = "monthly"
+    # Slice one full-range run into the periods instead of launching once per period
+    single_launch = bool(request.form.get('single_launch'))
     
     # Collect all dynamic inputs from the form
-    dynamic_inputs = {}
-    
-    if mql5_inputs:
-        for group_name, inputs in mql5_inputs.items():
-            for input_var in inputs:
-                var_name = input_var['name']
-                
-                if input_var.get('is_timestamp', False):
-                    # Handle timestamp inputs (convert from HH:MM format)
-                    hour_key = f"{var_name}Hour"
-                    minute_key = f"{var_name}Minute"
-                    
-                    hour = int(request.form.get(hour_key, 0))
-                    minute = int(request.form.get(minute_key, 0))
-                    dynamic_inputs[var_name] = time_to_timestamp(hour, minute)
-                
-                elif input_var.get('is_datetime', False):
-                    # Handle datetime inputs (convert from datetime-local format)
-                    datetime_value = request.form.get(var_name)
-                    if datetime_value:
-                        dynamic_inputs[var_name] = datetime_to_timestamp(datetime_value)
-                    else:
-                        # Use default timestamp if no value provided
-                        dynamic_inputs[var_name] = datetime_to_timestamp("2025-01-01T00:00")
-                    
-                elif input_var.get('is_enum', False):
-                    # Handle enum inputs (convert enum name to numeric value)
-                    enum_name = request.form.get(var_name)
-                    if enum_name and input_var.get('enum_values'):
-                        # Get the numeric value for the selected enum
-                        dynamic_inputs[var_name] = input_var['enum_values'].get(enum_name, 0)
-                    else:
-                        # Use default enum numeric value
-                        dynamic_inputs[var_name] = input_var.get('enum_numeric_value', 0)
-                
-                elif input_var['html_type'] == 'checkbox':
-                    # Handle boolean inputs
-                    dynamic_inputs[var_name] = 1 if request.form.get(var_name) else 0
-                    
-                else:
-                    # Handle regular inputs
-                    form_value = request.form.get(var_name)
-                    if form_value is not None:
-                        # Convert to appropriate type
-                        if input_var['mql_type'].lower() in ['int', 'long', 'short', 'char', 'uchar', 'uint', 'ulong', 'ushort']:
-                            try:
-                                dynamic_inputs[var_name] = int(form_value)
-                            except ValueError:
-                                dynamic_inputs[var_name] = input_var['default_value']
-                        elif input_var['mql_type'].lower() in ['double', 'float']:
-                            try:
-                                dynamic_inputs[var_name] = float(form_value)
-                            except ValueError:
-                                dynamic_inputs[var_name] = input_var['default_value']
-                        else:
-                            dynamic_inputs[var_name] = form_value
+    dynamic_inputs = get_input_schema().from_form(request.form)
     
     # Get date ranges based on period type
     date_ranges = get_date_ranges(from_date, to_date, period_type)
@@ -371,31 +750,693 @@ def backtest():
         **dynamic_inputs  # Include all dynamic inputs
     }
     
-    # Run backtests for each date range
-    results = []
-    for period_name, start_date, end_date in date_ranges:
+    # Queue the job and return straight away; results stream in from /jobs/<id>/stream
+    user = request_user(request.form)
+    job = job_manager.submit(run_backtest_job, date_ranges, period_type, base_report, common_params,
+                             single_launch=single_launch, user=user, priority='interactive', targets=targets)
+    trace(job, 'queued', period_type=period_type, periods=job.total, queued_jobs=job_manager.queued_count(),
+          params=common_params, user=user, priority='interactive')
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(job.to_dict()), 202
+    return redirect(url_for('job_results', job_id=job.id))
+
+def split_list(values):
+    """['XAUUSD, XAGUSD', 'EURUSD'] -> ['XAUUSD', 'XAGUSD', 'EURUSD'], dropping blanks and repeats"""
+    items = []
+    for value in values:
+        for item in re.split(r'[\s,;]+', value):
+            if item and item not in items:
+                items.append(item)
+    return items
+
+def request_user(values=None):
+    """Who submitted a request, for fair sharing: the X-User header, a 'user' field, else the client address"""
+    user = request.headers.get('X-User') or (values.get('user') if isinstance(values, dict) else None)
+    return str(user) if user else request.remote_addr or 'anonymous'
+
+@app.route('/api/scheduler')
+def scheduler_status():
+    """Terminal slots in use, backtests waiting for one (best first) and recent wait times"""
+    return jsonify(scheduler.status())
+
+def trace(job, event, **fields):
+    if job_tracer:
+        job_tracer.event(job.id, event, **fields)
+
+def publish_result(job, index, result, common_params):
+    """Record a period result in the run history and trace log, then hand it to the job"""
+    result['symbol'] = common_params.get('symbol')
+    result['timeframe'] = common_params.get('period')
+    record_run(result, result['start_date'], result['end_date'], common_params,
+               period_name=result['period_name'], job_id=job.id)
+    trace(job, 'result', index=index, period_name=result['period_name'], symbol=result['symbol'],
+          timeframe=result['timeframe'], success=result['success'],
+          error=result.get('error'), cached=result.get('cached', False), worker=result.get('worker'),
+          duration=result.get('duration'), timings=result.get('timings'))
+    job.add_result(index, result)
+
+@app.route('/api/backtests', methods=['POST'])
+def create_backtests():
+    """Validate and queue many backtest configurations in one call.
+
+    JSON body: a list of configurations, or {'configs': [...], 'partial': bool}.
+    Each configuration takes report, expert, symbol, period, from_date, to_date,
+    deposit, period_type, single_launch and an 'inputs' object; omitted inputs use
+    their defaults. Invalid items are reported with per-field errors. Unless
+    'partial' is true nothing is queued when any item is invalid.
+    """
+    payload = request.get_json(force=True, silent=True)
+    if isinstance(payload, dict):
+        configs = payload.get('configs')
+        partial = bool(payload.get('partial', False))
+        priority = payload.get('priority', 'batch')
+    else:
+        configs, partial, priority = payload, False, 'batch'
+    if not isinstance(configs, list):
+        return jsonify({'error': 'Expected a list of configurations'}), 400
+    if priority not in PRIORITIES:
+        return jsonify({'error': f"priority must be one of {', '.join(PRIORITIES)}"}), 400
+    user = request_user(payload if isinstance(payload, dict) else None)
+
+    if mql5_inputs is None:
+        load_mql5_inputs()
+    schema = get_input_schema()
+    valid = []
+    errors = []
+    for index, config in enumerate(configs):
+        settings, params, config_errors = schema.validate(config)
+        if config_errors:
+            errors.append({'index': index, 'errors': config_errors})
+        else:
+            valid.append((index, settings, params))
+
+    if errors and not partial:
+        return jsonify({'queued': [], 'errors': errors}), 400
+
+    submissions = [
+        ((run_backtest_job, get_date_ranges(settings['from_date'], settings['to_date'], settings['period_type']),
+          settings['period_type'], settings['report'], params),
+         {'single_launch': settings['single_launch'], 'user': user, 'priority': priority,
+          'targets': settings['targets']})
+        for _, settings, params in valid
+    ]
+    jobs = job_manager.submit_many(submissions)
+    queued = []
+    for (index, settings, params), job in zip(valid, jobs):
+        trace(job, 'queued', period_type=settings['period_type'], periods=job.total, params=params,
+              user=user, priority=priority)
+        queued.append({'index': index, 'job_id': job.id, 'periods': job.total})
+    return jsonify({'queued': queued, 'errors': errors}), 202 if queued else 400
+
+def run_backtest_job(job, base_report, common_params, single_launch=False, user=None, priority='batch'):
+    """Run every period of a job, publishing each result as soon as it completes"""
+    ticket = Ticket(user, priority, label=f"job {job.id}")
+    JOB_QUEUE_WAIT_SECONDS.observe(job.started_at - job.created_at)
+    trace(job, 'started', queue_wait=round(job.started_at - job.created_at, 4), periods=job.total,
+          single_launch=single_launch, workers=worker_pool.size if worker_pool else 1)
+    try:
+        run_job_periods(job, base_report, common_params, single_launch, ticket)
+    except Exception as e:
+        trace(job, 'failed', error=str(e))
+        raise
+    trace(job, 'finished', duration=round(time.time() - job.started_at, 4))
+
+def run_job_periods(job, base_report, common_params, single_launch=False, ticket=None):
+    """Run every period for each of the job's (symbol, timeframe) targets.
+
+    Targets run one after another on the default terminal, so each symbol's
+    history stays in the terminal's cache for all of its periods; with workers
+    they run side by side and the scheduler shares out the terminals.
+    """
+    if len(job.targets) <= 1:
+        run_target_periods(job, base_report, common_params, 0, single_launch, ticket)
+        return
+
+    def run_target(target_index, symbol, timeframe):
+        params = {**common_params, 'symbol': symbol, 'period': timeframe}
+        report = f"{base_report.split('.')[0]}_{symbol}_{timeframe}.htm"
+        run_target_periods(job, report, params, target_index * len(job.date_ranges), single_launch, ticket)
+
+    if worker_pool:
+        with ThreadPoolExecutor(max_workers=len(job.targets)) as executor:
+            futures = [executor.submit(run_target, index, symbol, timeframe)
+                       for index, (symbol, timeframe) in enumerate(job.targets)]
+            for future in futures:
+                future.result()
+    else:
+        for index, (symbol, timeframe) in enumerate(job.targets):
+            run_target(index, symbol, timeframe)
+
+def run_target_periods(job, base_report, common_params, offset=0, single_launch=False, ticket=None):
+    """Run the job's periods for one symbol and timeframe, publishing results from index offset"""
+    if single_launch and len(job.date_ranges) > 1:
+        run_sliced_backtest_job(job, base_report, common_params, ticket, offset)
+        return
+
+    if worker_pool:
+        def on_result(index, result):
+            publish_result(job, offset + index, result, common_params)
+
+        worker_pool.run_periods(job.date_ranges, base_report, on_result=on_result, ticket=ticket, **common_params)
+        return
+
+    for index, (period_name, start_date, end_date) in enumerate(job.date_ranges):
         # Create unique report name
         report_name = f"{base_report.split('.')[0]}_{period_name}.htm"
         
-        result = run_single_backtest(
+        result = run_cached_backtest(
             report_name=report_name,
             from_date=start_date,
             to_date=end_date,
+            ticket=ticket,
             **common_params
         )
         
         result['period_name'] = period_name
         result['start_date'] = start_date
         result['end_date'] = end_date
-        results.append(result)
+        publish_result(job, offset + index, result, common_params)
         
-        # Small delay between tests
-        time.sleep(2)
-    
-    # Render results template
-    return render_template('results.html', results=results, period_type=period_type)
+        # Small delay between tests (not needed when the terminal was never launched)
+        if offset + index < job.total - 1 and not result.get('cached'):
+            time.sleep(2)
+
+def run_sliced_backtest_job(job, base_report, common_params, ticket=None, offset=0):
+    """Run one backtest over the whole span and slice its deals into the job's periods"""
+    from_date = job.date_ranges[0][1]
+    to_date = job.date_ranges[-1][2]
+    report_name = f"{base_report.split('.')[0]}_full.htm"
+
+    # The deals table is needed, so this run bypasses the result cache
+    if worker_pool:
+        full = worker_pool.run_single(report_name, from_date, to_date, run_backtest=run_single_backtest,
+                                      ticket=ticket, **common_params)
+    else:
+        with scheduler.slot(ticket):
+            full = run_single_backtest(report_name=report_name, from_date=from_date, to_date=to_date, **common_params)
+
+    if full['success']:
+        try:
+            results = slice_deals(iter_report_deals(full['report_path']), job.date_ranges)
+        except Exception as e:
+            full = {'success': False, 'error': f'Error reading deals from report: {str(e)}'}
+
+    if full['success']:
+        # Every period comes from the one terminal run
+        for result in results:
+            result.update(started_at=full['started_at'], duration=full['duration'], timings=full['timings'],
+                          report_path=full['report_path'], report_hash=full.get('report_hash'))
+    else:
+        results = [
+            {**full, 'period_name': period_name, 'start_date': start_date, 'end_date': end_date,
+             'period': f"{start_date} to {end_date}"}
+            for period_name, start_date, end_date in job.date_ranges
+        ]
+    for index, result in enumerate(results):
+        publish_result(job, offset + index, result, common_params)
+
+@app.route('/jobs/<job_id>')
+def job_results(job_id):
+    """Results page; the table fills in from the job's event stream"""
+    job = job_manager.get(job_id)
+    if job is None:
+        abort(404)
+    return render_template('results.html', job=job, period_type=job.period_type)
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    """JSON status of a job including the results received so far"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    status = job.to_dict()
+    status['results'] = job.results()
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/summary')
+def job_summary(job_id):
+    """Numeric totals across a job's periods: profit, drawdown, win rate and percentiles.
+
+    Jobs over several symbols or timeframes also get a summary per 'SYMBOL TIMEFRAME'.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    results = job.results()
+    summary = period_summary(results)
+    if len(job.targets) > 1:
+        summary['targets'] = {
+            f"{symbol} {timeframe}": period_summary(
+                [r for r in results if (r.get('symbol'), r.get('timeframe')) == (symbol, timeframe)])
+            for symbol, timeframe in job.targets
+        }
+    return jsonify(summary)
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """Server-Sent Events stream pushing each period result as it completes"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+
+    def events():
+        sent = 0
+        while True:
+            new_results, finished = job.wait_for_events(sent)
+            for result in new_results:
+                yield f"event: result\ndata: {json.dumps(result)}\n\n"
+            sent += len(new_results)
+            if finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict())}\n\n"
+                return
+            if not new_results:
+                # Keep-alive comment so proxies do not close an idle stream
+                yield ": keep-alive\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def parse_sweep_request(payload):
+    """(general settings, lazily generated configurations, errors) of a sweep request.
+
+    errors lists a {'field', 'error'} dict for each swept input, fixed input or
+    general setting that fails validation.
+    """
+    if not isinstance(payload, dict):
+        return None, None, [{'field': '', 'error': 'request body must be an object'}]
+    if mql5_inputs is None:
+        load_mql5_inputs()
+    schema = get_input_schema()
+
+    space, errors = SweepSpace.from_spec(schema, payload.get('sweep', {}))
+    numbers = {}
+    for field, default in (('samples', 100), ('deposit', 50000)):
+        try:
+            numbers[field] = positive_int(payload.get(field, default))
+        except ValueError as e:
+            errors.append({'field': field, 'error': str(e)})
+    seed = payload.get('seed')
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, (int, str))):
+        errors.append({'field': 'seed', 'error': 'expected an integer or string'})
+    fixed_inputs = payload.get('inputs', {})
+    if isinstance(fixed_inputs, dict):
+        inputs, input_errors = schema.validate_inputs(fixed_inputs)
+        errors.extend(input_errors)
+    else:
+        errors.append({'field': 'inputs', 'error': 'expected an object'})
+    if errors:
+        return None, None, errors
+
+    if payload.get('mode', 'grid') == 'random':
+        configs = space.sample(numbers['samples'], seed)
+    else:
+        configs = space.grid()
+    settings = {
+        'expert': payload.get('expert', 'prev-2.ex5'),
+        'symbol': payload.get('symbol', 'XAUUSD'),
+        'period': payload.get('period', 'H1'),
+        'from_date': payload.get('from_date', '2025.01.02'),
+        'to_date': payload.get('to_date', '2025.04.24'),
+        'deposit': numbers['deposit'],
+        'inputs': inputs,
+    }
+    if payload.get('abort'):
+        # Validated now, applied over the server's limits when each configuration runs
+        abort_limits(payload['abort'])
+        settings['abort'] = payload['abort']
+    return settings, configs, errors
+
+def settings_params(settings):
+    """create_dynamic_ini_file parameters for a sweep's general settings and fixed inputs"""
+    return {
+        'expert': settings['expert'],
+        'symbol': settings['symbol'],
+        'period': settings['period'],
+        'deposit': settings['deposit'],
+        **settings['inputs']
+    }
+
+def get_sweep_store():
+    global sweep_store
+    if sweep_store is None:
+        sweep_store = SweepStore(SWEEP_DB_PATH)
+    return sweep_store
+
+def start_sweep(sweep_id, user=None):
+    """Run a sweep's pending configurations on a background thread"""
+    if sweep_id in running_sweeps:
+        return False
+    store = get_sweep_store()
+    settings = store.get_sweep(sweep_id)['settings']
+    base_params = settings_params(settings)
+    ticket = Ticket(user, 'batch', label=f"sweep {sweep_id}")
+
+    def run_config(idx, params):
+        report_name = f"sweep{sweep_id}_{idx}.htm"
+        config_params = {**base_params, **params}
+        if worker_pool:
+            result = worker_pool.run_single(report_name, settings['from_date'], settings['to_date'], ticket=ticket,
+                                            abort=settings.get('abort'), **config_params)
+        else:
+            result = run_cached_backtest(report_name, settings['from_date'], settings['to_date'], ticket=ticket,
+                                         abort=settings.get('abort'), **config_params)
+        record_run(result, settings['from_date'], settings['to_date'], config_params, sweep_id=sweep_id)
+        return result
+
+    def run():
+        try:
+            run_sweep(store, sweep_id, run_config, workers=max(worker_pool.size, 1) if worker_pool else 1)
+        except Exception as e:
+            print(f"Sweep {sweep_id} failed: {e}")
+        finally:
+            running_sweeps.discard(sweep_id)
+
+    running_sweeps.add(sweep_id)
+    threading.Thread(target=run, name=f"sweep-{sweep_id}", daemon=True).start()
+    return True
+
+@app.route('/api/sweeps', methods=['POST'])
+def create_sweep():
+    """Start a parameter sweep.
+
+    JSON body: general settings (expert, symbol, period, from_date, to_date, deposit),
+    optional fixed 'inputs', a 'sweep' mapping input names to {'values': [...]},
+    {'range': [start, stop, step]} or {'all': true}, 'mode' ('grid' or 'random' with
+    'samples' and optional 'seed'), the ranking 'metric' and optional 'abort' limits
+    ({'max_drawdown_percent': 30, 'max_loss': 2000}) that stop losing configurations early.
+    """
+    payload = request.get_json(force=True)
+    try:
+        settings, configs, errors = parse_sweep_request(payload)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+    if errors:
+        return jsonify({'error': 'Invalid sweep request', 'errors': errors}), 400
+    store = get_sweep_store()
+    sweep_id = store.create_sweep(settings, payload.get('metric', 'total_net_profit'), configs)
+    start_sweep(sweep_id, request_user(payload))
+    return jsonify(store.get_sweep(sweep_id)), 202
+
+@app.route('/api/sweeps/<int:sweep_id>')
+def sweep_status(sweep_id):
+    """Sweep settings and progress counts"""
+    sweep = get_sweep_store().get_sweep(sweep_id)
+    if sweep is None:
+        return jsonify({'error': f'Unknown sweep {sweep_id}'}), 404
+    sweep['running'] = sweep_id in running_sweeps
+    return jsonify(sweep)
+
+def page_params(args, default_limit, max_limit=1000):
+    """(limit, offset) from a query string; raises ValueError unless both are non-negative integers"""
+    try:
+        limit = int(args.get('limit', default_limit))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError("limit and offset must be integers") from None
+    if limit < 0 or offset < 0:
+        raise ValueError("limit and offset must not be negative")
+    return min(limit, max_limit), offset
+
+@app.route('/api/sweeps/<int:sweep_id>/results')
+def sweep_results(sweep_id):
+    """Completed configurations ranked by the sweep metric (paged with limit/offset)"""
+    store = get_sweep_store()
+    sweep = store.get_sweep(sweep_id)
+    if sweep is None:
+        return jsonify({'error': f'Unknown sweep {sweep_id}'}), 404
+    try:
+        limit, offset = page_params(request.args, 20)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    metric = sweep['metric']
+    return jsonify({'metric': metric, 'results': store.top(sweep_id, metric, limit, offset)})
+
+@app.route('/api/sweeps/<int:sweep_id>/summary')
+def sweep_summary(sweep_id):
+    """Distribution of a metric over a sweep's completed configurations and its sensitivity to each input.
+
+    Query string: metric (default: the sweep's metric), and x and y to add a
+    heatmap of the mean metric over two swept inputs.
+    """
+    store = get_sweep_store()
+    sweep = store.get_sweep(sweep_id)
+    if sweep is None:
+        return jsonify({'error': f'Unknown sweep {sweep_id}'}), 404
+    metric = request.args.get('metric', sweep['metric'])
+    params = store.swept_params(sweep_id)
+    x, y = request.args.get('x'), request.args.get('y')
+    for name in (x, y):
+        if name and name not in params:
+            return jsonify({'error': f'{name} is not a swept input'}), 400
+
+    metric_values, param_values = store.columns(sweep_id, metric, params)
+    values = to_column(metric_values)
+    summary = {
+        'metric': metric,
+        'configs': len(metric_values),
+        'distribution': describe(values),
+        'sensitivity': {param: sensitivity(param_values[param], values) for param in params},
+    }
+    if x and y:
+        try:
+            summary['heatmap'] = heatmap(param_values[x], param_values[y], values)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return jsonify(summary)
+
+@app.route('/api/sweeps/<int:sweep_id>/resume', methods=['POST'])
+def resume_sweep(sweep_id):
+    """Continue an interrupted sweep, skipping configurations that already completed"""
+    if get_sweep_store().get_sweep(sweep_id) is None:
+        return jsonify({'error': f'Unknown sweep {sweep_id}'}), 404
+    return jsonify({'started': start_sweep(sweep_id, request_user(request.get_json(silent=True)))})
+
+@app.route('/api/optimizations', methods=['POST'])
+def create_optimization():
+    """Start a successive-halving optimization.
+
+    Takes the same JSON body as /api/sweeps plus 'eta' (halving factor, default 3)
+    and 'granularity' ('weekly' or 'monthly') for where the windows may end.
+    Candidates are screened on a short window and the best 1/eta promoted to
+    progressively longer windows up to the full date range.
+    """
+    payload = request.get_json(force=True)
+    try:
+        settings, configs, errors = parse_sweep_request(payload)
+        if errors:
+            return jsonify({'error': 'Invalid sweep request', 'errors': errors}), 400
+        candidates = list(itertools.islice(configs, MAX_OPTIMIZER_CANDIDATES + 1))
+        if len(candidates) > MAX_OPTIMIZER_CANDIDATES:
+            raise ValueError(f"At most {MAX_OPTIMIZER_CANDIDATES} candidates; use mode 'random' to sample")
+        granularity = payload.get('granularity', 'weekly')
+        if granularity not in GRANULARITIES:
+            errors.append({'field': 'granularity', 'error': f"expected one of {', '.join(GRANULARITIES)}"})
+        for field in ('from_date', 'to_date'):
+            if not isinstance(settings[field], str) or parse_date(settings[field]) is None:
+                errors.append({'field': field, 'error': 'expected a YYYY.MM.DD date'})
+        date_ranges = [] if errors else get_date_ranges(settings['from_date'], settings['to_date'], granularity)
+        if not errors and not date_ranges:
+            errors.append({'field': 'to_date', 'error': 'must not be before from_date'})
+        if errors:
+            return jsonify({'error': 'Invalid sweep request', 'errors': errors}), 400
+        optimization = OptimizationRun(candidates, date_ranges, payload.get('metric', 'total_net_profit'),
+                                       eta=int(payload.get('eta', 3)))
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    base_params = settings_params(settings)
+    ticket = Ticket(request_user(payload), 'batch', label=f"optimization {optimization.id}")
+
+    def evaluate(index, params, from_date, to_date):
+        report_name = f"opt{optimization.id}_{index}.htm"
+        config_params = {**base_params, **params}
+        if worker_pool:
+            result = worker_pool.run_single(report_name, from_date, to_date, ticket=ticket, **config_params)
+        else:
+            result = run_cached_backtest(report_name, from_date, to_date, ticket=ticket, **config_params)
+        record_run(result, from_date, to_date, config_params)
+        return result
+
+    def run():
+        try:
+            optimization.run(evaluate, workers=max(worker_pool.size, 1) if worker_pool else 1)
+        except Exception as e:
+            print(f"Optimization {optimization.id} failed: {e}")
+
+    optimizations[optimization.id] = optimization
+    threading.Thread(target=run, name=f"optimization-{optimization.id}", daemon=True).start()
+    status = optimization.to_dict()
+    status['url'] = url_for('optimization_page', optimization_id=optimization.id)
+    return jsonify(status), 202
+
+@app.route('/api/optimizations/<optimization_id>')
+def optimization_status(optimization_id):
+    """Rung-by-rung progress, leaders and terminal time of an optimization"""
+    optimization = optimizations.get(optimization_id)
+    if optimization is None:
+        return jsonify({'error': f'Unknown optimization {optimization_id}'}), 404
+    return jsonify(optimization.to_dict())
+
+@app.route('/optimizations/<optimization_id>')
+def optimization_page(optimization_id):
+    """Live view of an optimization including the terminal time it saved"""
+    if optimization_id not in optimizations:
+        abort(404)
+    return render_template('optimization.html', optimization_id=optimization_id)
+
+@app.route('/api/runs')
+def list_runs():
+    """Page through the run history.
+
+    Query string: any run_store.FILTERS key (e.g. symbol, timeframe, ea_hash, job_id,
+    min_profit, max_drawdown), input.<Name>=value to match an EA input, sort (a column,
+    '-' prefix for descending; default -created_at), limit (max 1000) and offset.
+    """
+    if run_store is None:
+        return jsonify({'error': 'Run history is disabled'}), 503
+    args = request.args
+    filters = {name: args[name] for name in FILTERS if name in args}
+    inputs = {name[len('input.'):]: value for name, value in args.items() if name.startswith('input.')}
+    try:
+        for name in ('success', 'cached'):
+            if name in filters:
+                filters[name] = 1 if filters[name].lower() in ('1', 'true', 'yes') else 0
+        limit, offset = page_params(args, 50)
+        page = run_store.query(filters, inputs, args.get('sort', '-created_at'), limit, offset)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+@app.route('/api/runs/<int:run_id>')
+def get_run(run_id):
+    """One recorded run with its inputs and all parsed metrics"""
+    run = run_store.get_run(run_id) if run_store else None
+    if run is None:
+        return jsonify({'error': f'Unknown run {run_id}'}), 404
+    return jsonify(run)
+
+@app.route('/api/agents/heartbeat', methods=['POST'])
+def agent_heartbeat():
+    """Register or refresh a worker agent: {'agent_id', 'url', 'capacity', 'instance'}"""
+    if not COORDINATOR:
+        return jsonify({'error': 'Not running as a coordinator (set MT5_COORDINATOR=1)'}), 409
+    payload = request.get_json(force=True, silent=True) or {}
+    try:
+        worker_pool.heartbeat(str(payload['agent_id']), payload['url'], int(payload['capacity']),
+                              payload['instance'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Expected agent_id, url, capacity and instance'}), 400
+    return jsonify({'ok': True})
+
+@app.route('/api/agents/<agent_id>/results', methods=['POST'])
+def agent_result(agent_id):
+    """Result of a task dispatched to an agent: {'task_id', 'result'}"""
+    if not COORDINATOR:
+        return jsonify({'error': 'Not running as a coordinator (set MT5_COORDINATOR=1)'}), 409
+    payload = request.get_json(force=True, silent=True) or {}
+    if not isinstance(payload.get('result'), dict):
+        return jsonify({'error': 'Expected task_id and result'}), 400
+    accepted = worker_pool.complete(agent_id, payload.get('task_id'), payload['result'])
+    return jsonify({'accepted': accepted})
+
+@app.route('/api/agents')
+def list_agents():
+    """Known worker agents with their capacity, running tasks and liveness"""
+    if not COORDINATOR:
+        return jsonify({'error': 'Not running as a coordinator (set MT5_COORDINATOR=1)'}), 409
+    return jsonify({'agents': worker_pool.agent_status(), 'queued': worker_pool.queued})
+
+@app.route('/reports/<digest>')
+def archived_report(digest):
+    """An archived tester report as the terminal wrote it, decompressed while it is sent"""
+    path = report_archive.get(digest) if report_archive else None
+    if path is None:
+        return jsonify({'error': f'Unknown or expired report {digest}'}), 404
+    encoding = detect_encoding(path)
+
+    def stream():
+        with open_report(path) as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                yield chunk
+
+    charset = 'utf-16' if encoding == 'utf-16' else 'utf-8'
+    return Response(stream(), content_type=f'text/html; charset={charset}')
+
+@app.route('/api/reports/<digest>')
+def archived_report_summary(digest):
+    """Summary fields and metrics of an archived report; the deal tables are never decompressed"""
+    path = report_archive.get(digest) if report_archive else None
+    if path is None:
+        return jsonify({'error': f'Unknown or expired report {digest}'}), 404
+    fields, metrics = read_report_summary(path)
+    return jsonify({'report_hash': digest, 'fields': fields, 'metrics': metrics})
+
+@app.route('/api/reports')
+def report_archive_stats():
+    """Size of the report archive and its retention limits"""
+    if report_archive is None:
+        return jsonify({'error': 'Report archive is disabled'}), 503
+    return jsonify(report_archive.stats())
+
+def curve_points(digest, width, column):
+    """A curve downsampled for drawing as {'t': [...], 'v': [...]}, or None if it is unknown"""
+    curve = load_curve(digest)
+    if curve is None:
+        return None
+    if not len(curve):
+        return {'t': [], 'v': []}
+    times, values = downsample(curve, width, column)
+    return {'t': times.tolist(), 'v': [round(v, 2) for v in values.tolist()]}
+
+def curve_request_options(values):
+    """(width, column) of a curve request, or raises ValueError"""
+    width = int(values.get('width', 600))
+    column = values.get('column', 'balance')
+    if not 2 <= width <= MAX_CURVE_WIDTH:
+        raise ValueError(f"width must be between 2 and {MAX_CURVE_WIDTH}")
+    if column not in CURVE_COLUMNS:
+        raise ValueError(f"column must be one of {', '.join(CURVE_COLUMNS)}")
+    return width, column
+
+@app.route('/api/curves/<digest>')
+def equity_curve(digest):
+    """One report's equity curve, downsampled to about width points"""
+    try:
+        width, column = curve_request_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    points = curve_points(digest, width, column)
+    if points is None:
+        return jsonify({'error': f'No equity curve for report {digest}'}), 404
+    return jsonify({'report_hash': digest, 'column': column, **points})
+
+@app.route('/api/curves', methods=['POST'])
+def equity_curves():
+    """Many reports' curves in one response, for overlaying: {"hashes": [...], "width": 600}"""
+    payload = request.get_json(silent=True) or {}
+    hashes = payload.get('hashes')
+    if not isinstance(hashes, list) or not hashes:
+        return jsonify({'error': 'hashes must be a non-empty list of report hashes'}), 400
+    if len(hashes) > MAX_CURVES:
+        return jsonify({'error': f'At most {MAX_CURVES} curves per request'}), 400
+    try:
+        width, column = curve_request_options(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    curves = {}
+    for digest in dict.fromkeys(map(str, hashes)):
+        points = curve_points(digest, width, column)
+        if points is not None:
+            curves[digest] = points
+    return jsonify({'column': column, 'width': width, 'curves': curves})
 
 if __name__ == "__main__":
-    # Load MQL5 inputs on startup
+    # Load MQL5 inputs on startup and keep them in sync with the source files
+    start_input_watcher()
     load_mql5_inputs()
-    app.run(debug=True)
\ No newline at end of file
+    load_result_cache()
+    load_run_store()
+    load_report_archive()
+    load_curve_store()
+    load_worker_pool()
+    app.run(debug=True, threaded=True)
\ No newline at end of file
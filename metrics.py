@@ -0,0 +1,162 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Bucket upper bounds in seconds, from a fast .ini write up to a long tester run
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+
+class Gauge:
+    """Point-in-time value read from a callback when scraped"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, read=None):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def samples(self):
+        if self.read is None:
+            return []
+        return [(self.name, '', self.read())]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self._series.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_values] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    labels = _format_labels(self.labels, key, [f'le="{_format_value(bound)}"'])
+                    samples.append((f"{self.name}_bucket", labels, cumulative))
+                samples.append((f"{self.name}_sum", _format_labels(self.labels, key), round(total, 6)))
+                samples.append((f"{self.name}_count", _format_labels(self.labels, key), cumulative))
+        return samples
+
+
+class Registry:
+    """The set of metrics exposed at /metrics"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+BACKTEST_RUNS = registry.register(Counter(
+    'mt5_backtest_runs_total', 'Backtests by outcome (success, failed, timeout, exited, cached)', ['outcome']))
+BACKTEST_PHASE_SECONDS = registry.register(Histogram(
+    'mt5_backtest_phase_seconds', 'Time spent in each phase of a terminal run', ['phase']))
+BACKTEST_SECONDS = registry.register(Histogram(
+    'mt5_backtest_seconds', 'Wall-clock time of a terminal run'))
+JOB_QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    'mt5_job_queue_wait_seconds', 'Time jobs spent queued before starting'))
+SCHEDULER_WAIT_SECONDS = registry.register(Histogram(
+    'mt5_scheduler_wait_seconds', 'Time backtests waited for a terminal slot', ['priority']))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    'mt5_http_request_seconds', 'Time spent in request handlers', ['endpoint']))
+
+
+class PhaseTimer:
+    """Accumulates named phase durations into a dict"""
+
+    def __init__(self):
+        self.timings = {}
+        self._phase = None
+        self._start = None
+
+    def start(self, phase):
+        """End the current phase (if any) and start timing the next one"""
+        now = time.monotonic()
+        if self._phase is not None:
+            self.timings[self._phase] = round(self.timings.get(self._phase, 0) + now - self._start, 4)
+        self._phase = phase
+        self._start = now
+
+    def stop(self):
+        self.start(None)
+        return self.timings
+
+
+class JobTracer:
+    """Writes one JSON line per job event to <trace_dir>/<job_id>.jsonl"""
+
+    def __init__(self, trace_dir):
+        self.trace_dir = trace_dir
+        self._lock = threading.Lock()
+        os.makedirs(trace_dir, exist_ok=True)
+
+    def event(self, job_id, event, **fields):
+        record = {'ts': round(time.time(), 4), 'job_id': job_id, 'event': event, **fields}
+        path = os.path.join(self.trace_dir, f"{job_id}.jsonl")
+        with self._lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=str) + '\n')
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from sweep import LOWER_IS_BETTER
+
+# Period boundaries the halving windows may end on
+GRANULARITIES = ('weekly', 'monthly')
+
+
+def halving_windows(date_ranges, rungs, eta):
+    """(from_date, to_date) windows that grow by eta per rung and end at the full span.
+
+    date_ranges comes from get_date_ranges, so every window ends on a period
+    boundary; rung 0 covers ceil(n / eta ** (rungs - 1)) periods.
+    """
+    from_date = date_ranges[0][1]
+    windows = []
+    for rung in range(rungs):
+        periods = max(1, math.ceil(len(date_ranges) / eta ** (rungs - 1 - rung)))
+        window = (from_date, date_ranges[min(periods, len(date_ranges)) - 1][2])
+        if not windows or windows[-1] != window:
+            windows.append(window)
+    return windows
+
+
+def rung_count(candidates, periods, eta):
+    """Rungs needed to halve candidates down to one, limited by how short the first window can be"""
+    by_candidates = math.ceil(math.log(max(candidates, 1), eta)) + 1 if candidates > 1 else 1
+    by_periods = math.floor(math.log(max(periods, 1), eta)) + 1
+    return max(1, min(by_candidates, by_periods))
+
+
+class OptimizationRun:
+    """Successive halving over a fixed candidate list.
+
+    Every candidate is evaluated on a short window, the best 1/eta are promoted to
+    a window eta times longer, and so on until the survivors run over the full span.
+    """
+
+    def __init__(self, candidates, date_ranges, metric, eta=3):
+        if eta < 2:
+            raise ValueError("Halving factor must be at least 2")
+        if not candidates:
+            raise ValueError("No candidates to optimize")
+        if not date_ranges:
+            raise ValueError("No periods to optimize over")
+        self.id = uuid.uuid4().hex[:12]
+        self.candidates = list(candidates)
+        self.metric = metric
+        self.eta = eta
+        self.windows = halving_windows(date_ranges, rung_count(len(self.candidates), len(date_ranges), eta), eta)
+        self.status = 'queued'
+        self.error = None
+        self.rungs = []
+        self.terminal_seconds = 0.0
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+
+    def _score(self, result):
+        value = result.get('metrics', {}).get(self.metric) if result.get('success') else None
+        return value if isinstance(value, (int, float)) else None
+
+    def _rank(self, scored):
+        """Sort (index, score) pairs best first; failed runs go last"""
+        lower_is_better = self.metric in LOWER_IS_BETTER
+
+        def key(item):
+            score = item[1]
+            if score is None:
+                return (1, 0)
+            return (0, score if lower_is_better else -score)
+
+        return sorted(scored, key=key)
+
+    def run(self, evaluate, workers=1):
+        """Run all rungs. evaluate(index, params, from_date, to_date) returns a backtest result"""
+        self.status = 'running'
+        survivors = list(range(len(self.candidates)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for rung, (from_date, to_date) in enumerate(self.windows):
+                    rung_info = {
+                        'rung': rung, 'from_date': from_date, 'to_date': to_date,
+                        'evaluated': len(survivors), 'completed': 0, 'seconds': 0.0, 'promoted': None,
+                    }
+                    with self._lock:
+                        self.rungs.append(rung_info)
+
+                    futures = {
+                        executor.submit(self._timed_evaluate, evaluate, index, from_date, to_date): index
+                        for index in survivors
+                    }
+                    scored = []
+                    for future in as_completed(futures):
+                        result, seconds = future.result()
+                        scored.append((futures[future], self._score(result)))
+                        with self._lock:
+                            rung_info['completed'] += 1
+                            rung_info['seconds'] += seconds
+                            self.terminal_seconds += seconds
+
+                    ranked = self._rank(scored)
+                    last_rung = rung == len(self.windows) - 1
+                    keep = len(ranked) if last_rung else max(1, math.ceil(len(ranked) / self.eta))
+                    survivors = [index for index, _ in ranked[:keep]]
+                    with self._lock:
+                        rung_info['promoted'] = len(survivors) if not last_rung else 0
+                        rung_info['leaders'] = [
+                            {'index': index, 'params': self.candidates[index], 'score': score}
+                            for index, score in ranked[:10]
+                        ]
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+            raise
+        self.status = 'done'
+
+    def _timed_evaluate(self, evaluate, index, from_date, to_date):
+        try:
+            result = evaluate(index, self.candidates[index], from_date, to_date)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        # The run's own duration leaves out waiting for a slot or worker; cache hits never launched the terminal
+        seconds = 0.0 if result.get('cached') else result.get('duration') or 0.0
+        return result, seconds
+
+    def savings(self):
+        """Terminal time used versus an exhaustive run of every candidate over the full span.
+
+        The cost of one full-span run is estimated from the final rung, which always
+        covers the full span.
+        """
+        with self._lock:
+            final = self.rungs[-1] if len(self.rungs) == len(self.windows) else None
+            if not final or not final['completed']:
+                return None
+            full_run_seconds = final['seconds'] / final['completed']
+            exhaustive = full_run_seconds * len(self.candidates)
+            return {
+                'terminal_hours': round(self.terminal_seconds / 3600, 4),
+                'exhaustive_terminal_hours': round(exhaustive / 3600, 4),
+                'saved_terminal_hours': round(max(exhaustive - self.terminal_seconds, 0) / 3600, 4),
+            }
+
+    def to_dict(self):
+        with self._lock:
+            rungs = [dict(rung) for rung in self.rungs]
+        return {
+            'optimization_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'metric': self.metric,
+            'eta': self.eta,
+            'candidates': len(self.candidates),
+            'windows': self.windows,
+            'rungs': rungs,
+            'terminal_hours': round(self.terminal_seconds / 3600, 4),
+            'savings': self.savings() if self.status == 'done' else None,
+            'created_at': self.created_at,
+        }
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from report_parser import format_money
+
+
+def _period_bounds(start_date, end_date):
+    """Datetimes covering the whole days of an inclusive YYYY.MM.DD date range"""
+    start = datetime.strptime(start_date, "%Y.%m.%d")
+    end = datetime.strptime(end_date, "%Y.%m.%d") + timedelta(days=1)
+    return start, end
+
+
+def slice_deals(deals, date_ranges):
+    """Per-period results computed from one backtest's deal sequence.
+
+    Each (period_name, start_date, end_date) gets the net profit of the deals
+    closed inside it and the maximal balance drawdown within it, measured from
+    the balance carried in at the start of the period. Unlike separate runs the
+    account is continuous, so a trade spanning a boundary counts in the period
+    in which it closes.
+
+    Returns results shaped like run_single_backtest's, plus period_name,
+    start_date and end_date.
+    """
+    deals = sorted(deals, key=lambda d: d['time'])
+    results = []
+    position = 0
+    balance = None
+
+    for period_name, start_date, end_date in date_ranges:
+        start, end = _period_bounds(start_date, end_date)
+
+        # Balance carried into the period from the deals before it
+        while position < len(deals) and deals[position]['time'] < start:
+            balance = deals[position]['balance']
+            position += 1
+
+        net_profit = 0.0
+        trades = wins = 0
+        peak = balance
+        max_drawdown = 0.0
+        max_drawdown_percent = 0.0
+        while position < len(deals) and deals[position]['time'] < end:
+            deal = deals[position]
+            position += 1
+            if deal.get('type') == 'balance':
+                # Deposits and withdrawals move the balance but are not profit
+                balance = deal['balance']
+                peak = balance if peak is None else max(peak, balance)
+                continue
+
+            result = deal['profit'] + deal['commission'] + deal['swap']
+            net_profit += result
+            if deal.get('direction') in ('out', 'in/out', 'out by'):
+                trades += 1
+                wins += result > 0
+
+            balance = deal['balance']
+            peak = balance if peak is None else max(peak, balance)
+            if peak - balance > max_drawdown:
+                max_drawdown = peak - balance
+                max_drawdown_percent = max_drawdown / peak * 100 if peak else 0.0
+
+        results.append({
+            'success': True,
+            'profit': format_money(net_profit),
+            'drawdown': f"{format_money(max_drawdown)} ({max_drawdown_percent:.2f}%)",
+            'metrics': {
+                'total_net_profit': round(net_profit, 2),
+                'balance_drawdown_maximal': round(max_drawdown, 2),
+                'balance_drawdown_maximal_percent': round(max_drawdown_percent, 2),
+                'total_trades': trades,
+                'profit_trades': wins,
+                'loss_trades': trades - wins,
+            },
+            'sliced': True,
+            'period': f"{start_date} to {end_date}",
+            'period_name': period_name,
+            'start_date': start_date,
+            'end_date': end_date,
+        })
+    return results
@@ -0,0 +1,123 @@
+import os
+import re
+
+# Fields of a progress line: tester time, balance and equity
+FIELD_SEPARATOR = re.compile(r'[,;\t]')
+LIMITS = ('max_drawdown_percent', 'max_loss')
+
+
+def abort_limits(overrides=None, defaults=None):
+    """Effective abort limits: overrides (e.g. from a sweep request) over defaults, unset ones dropped.
+
+    Raises ValueError for unknown names or values that are not positive numbers.
+    """
+    if overrides is not None and not isinstance(overrides, dict):
+        raise ValueError("abort limits must be an object such as {\"max_drawdown_percent\": 30}")
+    limits = dict(defaults or {})
+    for name, value in (overrides or {}).items():
+        if name not in LIMITS:
+            raise ValueError(f"Unknown abort limit {name}; expected {', '.join(LIMITS)}")
+        limits[name] = value
+    limits = {name: float(value) for name, value in limits.items() if value not in (None, '')}
+    for name, value in limits.items():
+        if value <= 0:
+            raise ValueError(f"{name} must be positive")
+    return limits
+
+
+class ProgressMonitor:
+    """Follow the balance and equity an EA appends to a progress file while the tester runs.
+
+    Each line is 'time,balance,equity' (commas, semicolons or tabs). check()
+    reads only what was appended since the previous call and returns why the
+    run should be stopped once the equity drawdown from its peak reaches
+    max_drawdown_percent, or the loss from the deposit reaches max_loss.
+    """
+
+    def __init__(self, path, deposit, max_drawdown_percent=None, max_loss=None):
+        self.path = path
+        self.deposit = float(deposit)
+        self.max_drawdown_percent = max_drawdown_percent
+        self.max_loss = max_loss
+        self.breach = None
+        self.time = None
+        self.lines = 0
+        self.balance = self.equity = self.deposit
+        self._peak_balance = self._peak_equity = self.deposit
+        self.balance_drawdown = self.equity_drawdown = 0.0
+        self.balance_drawdown_percent = self.equity_drawdown_percent = 0.0
+        self._offset = 0
+        self._partial = b''
+
+    def check(self):
+        """Read new progress lines; returns the breached limit as text, or None"""
+        if self.breach:
+            return self.breach
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            # The EA has not written anything yet
+            return None
+        self._offset += len(data)
+        lines = (self._partial + data).split(b'\n')
+        # The last piece is an unfinished line (or empty); keep it for the next read
+        self._partial = lines.pop()
+        for line in lines:
+            # Tolerate files written as UTF-16 (FileOpen without FILE_ANSI): NUL bytes and the BOM are dropped
+            fields = FIELD_SEPARATOR.split(line.replace(b'\x00', b'').decode('ascii', 'ignore').strip())
+            try:
+                time_text, balance, equity = fields[0], float(fields[1]), float(fields[2])
+            except (IndexError, ValueError):
+                continue
+            self._update(time_text, balance, equity)
+            self.breach = self._crossed_limit()
+            if self.breach:
+                break
+        return self.breach
+
+    def _update(self, time_text, balance, equity):
+        self.time = time_text
+        self.lines += 1
+        self.balance = balance
+        self.equity = equity
+        self._peak_balance = max(self._peak_balance, balance)
+        self._peak_equity = max(self._peak_equity, equity)
+        balance_drawdown = self._peak_balance - balance
+        equity_drawdown = self._peak_equity - equity
+        if balance_drawdown > self.balance_drawdown:
+            self.balance_drawdown = balance_drawdown
+            self.balance_drawdown_percent = balance_drawdown / self._peak_balance * 100
+        if equity_drawdown > self.equity_drawdown:
+            self.equity_drawdown = equity_drawdown
+            self.equity_drawdown_percent = equity_drawdown / self._peak_equity * 100
+
+    def _crossed_limit(self):
+        if self.max_drawdown_percent is not None and self.equity_drawdown_percent >= self.max_drawdown_percent:
+            return (f"equity drawdown {self.equity_drawdown_percent:.2f}% reached the "
+                    f"{self.max_drawdown_percent:g}% limit at {self.time}")
+        loss = self.deposit - self.equity
+        if self.max_loss is not None and loss >= self.max_loss:
+            return f"loss of {loss:.2f} reached the {self.max_loss:g} limit at {self.time}"
+        return None
+
+    def metrics(self):
+        """Metrics as far as the run got, named like the report's"""
+        return {
+            'total_net_profit': round(self.balance - self.deposit, 2),
+            'balance_drawdown_maximal': round(self.balance_drawdown, 2),
+            'balance_drawdown_maximal_percent': round(self.balance_drawdown_percent, 2),
+            'equity_drawdown_maximal': round(self.equity_drawdown, 2),
+            'equity_drawdown_maximal_percent': round(self.equity_drawdown_percent, 2),
+            'balance': self.balance,
+            'equity': self.equity,
+            'progress_time': self.time,
+        }
+
+    def remove(self):
+        """Delete the progress file once the run is over"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,161 @@
+import errno
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux FICLONE ioctl: share the source file's extents copy-on-write (btrfs, XFS)
+FICLONE = 0x40049409
+
+# Template directories every worker uses in place through a symlink (tick and bar history)
+SHARED_DIRS = ('Bases',)
+# Directories the terminal writes per instance; created empty in each worker
+PRIVATE_DIRS = ('logs', 'Tester', os.path.join('MQL5', 'Logs'), os.path.join('MQL5', 'Files'))
+# Files the terminal rewrites in place, so each worker gets a real copy
+COPIED_FILES = (os.path.join('config', '*'), os.path.join('MQL5', 'Profiles', '*'), '*.ini')
+# Per-run files left in a worker's data directory by earlier jobs
+RUN_FILE_PATTERNS = ('*.ini', '*.htm', '*.html', '*.png')
+
+MARKER = '.provisioned'
+
+# Cleared after the first failed reflink so unsupported filesystems go straight to hardlinks
+_reflink_supported = fcntl is not None
+
+
+def clone_file(source, target):
+    """Reflink source to target, else hardlink it, else copy it. Returns the method used."""
+    global _reflink_supported
+    if _reflink_supported:
+        try:
+            with open(source, 'rb') as src, open(target, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return 'reflink'
+        except OSError:
+            _reflink_supported = False
+            os.remove(target)
+    try:
+        os.link(source, target)
+        return 'hardlink'
+    except OSError:
+        shutil.copy2(source, target)
+        return 'copy'
+
+
+def link_dir(source, target):
+    """Symlink target to the directory source, hardlinking its files where symlinks are not allowed"""
+    try:
+        os.symlink(source, target, target_is_directory=True)
+        return
+    except OSError as e:
+        # Creating symlinks on Windows needs developer mode or admin rights
+        if e.errno not in (errno.EPERM, errno.EACCES) and getattr(e, 'winerror', None) != 1314:
+            raise
+    for dirpath, _, filenames in os.walk(source):
+        destination = os.path.join(target, os.path.relpath(dirpath, source))
+        os.makedirs(destination, exist_ok=True)
+        for filename in filenames:
+            clone_file(os.path.join(dirpath, filename), os.path.join(destination, filename))
+
+
+def template_signature(template_dir):
+    """Cheap fingerprint of a template: its path plus the size and mtime of every file outside SHARED_DIRS"""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(template_dir):
+        relative = os.path.relpath(dirpath, template_dir)
+        dirnames[:] = sorted(d for d in dirnames if os.path.normpath(os.path.join(relative, d)) not in SHARED_DIRS)
+        for filename in sorted(filenames):
+            stat = os.stat(os.path.join(dirpath, filename))
+            entries.append([os.path.join(relative, filename), stat.st_size, stat.st_mtime_ns])
+    digest = hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()
+    return {'template': os.path.abspath(template_dir), 'files': len(entries), 'digest': digest}
+
+
+def build_worker(template_dir, worker_dir):
+    """Create a worker data directory from template_dir without copying its bulk.
+
+    Shared history is symlinked, files the terminal rewrites are copied, and
+    everything else (executables, compiled EAs, includes) is reflinked or
+    hardlinked. Returns counts of files per method.
+    """
+    counts = {'reflink': 0, 'hardlink': 0, 'copy': 0, 'shared_dirs': 0}
+    template_dir = os.path.abspath(template_dir)
+    os.makedirs(worker_dir)
+    for dirpath, dirnames, filenames in os.walk(template_dir):
+        relative = os.path.relpath(dirpath, template_dir)
+        destination = os.path.normpath(os.path.join(worker_dir, relative))
+        os.makedirs(destination, exist_ok=True)
+
+        for dirname in list(dirnames):
+            relative_dir = os.path.normpath(os.path.join(relative, dirname))
+            if relative_dir in SHARED_DIRS:
+                link_dir(os.path.join(dirpath, dirname), os.path.join(destination, dirname))
+                counts['shared_dirs'] += 1
+                dirnames.remove(dirname)
+            elif relative_dir in PRIVATE_DIRS:
+                os.makedirs(os.path.join(destination, dirname), exist_ok=True)
+                dirnames.remove(dirname)
+
+        for filename in filenames:
+            relative_file = os.path.normpath(os.path.join(relative, filename))
+            source = os.path.join(dirpath, filename)
+            target = os.path.join(destination, filename)
+            if any(fnmatch.fnmatch(relative_file, pattern) for pattern in COPIED_FILES):
+                shutil.copy2(source, target)
+                counts['copy'] += 1
+            else:
+                counts[clone_file(source, target)] += 1
+    return counts
+
+
+def reset_worker(worker_dir):
+    """Delete per-run .ini and report files left in a worker's data directory"""
+    for filename in os.listdir(worker_dir):
+        path = os.path.join(worker_dir, filename)
+        if os.path.isfile(path) and any(fnmatch.fnmatch(filename, pattern) for pattern in RUN_FILE_PATTERNS):
+            os.remove(path)
+
+
+def provision_worker(template_dir, worker_dir, signature=None):
+    """Reuse worker_dir if it was built from the unchanged template (resetting its run files), else rebuild it"""
+    signature = signature or template_signature(template_dir)
+    marker = os.path.join(worker_dir, MARKER)
+    current = None
+    if os.path.exists(marker):
+        with open(marker, encoding='utf-8') as f:
+            current = json.load(f)
+    if current == signature:
+        reset_worker(worker_dir)
+        return worker_dir
+    if os.path.exists(worker_dir):
+        shutil.rmtree(worker_dir)
+    counts = build_worker(template_dir, worker_dir)
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(signature, f)
+    print(f"Provisioned worker {worker_dir}: {counts}")
+    return worker_dir
+
+
+def provision_workers(template_dir, workers_dir, count):
+    """Make sure workers_dir holds count worker directories (w0, w1, ...) built from template_dir.
+
+    Directories built from the same unchanged template are reused and only reset;
+    stale ones are rebuilt. Returns the worker directory paths.
+    """
+    signature = template_signature(template_dir)
+    os.makedirs(workers_dir, exist_ok=True)
+    return [provision_worker(template_dir, os.path.join(workers_dir, f"w{index}"), signature)
+            for index in range(count)]
+
+
+def add_worker(template_dir, workers_dir):
+    """Build one more worker directory after the existing w0, w1, ... and return its path"""
+    index = 0
+    while os.path.exists(os.path.join(workers_dir, f"w{index}")):
+        index += 1
+    return provision_worker(template_dir, os.path.join(workers_dir, f"w{index}"))
@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+CHUNK_SIZE = 1 << 20
+ARCHIVE_SUFFIX = '.htm.gz'
+
+
+class ReportArchive:
+    """Content-addressed store of gzip-compressed tester reports.
+
+    A report is filed under the SHA-256 of its original bytes, so identical
+    reports are kept once and later runs never overwrite earlier ones. An
+    SQLite index tracks sizes and use; once the compressed total exceeds
+    max_bytes the least recently used reports are deleted, and reports older
+    than max_age seconds are deleted regardless. The compressed total is kept
+    as a running sum beside the index, so checking the policy after each add
+    does not scan every report.
+    """
+
+    def __init__(self, root, max_bytes=5 * 1024 ** 3, max_age=90 * 24 * 3600, compresslevel=6):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reports (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_last_used ON reports (last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), stored_size INTEGER NOT NULL)"
+        )
+        # Archives indexed before the running total existed start from their current sum
+        self._conn.execute(
+            "INSERT OR IGNORE INTO totals (id, stored_size) SELECT 0, COALESCE(SUM(stored_size), 0) FROM reports"
+        )
+        self._conn.commit()
+
+    def path(self, digest):
+        """Where the compressed report for digest is (or would be) stored"""
+        return os.path.join(self.root, digest[:2], digest + ARCHIVE_SUFFIX)
+
+    def add(self, source, remove_source=True):
+        """Compress source into the archive and return its digest.
+
+        The file is hashed and compressed in one streaming pass; when the same
+        content is already archived the new copy is discarded.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with open(source, 'rb') as src, os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.compresslevel, mtime=0) as dst:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+            target = self.path(digest)
+            now = time.time()
+            with self._lock:
+                # Other processes (e.g. ingest.py workers) may add the same report; the lookup and
+                # the running total update happen in one write transaction
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    known = self._conn.execute(
+                        "SELECT stored_size FROM reports WHERE digest = ?", (digest,)
+                    ).fetchone()
+                    if known and os.path.exists(target):
+                        os.remove(temp_path)
+                        self._conn.execute("UPDATE reports SET last_used = ? WHERE digest = ?", (now, digest))
+                    else:
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        os.replace(temp_path, target)
+                        stored_size = os.path.getsize(target)
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO reports (digest, size, stored_size, created_at, last_used) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (digest, size, stored_size, now, now)
+                        )
+                        self._add_to_total(stored_size - (known[0] if known else 0))
+                    self._conn.commit()
+                except BaseException:
+                    self._conn.rollback()
+                    raise
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if remove_source:
+            os.remove(source)
+        self.prune()
+        return digest
+
+    def get(self, digest):
+        """Path of the archived report for digest, or None if it was never stored or has expired"""
+        path = self.path(digest)
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE reports SET last_used = ? WHERE digest = ?", (time.time(), digest)
+            ).rowcount
+            self._conn.commit()
+        return path if updated and os.path.exists(path) else None
+
+    def open(self, digest):
+        """Binary file object streaming the decompressed report, or None"""
+        path = self.get(digest)
+        return gzip.open(path, 'rb') if path else None
+
+    def _add_to_total(self, delta):
+        self._conn.execute("UPDATE totals SET stored_size = stored_size + ? WHERE id = 0", (delta,))
+
+    def prune(self):
+        """Apply the retention policy; returns the number of reports deleted"""
+        with self._lock:
+            cutoff = time.time() - self.max_age
+            expired = {}
+            for digest, stored_size in self._conn.execute(
+                    "SELECT digest, stored_size FROM reports WHERE created_at < ?", (cutoff,)):
+                expired[digest] = stored_size
+            total = self._conn.execute("SELECT stored_size FROM totals WHERE id = 0").fetchone()[0]
+            total -= sum(expired.values())
+            if total > self.max_bytes:
+                for digest, stored_size in self._conn.execute(
+                        "SELECT digest, stored_size FROM reports ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    if digest not in expired:
+                        expired[digest] = stored_size
+                        total -= stored_size
+            for digest, stored_size in expired.items():
+                if self._conn.execute("DELETE FROM reports WHERE digest = ?", (digest,)).rowcount:
+                    self._add_to_total(-stored_size)
+                try:
+                    os.remove(self.path(digest))
+                except FileNotFoundError:
+                    pass
+            self._conn.commit()
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            count, size, stored_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM reports"
+            ).fetchone()
+        return {'reports': count, 'bytes': size, 'stored_bytes': stored_size,
+                'max_bytes': self.max_bytes, 'max_age': self.max_age}
+
@@ -0,0 +1,218 @@
+import gzip
+import html
+import re
+from datetime import datetime
+
+# The summary ends where the orders/deals tables begin; nothing past this is read
+SUMMARY_END_PATTERN = re.compile(r'<b>\s*(?:Orders|Deals)\s*</b>', re.IGNORECASE)
+FIELD_PATTERN = re.compile(
+    r'<td[^>]*>\s*([^<>]+?)\s*:\s*</td>\s*<td[^>]*>\s*(?:<b>)?\s*([^<]*)',
+    re.IGNORECASE
+)
+NUMBER_PATTERN = re.compile(r'(-?[\d ]*\d(?:\.\d+)?)\s*(%?)')
+DEALS_START_PATTERN = re.compile(r'<b>\s*Deals\s*</b>', re.IGNORECASE)
+ROW_PATTERN = re.compile(r'<tr[^>]*>(.*?)</tr>|</table>', re.IGNORECASE | re.DOTALL)
+CELL_PATTERN = re.compile(r'<td[^>]*>(.*?)</td>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+# 'H1 (2025.01.02 - 2025.04.24)' in the Period row of the settings
+PERIOD_PATTERN = re.compile(r'(\w+)\s*\((\d{4}\.\d{2}\.\d{2})\s*-\s*(\d{4}\.\d{2}\.\d{2})\)')
+# EA inputs are listed one 'Name=value' cell per row under Inputs:
+INPUT_PATTERN = re.compile(r'<td[^>]*>\s*(?:<b>)?\s*([A-Za-z_]\w*)=([^<]*?)\s*(?:</b>)?\s*</td>', re.IGNORECASE)
+CHUNK_SIZE = 64 * 1024
+DEAL_TIME_FORMAT = "%Y.%m.%d %H:%M:%S"
+
+
+def open_report(path, encoding=None):
+    """Open a report, decompressing archived (.gz) ones on the fly; binary unless encoding is given"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt' if encoding else 'rb', encoding=encoding, errors='replace' if encoding else None)
+    if encoding:
+        return open(path, encoding=encoding, errors='replace')
+    return open(path, 'rb')
+
+
+def detect_encoding(path):
+    """Encoding of a tester report: UTF-16 when it has a BOM (the terminal default), else UTF-8"""
+    with open_report(path) as f:
+        bom = f.read(3)
+    if bom[:2] in (b'\xff\xfe', b'\xfe\xff'):
+        return 'utf-16'
+    if bom == b'\xef\xbb\xbf':
+        return 'utf-8-sig'
+    return 'utf-8'
+
+
+def read_summary_html(path, encoding=None):
+    """Read the report only up to the end of its summary section"""
+    encoding = encoding or detect_encoding(path)
+    text = ''
+    with open_report(path, encoding) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return text
+            # Re-check a little of the previous chunk in case the marker straddles two reads
+            search_from = max(0, len(text) - 32)
+            text += chunk
+            match = SUMMARY_END_PATTERN.search(text, search_from)
+            if match:
+                return text[:match.start()]
+
+
+def metric_key(label):
+    """'Profit Trades (% of total)' -> 'profit_trades'"""
+    label = re.sub(r'\([^)]*\)', '', label)
+    return re.sub(r'[^0-9a-z]+', '_', label.lower()).strip('_')
+
+
+def parse_number(text):
+    """Parse a report number such as '-1 234.56' into an int or float"""
+    text = text.replace(' ', '')
+    return float(text) if '.' in text else int(text)
+
+
+def parse_metric_value(key, text):
+    """Typed values for one summary cell.
+
+    '1 234.56 (2.34%)' yields {key: 1234.56, key_percent: 2.34} and
+    '2.34% (1 234.56)' yields {key: 2.34, key_amount: 1234.56}. Cells that are
+    not numeric are kept as text.
+    """
+    numbers = NUMBER_PATTERN.findall(text)
+    stripped = NUMBER_PATTERN.sub('', text).strip(' ()%')
+    if not numbers or stripped:
+        return {key: text}
+
+    values = {key: parse_number(numbers[0][0])}
+    if len(numbers) > 1:
+        suffix = '_percent' if numbers[1][1] else '_amount'
+        values[key + suffix] = parse_number(numbers[1][0])
+    return values
+
+
+def read_report_summary(path, encoding=None):
+    """Extract the summary section of a tester report without parsing the deal tables.
+
+    Returns (fields, metrics): fields maps each label as shown in the report
+    (without the trailing colon) to its raw text, metrics maps snake_case keys
+    to typed numbers, e.g. metrics['profit_factor'] or metrics['total_trades'].
+    """
+    fields = {}
+    metrics = {}
+    for label, value in FIELD_PATTERN.findall(read_summary_html(path, encoding)):
+        label = html.unescape(label).strip()
+        value = html.unescape(value).replace('\xa0', ' ').strip()
+        if label in fields:
+            continue
+        fields[label] = value
+        if value:
+            metrics.update(parse_metric_value(metric_key(label), value))
+    return fields, metrics
+
+
+def read_report_settings(path, encoding=None):
+    """Tester settings recorded above a report's results.
+
+    Returns the parameters in the shape run_single_backtest takes them (expert,
+    symbol, period, deposit and an 'inputs' dict) plus from_date and to_date;
+    settings the report does not show are left out.
+    """
+    text = read_summary_html(path, encoding)
+    fields = {}
+    for label, value in FIELD_PATTERN.findall(text):
+        fields.setdefault(html.unescape(label).strip(), html.unescape(value).replace('\xa0', ' ').strip())
+
+    settings = {}
+    for key in ('expert', 'symbol'):
+        if fields.get(key.title()):
+            settings[key] = fields[key.title()]
+    match = PERIOD_PATTERN.match(fields.get('Period', ''))
+    if match:
+        settings['period'], settings['from_date'], settings['to_date'] = match.groups()
+    deposit = NUMBER_PATTERN.match(fields.get('Initial Deposit', ''))
+    if deposit:
+        settings['deposit'] = int(parse_number(deposit.group(1)))
+    settings['inputs'] = {name: html.unescape(value).strip() for name, value in INPUT_PATTERN.findall(text)}
+    return settings
+
+
+def format_money(value):
+    """Format a number the way tester reports do: '-1 234.56'"""
+    return f"{value:,.2f}".replace(',', ' ')
+
+
+def _cell_text(cell):
+    if '<' in cell:
+        cell = TAG_PATTERN.sub('', cell)
+    if '&' in cell:
+        cell = html.unescape(cell)
+    return cell.replace('\xa0', ' ').strip()
+
+
+def _parse_deal_time(text):
+    """'2025.01.02 13:45:00' as a datetime; slicing is several times faster than strptime"""
+    if len(text) == 19 and text[4] == '.' and text[7] == '.' and text[10] == ' ':
+        return datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                        int(text[11:13]), int(text[14:16]), int(text[17:19]))
+    return datetime.strptime(text, DEAL_TIME_FORMAT)
+
+
+def _parse_deal(columns, cells):
+    """Typed deal from one table row, or None for header/total rows"""
+    if len(cells) != len(columns):
+        return None
+    deal = dict(zip(columns, (_cell_text(cell) for cell in cells)))
+    try:
+        deal['time'] = _parse_deal_time(deal['time'])
+    except (KeyError, ValueError):
+        return None
+    for name in ('volume', 'price', 'commission', 'swap', 'profit', 'balance'):
+        value = deal.get(name, '').replace(' ', '')
+        try:
+            deal[name] = float(value) if value else 0.0
+        except ValueError:
+            deal[name] = 0.0
+    return deal
+
+
+def iter_report_deals(path, encoding=None):
+    """Yield each row of the report's Deals table as a dict, streaming the file.
+
+    Keys are the lowercased column headers (time, deal, symbol, type, direction,
+    volume, price, order, commission, swap, profit, balance, comment); time is
+    a datetime and the money columns are floats.
+    """
+    encoding = encoding or detect_encoding(path)
+    columns = None
+    in_deals = False
+    buffer = ''
+    with open_report(path, encoding) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer += chunk
+
+            if not in_deals:
+                match = DEALS_START_PATTERN.search(buffer)
+                if not match:
+                    buffer = buffer[-32:]
+                    continue
+                in_deals = True
+                buffer = buffer[match.end():]
+
+            consumed = 0
+            for match in ROW_PATTERN.finditer(buffer):
+                consumed = match.end()
+                if match.group(1) is None:
+                    # End of the deals table
+                    return
+                cells = CELL_PATTERN.findall(match.group(1))
+                if columns is None:
+                    if cells:
+                        columns = [_cell_text(cell).lower() for cell in cells]
+                    continue
+                deal = _parse_deal(columns, cells)
+                if deal:
+                    yield deal
+            buffer = buffer[consumed:]
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+try:
+    # watchdog uses inotify on Linux and ReadDirectoryChangesW on Windows
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# ready: report is complete; reason: 'complete', 'exited', 'timeout' or 'aborted' (by the monitor);
+# exit_code: terminal exit code if it had exited when waiting stopped
+ReportStatus = namedtuple('ReportStatus', ['ready', 'reason', 'exit_code'])
+
+CLOSING_TAG = '</html>'
+TAIL_BYTES = 64
+
+
+def report_is_complete(path):
+    """True once the report exists and ends with its closing </html> tag"""
+    try:
+        with open(path, 'rb') as f:
+            bom = f.read(2)
+            size = f.seek(0, os.SEEK_END)
+            utf16 = bom in (b'\xff\xfe', b'\xfe\xff')
+            start = max(size - TAIL_BYTES, 2 if utf16 else 0)
+            if utf16:
+                # Keep the tail aligned to whole UTF-16 code units
+                start -= start % 2
+            f.seek(start)
+            tail = f.read()
+    except OSError:
+        return False
+
+    if bom == b'\xff\xfe':
+        text = tail.decode('utf-16-le', errors='ignore')
+    elif bom == b'\xfe\xff':
+        text = tail.decode('utf-16-be', errors='ignore')
+    else:
+        text = tail.decode('utf-8', errors='ignore')
+    return text.rstrip().lower().endswith(CLOSING_TAG)
+
+
+class _ReportChangeHandler(FileSystemEventHandler):
+    """Set an event whenever the watched report is created, written or moved into place"""
+
+    def __init__(self, path, changed):
+        super().__init__()
+        self.path = os.path.normcase(os.path.abspath(path))
+        self.changed = changed
+
+    def on_any_event(self, event):
+        paths = [event.src_path, getattr(event, 'dest_path', '')]
+        if any(p and os.path.normcase(os.path.abspath(p)) == self.path for p in paths):
+            self.changed.set()
+
+
+def _start_observer(path, changed):
+    """Watch the report's directory, or return None to fall back to polling"""
+    directory = os.path.dirname(os.path.abspath(path))
+    if Observer is None or not os.path.isdir(directory):
+        return None
+    try:
+        observer = Observer()
+        observer.schedule(_ReportChangeHandler(path, changed), directory, recursive=False)
+        observer.start()
+        return observer
+    except OSError:
+        return None
+
+
+def wait_for_report(path, process=None, timeout=60, poll_interval=0.05, process_check_interval=0.25,
+                    monitor=None):
+    """Wait until the report at path is complete, the terminal exits, or timeout expires.
+
+    Filesystem notifications wake the wait as soon as the report changes; without
+    them the file is polled every poll_interval seconds. Only the last few bytes of
+    the report are read on each check. A monitor (ProgressMonitor) is checked as
+    often, and the wait ends as 'aborted' once it reports a crossed limit.
+    """
+    changed = threading.Event()
+    observer = _start_observer(path, changed)
+    interval = process_check_interval if observer else poll_interval
+    deadline = time.monotonic() + timeout
+
+    try:
+        while True:
+            if report_is_complete(path):
+                return ReportStatus(True, 'complete', process.poll() if process else None)
+
+            exit_code = process.poll() if process else None
+            if exit_code is not None:
+                # The report may have been finalized just before the terminal exited
+                if report_is_complete(path):
+                    return ReportStatus(True, 'complete', exit_code)
+                return ReportStatus(False, 'exited', exit_code)
+
+            if monitor is not None and monitor.check():
+                return ReportStatus(False, 'aborted', None)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ReportStatus(False, 'timeout', None)
+            changed.wait(min(interval, remaining))
+            changed.clear()
+    finally:
+        if observer:
+            observer.stop()
+            observer.join()
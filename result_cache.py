@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+_file_hashes = {}
+
+
+def file_hash(path):
+    """SHA-256 of a file, memoized on its size and mtime"""
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    _file_hashes[path] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+class BacktestCache:
+    """Persistent backtest result cache keyed on the EA binary and tester settings.
+
+    Entries live in SQLite and are evicted least-recently-used once there are more
+    than max_entries, or when older than max_age seconds. Concurrent requests for
+    the same key share a single in-flight run.
+    """
+
+    def __init__(self, db_path, max_entries=10000, max_age=30 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._conn.commit()
+
+    def make_key(self, expert_path, params):
+        """Cache key for an EA binary plus normalized tester parameters.
+
+        Returns None when the compiled EA cannot be read, since the result
+        could not then be tied to a specific build.
+        """
+        try:
+            expert_hash = file_hash(expert_path)
+        except OSError:
+            return None
+        normalized = json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True)
+        return hashlib.sha256(f"{expert_hash}:{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached result for key, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_or_run(self, key, run):
+        """Return the cached result for key, or call run() once and cache a successful result.
+
+        Results served from the cache, or shared with an identical run already in
+        progress, are marked with 'cached': True.
+        """
+        result = self.get(key)
+        if result is not None:
+            result['cached'] = True
+            return result
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if not owner:
+            result = dict(future.result())
+            result['cached'] = True
+            return result
+
+        try:
+            result = run()
+            if result.get('success'):
+                self.put(key, result)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        result['cached'] = False
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.max_age,))
+        self._conn.execute(
+            """DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,)
+        )
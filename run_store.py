@@ -0,0 +1,228 @@
+import json
+import sqlite3
+import threading
+import time
+
+# Metrics promoted to indexed columns: column name -> metrics key
+METRIC_COLUMNS = {
+    'profit': 'total_net_profit',
+    'drawdown': 'balance_drawdown_maximal',
+    'drawdown_percent': 'balance_drawdown_maximal_percent',
+    'profit_factor': 'profit_factor',
+    'recovery_factor': 'recovery_factor',
+    'expected_payoff': 'expected_payoff',
+    'total_trades': 'total_trades',
+}
+SORT_COLUMNS = {'id', 'created_at', 'from_date', 'to_date', 'duration', *METRIC_COLUMNS}
+
+# Query parameter -> SQL condition on an indexed column
+FILTERS = {
+    'expert': 'expert = ?',
+    'ea_hash': 'ea_hash = ?',
+    'report_hash': 'report_hash = ?',
+    'symbol': 'symbol = ?',
+    'timeframe': 'timeframe = ?',
+    'period_name': 'period_name = ?',
+    'job_id': 'job_id = ?',
+    'sweep_id': 'sweep_id = ?',
+    'success': 'success = ?',
+    'outcome': 'outcome = ?',
+    'cached': 'cached = ?',
+    'from_date': 'from_date >= ?',
+    'to_date': 'to_date <= ?',
+    'min_profit': 'profit >= ?',
+    'max_profit': 'profit <= ?',
+    'max_drawdown': 'drawdown <= ?',
+    'min_profit_factor': 'profit_factor >= ?',
+    'created_after': 'created_at >= ?',
+    'created_before': 'created_at <= ?',
+}
+# Fields of the general settings; everything else in a run's parameters is an EA input
+GENERAL_PARAMS = ('expert', 'symbol', 'period', 'deposit')
+
+
+class RunStore:
+    """Indexed SQLite history of every backtest run"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        metric_columns = ''.join(f"{column} REAL,\n" for column in METRIC_COLUMNS)
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                ea_hash TEXT,
+                expert TEXT,
+                symbol TEXT,
+                timeframe TEXT,
+                deposit REAL,
+                period_name TEXT,
+                from_date TEXT,
+                to_date TEXT,
+                job_id TEXT,
+                sweep_id INTEGER,
+                success INTEGER NOT NULL,
+                outcome TEXT,
+                cached INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                {metric_columns}
+                started_at REAL,
+                duration REAL,
+                timings TEXT,
+                report_path TEXT,
+                report_hash TEXT,
+                inputs TEXT NOT NULL,
+                metrics TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+            CREATE INDEX IF NOT EXISTS runs_ea ON runs (ea_hash, created_at);
+            CREATE INDEX IF NOT EXISTS runs_symbol ON runs (symbol, timeframe, created_at);
+            CREATE INDEX IF NOT EXISTS runs_job ON runs (job_id);
+            CREATE INDEX IF NOT EXISTS runs_sweep ON runs (sweep_id);
+            CREATE INDEX IF NOT EXISTS runs_profit ON runs (profit);
+            CREATE INDEX IF NOT EXISTS runs_drawdown ON runs (drawdown);
+            CREATE INDEX IF NOT EXISTS runs_profit_factor ON runs (profit_factor);
+            CREATE TABLE IF NOT EXISTS ingested_reports (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                run_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS ingested_digest ON ingested_reports (digest);
+            """
+        )
+        # Histories created before reports were archived (or runs aborted or timed) lack the newer columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        for column in ('report_hash', 'outcome', 'timings'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_report ON runs (report_hash)")
+        self._conn.commit()
+
+    def add_run(self, result, from_date, to_date, params, ea_hash=None, period_name=None,
+                job_id=None, sweep_id=None, commit=True):
+        """Persist one backtest result; returns its run id (commit=False leaves committing to the caller)"""
+        metrics = result.get('metrics', {})
+        row = {
+            'created_at': time.time(),
+            'ea_hash': ea_hash,
+            'expert': params.get('expert'),
+            'symbol': params.get('symbol'),
+            'timeframe': params.get('period'),
+            'deposit': params.get('deposit'),
+            'period_name': period_name,
+            'from_date': from_date,
+            'to_date': to_date,
+            'job_id': job_id,
+            'sweep_id': sweep_id,
+            'success': 1 if result.get('success') else 0,
+            'outcome': result.get('outcome'),
+            'cached': 1 if result.get('cached') else 0,
+            'error': result.get('error'),
+            'started_at': result.get('started_at'),
+            'duration': result.get('duration'),
+            'timings': json.dumps(result['timings']) if result.get('timings') else None,
+            'report_path': result.get('report_path'),
+            'report_hash': result.get('report_hash'),
+            'inputs': json.dumps({k: v for k, v in params.items() if k not in GENERAL_PARAMS}),
+            'metrics': json.dumps(metrics),
+        }
+        for column, key in METRIC_COLUMNS.items():
+            # Partial metrics of aborted runs stay in the metrics JSON, out of the ranking columns
+            value = metrics.get(key) if result.get('success') else None
+            row[column] = value if isinstance(value, (int, float)) else None
+
+        columns = ', '.join(row)
+        placeholders = ', '.join('?' for _ in row)
+        with self._lock:
+            cursor = self._conn.execute(f"INSERT INTO runs ({columns}) VALUES ({placeholders})", list(row.values()))
+            if commit:
+                self._conn.commit()
+        return cursor.lastrowid
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def ingested_reports(self):
+        """Report files already ingested: path -> (mtime, size, digest, run_id)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, mtime, size, digest, run_id FROM ingested_reports").fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def mark_ingested(self, path, mtime, size, digest, run_id=None, commit=True):
+        """Remember a report file so unchanged files are skipped next time"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingested_reports (path, mtime, size, digest, run_id) VALUES (?, ?, ?, ?, ?)",
+                (path, mtime, size, digest, run_id)
+            )
+            if commit:
+                self._conn.commit()
+
+    def get_run(self, run_id):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,))
+            row = cursor.fetchone()
+            return self._to_dict(cursor, row) if row else None
+
+    def recent_durations(self, limit=1000):
+        """Settings and durations of the latest successful terminal runs, oldest first"""
+        with self._lock:
+            cursor = self._conn.execute(
+                """SELECT expert, symbol, timeframe, from_date, to_date, duration FROM runs
+                   WHERE success = 1 AND cached = 0 AND duration IS NOT NULL
+                   ORDER BY id DESC LIMIT ?""",
+                (limit,)
+            )
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return rows[::-1]
+
+    def query(self, filters=None, inputs=None, sort='-created_at', limit=50, offset=0):
+        """One page of runs matching filters, plus the total match count.
+
+        filters maps FILTERS keys to values, inputs maps EA input names to values,
+        and sort is a SORT_COLUMNS name, prefixed with '-' for descending order.
+        """
+        conditions = []
+        args = []
+        for name, value in (filters or {}).items():
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+            conditions.append(FILTERS[name])
+            args.append(value)
+        for name, value in (inputs or {}).items():
+            # Inputs arrive from forms as strings and from JSON as numbers; compare as text
+            conditions.append("CAST(json_extract(inputs, ?) AS TEXT) = ?")
+            args.extend([f'$."{name}"', str(value)])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        descending = sort.startswith('-')
+        column = sort.lstrip('-')
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {column}")
+        # NULL metrics (failed runs) always sort last; id breaks ties for stable paging
+        order = f"{column} IS NULL, {column} {'DESC' if descending else 'ASC'}, id {'DESC' if descending else 'ASC'}"
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM runs {where}", args).fetchone()[0]
+            cursor = self._conn.execute(
+                f"SELECT * FROM runs {where} ORDER BY {order} LIMIT ? OFFSET ?", args + [limit, offset]
+            )
+            runs = [self._to_dict(cursor, row) for row in cursor.fetchall()]
+        return {'total': total, 'limit': limit, 'offset': offset, 'runs': runs}
+
+    def _to_dict(self, cursor, row):
+        run = dict(zip((column[0] for column in cursor.description), row))
+        run['inputs'] = json.loads(run['inputs'])
+        run['metrics'] = json.loads(run['metrics'])
+        run['timings'] = json.loads(run['timings']) if run['timings'] else None
+        run['success'] = bool(run['success'])
+        run['cached'] = bool(run['cached'])
+        return run
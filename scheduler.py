@@ -0,0 +1,164 @@
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from metrics import SCHEDULER_WAIT_SECONDS
+
+# Lower value wins: interactive form submissions go ahead of API batches, sweeps and optimizations
+PRIORITIES = {'interactive': 0, 'batch': 1}
+# Recent terminal time per user is halved every USAGE_HALF_LIFE seconds
+USAGE_HALF_LIFE = 600.0
+RECENT_WAITS = 200
+
+
+class Ticket:
+    """Who a terminal run is for: the submitting user, its priority class and a label for the queue view"""
+
+    def __init__(self, user='anonymous', priority='batch', label=None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        self.user = user or 'anonymous'
+        self.priority = priority
+        self.label = label
+
+    def __repr__(self):
+        return f"Ticket({self.user!r}, {self.priority!r}, {self.label!r})"
+
+
+class _Waiter:
+    def __init__(self, ticket, seq):
+        self.ticket = ticket
+        self.seq = seq
+        self.since = time.time()
+        self.granted = False
+
+
+class BacktestScheduler:
+    """Hands out terminal slots one backtest at a time, by priority class and then fair share.
+
+    Every terminal run asks for a slot, so a job gives its slot up at each period
+    boundary and a waiting interactive run takes the next free one even while a
+    long sweep is in progress. Within a class the slot goes to the user with the
+    fewest running backtests, then the least recent terminal time, then the
+    longest wait. capacity is a number or a callable (e.g. the worker pool size),
+    and reserved slots are kept free of batch work.
+    """
+
+    def __init__(self, capacity=1, reserved=0):
+        self._capacity = capacity
+        self.reserved = reserved
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._running = {}
+        self._usage = {}
+        self._seq = itertools.count()
+        self._waits = {priority: deque(maxlen=RECENT_WAITS) for priority in PRIORITIES}
+
+    @property
+    def capacity(self):
+        capacity = self._capacity() if callable(self._capacity) else self._capacity
+        return max(int(capacity), 0)
+
+    def running_count(self):
+        with self._condition:
+            return sum(len(tickets) for tickets in self._running.values())
+
+    def waiting_count(self):
+        with self._condition:
+            return len(self._waiters)
+
+    @contextmanager
+    def slot(self, ticket=None):
+        """Hold a terminal slot for the duration of the block"""
+        ticket = ticket or Ticket()
+        self._acquire(ticket)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(ticket, time.monotonic() - start)
+
+    def _acquire(self, ticket):
+        with self._condition:
+            waiter = _Waiter(ticket, next(self._seq))
+            self._waiters.append(waiter)
+            self._grant()
+            while not waiter.granted:
+                # Capacity can grow without a release (workers or agents joining), so re-check periodically
+                self._condition.wait(timeout=1)
+                self._grant()
+            wait = time.time() - waiter.since
+            self._waits[ticket.priority].append(wait)
+        SCHEDULER_WAIT_SECONDS.observe(wait, ticket.priority)
+
+    def _release(self, ticket, seconds):
+        with self._condition:
+            self._running[ticket.user].remove(ticket)
+            if not self._running[ticket.user]:
+                del self._running[ticket.user]
+            now = time.monotonic()
+            self._usage[ticket.user] = (self._usage_of(ticket.user, now) + seconds, now)
+            self._grant()
+            self._condition.notify_all()
+
+    def _grant(self):
+        """Give free slots to the best waiters (caller holds the condition)"""
+        granted = False
+        while self._waiters:
+            running = sum(len(tickets) for tickets in self._running.values())
+            free = self.capacity - running
+            if free <= 0:
+                break
+            candidates = self._waiters if free > self.reserved else [
+                w for w in self._waiters if w.ticket.priority == 'interactive']
+            if not candidates:
+                break
+            waiter = min(candidates, key=self._rank)
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self._running.setdefault(waiter.ticket.user, []).append(waiter.ticket)
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def _rank(self, waiter):
+        user = waiter.ticket.user
+        return (PRIORITIES[waiter.ticket.priority], len(self._running.get(user, ())),
+                self._usage_of(user, time.monotonic()), waiter.seq)
+
+    def _usage_of(self, user, now):
+        """User's terminal seconds, decayed so old usage stops counting against them"""
+        usage, updated = self._usage.get(user, (0.0, now))
+        return usage * 0.5 ** ((now - updated) / USAGE_HALF_LIFE)
+
+    def status(self):
+        """Queue depth per class and user, running backtests and recent waits, for the UI"""
+        now = time.time()
+        with self._condition:
+            waiting = [
+                {'user': w.ticket.user, 'priority': w.ticket.priority, 'label': w.ticket.label,
+                 'waiting': round(now - w.since, 1)}
+                for w in sorted(self._waiters, key=self._rank)
+            ]
+            running = [
+                {'user': t.user, 'priority': t.priority, 'label': t.label}
+                for tickets in self._running.values() for t in tickets
+            ]
+            waits = {priority: sorted(values) for priority, values in self._waits.items()}
+            capacity = self.capacity
+        return {
+            'capacity': capacity,
+            'reserved': self.reserved,
+            'running': running,
+            'waiting': waiting,
+            'recent_wait': {
+                priority: {
+                    'count': len(values),
+                    'p50': round(values[len(values) // 2], 2) if values else None,
+                    'max': round(values[-1], 2) if values else None,
+                }
+                for priority, values in waits.items()
+            },
+        }
@@ -0,0 +1,319 @@
+import hashlib
+import itertools
+import json
+import math
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from input_schema import INTEGER_BOUNDS
+
+# Metrics where a smaller value ranks higher
+LOWER_IS_BETTER = {
+    'balance_drawdown_absolute', 'balance_drawdown_maximal', 'balance_drawdown_maximal_percent',
+    'balance_drawdown_relative', 'equity_drawdown_absolute', 'equity_drawdown_maximal',
+    'equity_drawdown_maximal_percent', 'equity_drawdown_relative', 'loss_trades',
+}
+INSERT_BATCH_SIZE = 1000
+
+
+def sweep_values(input_var, spec, coerce):
+    """Expand one input's sweep spec into the list of values written to the .ini.
+
+    spec is one of:
+        {'values': [...]}             explicit list (enum names are mapped to numbers)
+        {'range': [start, stop, step]} inclusive numeric range
+        {'all': True}                 every enum value, or both values of a bool
+
+    Every value goes through coerce, the input's InputSchema coercer, so it
+    is checked against the input's type, enum members and bounds. Raises
+    ValueError for a malformed spec or an invalid value.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("sweep spec must be an object with 'values', 'range' or 'all'")
+
+    if 'values' in spec:
+        if not isinstance(spec['values'], list):
+            raise ValueError("'values' must be a list")
+        return [coerce(value) for value in spec['values']]
+
+    if 'range' in spec:
+        mql_type = input_var.get('mql_type', '').lower()
+        if input_var.get('is_enum') or not (mql_type in INTEGER_BOUNDS or mql_type in ('double', 'float')):
+            raise ValueError(f"'range' only applies to numeric inputs, not {mql_type}")
+        bounds = spec['range']
+        if (not isinstance(bounds, list) or len(bounds) != 3
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bounds)):
+            raise ValueError("'range' must be [start, stop, step] numbers")
+        start, stop, step = bounds
+        if step <= 0:
+            raise ValueError("range step must be positive")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        if all(isinstance(v, int) for v in (start, stop, step)):
+            return [coerce(start + i * step) for i in range(count)]
+        return [coerce(round(start + i * step, 10)) for i in range(count)]
+
+    if spec.get('all'):
+        if input_var.get('is_enum') and input_var.get('enum_values'):
+            return list(input_var['enum_values'].values())
+        if input_var.get('mql_type', '').lower() == 'bool':
+            return [0, 1]
+        raise ValueError("'all' only applies to enum and bool inputs")
+
+    raise ValueError("sweep spec needs 'values', 'range' or 'all'")
+
+
+class SweepSpace:
+    """The configurations of a sweep, generated lazily from per-input value lists"""
+
+    def __init__(self, axes):
+        # axes: list of (input name, list of values)
+        self.names = [name for name, _ in axes]
+        self.values = [values for _, values in axes]
+
+    @classmethod
+    def from_spec(cls, schema, sweep_spec):
+        """(space, errors) for a sweep spec mapping input names of an InputSchema to value specs.
+
+        errors is a list of {'field', 'error'} dicts that is empty when every spec is valid.
+        """
+        if not isinstance(sweep_spec, dict):
+            return cls([]), [{'field': 'sweep', 'error': 'expected an object mapping input names to specs'}]
+        axes = []
+        errors = []
+        for name, spec in sweep_spec.items():
+            field = f"sweep.{name}"
+            if name not in schema.inputs:
+                errors.append({'field': field, 'error': 'unknown input'})
+                continue
+            try:
+                values = sweep_values(schema.inputs[name], spec, schema.coercers[name])
+            except (ValueError, TypeError) as e:
+                errors.append({'field': field, 'error': str(e)})
+                continue
+            if not values:
+                errors.append({'field': field, 'error': 'sweep produces no values'})
+                continue
+            axes.append((name, values))
+        return cls(axes), errors
+
+    @property
+    def size(self):
+        return math.prod(len(values) for values in self.values)
+
+    def config_at(self, index):
+        """Configuration number index of the Cartesian product (mixed-radix decoding)"""
+        config = {}
+        for name, values in zip(reversed(self.names), reversed(self.values)):
+            index, position = divmod(index, len(values))
+            config[name] = values[position]
+        return {name: config[name] for name in self.names}
+
+    def grid(self):
+        for combination in itertools.product(*self.values):
+            yield dict(zip(self.names, combination))
+
+    def sample(self, count, seed=None):
+        """count distinct random configurations, without building the full grid"""
+        indices = random.Random(seed).sample(range(self.size), min(count, self.size))
+        for index in indices:
+            yield self.config_at(index)
+
+
+def config_status(result):
+    """'done', 'aborted' (stopped by the abort limits, never rerun) or 'failed' (rerun on resume)"""
+    if result.get('success'):
+        return 'done'
+    return 'aborted' if result.get('outcome') == 'aborted' else 'failed'
+
+
+def config_key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class SweepStore:
+    """SQLite store of sweeps and their configurations, so a sweep never lives in memory"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sweeps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                settings TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS configs (
+                sweep_id INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                config_key TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                metric_value REAL,
+                result TEXT,
+                PRIMARY KEY (sweep_id, idx),
+                UNIQUE (sweep_id, config_key)
+            );
+            CREATE INDEX IF NOT EXISTS configs_status ON configs (sweep_id, status, idx);
+            CREATE INDEX IF NOT EXISTS configs_metric ON configs (sweep_id, metric_value);
+            """
+        )
+        self._conn.commit()
+
+    def create_sweep(self, settings, metric, configs):
+        """Store a sweep and its configurations, inserting them in batches as they are generated"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO sweeps (settings, metric, status, created_at) VALUES (?, ?, 'pending', ?)",
+                (json.dumps(settings), metric, time.time())
+            )
+            sweep_id = cursor.lastrowid
+            numbered = enumerate(configs)
+            while True:
+                batch = [
+                    (sweep_id, idx, config_key(params), json.dumps(params))
+                    for idx, params in itertools.islice(numbered, INSERT_BATCH_SIZE)
+                ]
+                if not batch:
+                    break
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO configs (sweep_id, idx, config_key, params) VALUES (?, ?, ?, ?)", batch
+                )
+            self._conn.commit()
+        return sweep_id
+
+    def get_sweep(self, sweep_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, settings, metric, status, created_at FROM sweeps WHERE id = ?", (sweep_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM configs WHERE sweep_id = ? GROUP BY status", (sweep_id,)
+            ).fetchall())
+        return {
+            'sweep_id': row[0],
+            'settings': json.loads(row[1]),
+            'metric': row[2],
+            'status': row[3],
+            'created_at': row[4],
+            'total': sum(counts.values()),
+            'counts': counts,
+        }
+
+    def set_status(self, sweep_id, status):
+        with self._lock:
+            self._conn.execute("UPDATE sweeps SET status = ? WHERE id = ?", (status, sweep_id))
+            self._conn.commit()
+
+    def reset_interrupted(self, sweep_id):
+        """Queue configurations that failed or were running when the process stopped; aborted ones stay stopped"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE configs SET status = 'pending' WHERE sweep_id = ? AND status IN ('running', 'failed')",
+                (sweep_id,)
+            )
+            self._conn.commit()
+
+    def claim_pending(self, sweep_id, limit):
+        """Mark up to limit pending configurations as running and return (idx, params) pairs"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, params FROM configs WHERE sweep_id = ? AND status = 'pending' ORDER BY idx LIMIT ?",
+                (sweep_id, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE configs SET status = 'running' WHERE sweep_id = ? AND idx = ?",
+                [(sweep_id, idx) for idx, _ in rows]
+            )
+            self._conn.commit()
+        return [(idx, json.loads(params)) for idx, params in rows]
+
+    def record_result(self, sweep_id, idx, result, metric):
+        value = result.get('metrics', {}).get(metric) if result.get('success') else None
+        if not isinstance(value, (int, float)):
+            value = None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE configs SET status = ?, metric_value = ?, result = ? WHERE sweep_id = ? AND idx = ?",
+                (config_status(result), value, json.dumps(result), sweep_id, idx)
+            )
+            self._conn.commit()
+
+    def columns(self, sweep_id, metric, params):
+        """(metric values, {param: values}) of every completed configuration, read column-wise in SQL.
+
+        metric is read from the stored result's metrics, so any metric can be
+        aggregated, not only the one the sweep ranks by. Failed runs give None.
+        """
+        selects = ["json_extract(result, ?)"] + ["json_extract(params, ?)" for _ in params]
+        args = [f'$.metrics."{metric}"'] + [f'$."{param}"' for param in params]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(selects)} FROM configs WHERE sweep_id = ? AND status = 'done'",
+                args + [sweep_id]
+            ).fetchall()
+        if not rows:
+            return [], {param: [] for param in params}
+        columns = list(zip(*rows))
+        return list(columns[0]), {param: list(values) for param, values in zip(params, columns[1:])}
+
+    def swept_params(self, sweep_id):
+        """Names of the inputs a sweep varies"""
+        with self._lock:
+            row = self._conn.execute("SELECT params FROM configs WHERE sweep_id = ? LIMIT 1", (sweep_id,)).fetchone()
+        return list(json.loads(row[0])) if row else []
+
+    def top(self, sweep_id, metric, limit=20, offset=0):
+        """Completed configurations ranked by the sweep metric"""
+        order = 'ASC' if metric in LOWER_IS_BETTER else 'DESC'
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT idx, params, metric_value, result FROM configs
+                    WHERE sweep_id = ? AND status = 'done' AND metric_value IS NOT NULL
+                    ORDER BY metric_value {order} LIMIT ? OFFSET ?""",
+                (sweep_id, limit, offset)
+            ).fetchall()
+        return [
+            {'index': idx, 'params': json.loads(params), 'metric_value': value, 'result': json.loads(result)}
+            for idx, params, value, result in rows
+        ]
+
+
+def run_sweep(store, sweep_id, run_config, workers=1, batch_size=100):
+    """Run every pending configuration of a sweep; completed ones are never rerun.
+
+    run_config(idx, params) runs one backtest and returns its result. Configurations
+    are claimed from the store a batch at a time, so memory stays flat however
+    large the sweep is, and a stopped sweep resumes where it left off.
+    """
+    sweep = store.get_sweep(sweep_id)
+    metric = sweep['metric']
+    store.reset_interrupted(sweep_id)
+    store.set_status(sweep_id, 'running')
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = store.claim_pending(sweep_id, batch_size)
+                if not batch:
+                    break
+                futures = {executor.submit(run_config, idx, params): idx for idx, params in batch}
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': str(e)}
+                    store.record_result(sweep_id, idx, result, metric)
+    except Exception:
+        store.set_status(sweep_id, 'failed')
+        raise
+    store.set_status(sweep_id, 'done')
@@ -0,0 +1,75 @@
+import threading
+from datetime import datetime
+
+# Prior seconds per tested day by timeframe, used until runs of that kind have been seen;
+# lower timeframes carry more bars per day through the tester
+PRIOR_SECONDS_PER_DAY = {'M1': 2.0, 'M5': 1.0, 'M15': 0.75, 'M30': 0.6, 'H1': 0.5, 'H4': 0.4, 'D1': 0.3}
+DEFAULT_SECONDS_PER_DAY = 0.5
+
+
+def tested_days(from_date, to_date):
+    """Calendar days covered by a YYYY.MM.DD date range (at least one)"""
+    try:
+        start = datetime.strptime(from_date, "%Y.%m.%d")
+        end = datetime.strptime(to_date, "%Y.%m.%d")
+    except (TypeError, ValueError):
+        return 1
+    return max((end - start).days + 1, 1)
+
+
+class DurationModel:
+    """Expected backtest duration learned from completed runs.
+
+    A run is modelled as a fixed start-up cost plus a per-day rate. Rates are kept
+    as a moving average per (expert, symbol, timeframe), with the timeframe alone
+    and then PRIOR_SECONDS_PER_DAY as fallbacks for combinations not yet seen.
+    """
+
+    def __init__(self, startup_seconds=10.0, smoothing=0.3):
+        self.startup_seconds = startup_seconds
+        self.smoothing = smoothing
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def observe(self, expert, symbol, timeframe, days, seconds):
+        """Fold a successful run's duration into the rates"""
+        rate = max(seconds - self.startup_seconds, 0) / max(days, 1)
+        with self._lock:
+            for key in ((expert, symbol, timeframe), (None, None, timeframe)):
+                previous = self._rates.get(key)
+                self._rates[key] = rate if previous is None else previous + self.smoothing * (rate - previous)
+
+    def rate(self, expert, symbol, timeframe):
+        with self._lock:
+            for key in ((expert, symbol, timeframe), (None, None, timeframe)):
+                if key in self._rates:
+                    return self._rates[key]
+        return PRIOR_SECONDS_PER_DAY.get(timeframe, DEFAULT_SECONDS_PER_DAY)
+
+    def expected(self, expert, symbol, timeframe, days):
+        """Expected wall-clock seconds for a run over days"""
+        return self.startup_seconds + self.rate(expert, symbol, timeframe) * days
+
+
+class TimeoutPolicy:
+    """Per-run timeouts as a multiple of the expected duration, and retry backoff"""
+
+    def __init__(self, model, multiple=3.0, min_timeout=30.0, max_timeout=6 * 3600,
+                 max_retries=2, retry_backoff=5.0):
+        self.model = model
+        self.multiple = multiple
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def timeout(self, expert, symbol, timeframe, from_date, to_date):
+        expected = self.model.expected(expert, symbol, timeframe, tested_days(from_date, to_date))
+        return min(max(expected * self.multiple, self.min_timeout), self.max_timeout)
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number attempt (1-based), doubling each time"""
+        return self.retry_backoff * 2 ** (attempt - 1)
+
+    def observe(self, expert, symbol, timeframe, from_date, to_date, seconds):
+        self.model.observe(expert, symbol, timeframe, tested_days(from_date, to_date), seconds)
@@ -0,0 +1,131 @@
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+
+class TerminalWorker:
+    """One portable terminal instance with its own data directory"""
+
+    def __init__(self, worker_id, terminal_path, data_dir=None):
+        self.worker_id = worker_id
+        self.terminal_path = terminal_path
+        # A portable terminal keeps its data next to the executable
+        self.data_dir = data_dir or os.path.dirname(os.path.abspath(terminal_path))
+
+    def ini_path(self, report_name):
+        """Per-job .ini path inside this worker's data directory"""
+        return os.path.join(self.data_dir, f"{os.path.splitext(report_name)[0]}.ini")
+
+    def __repr__(self):
+        return f"TerminalWorker({self.worker_id!r}, {self.terminal_path!r})"
+
+
+def discover_workers(workers_dir, terminal_exe="terminal64.exe"):
+    """Find portable terminal installs in the sub-directories of workers_dir"""
+    workers = []
+    for name in sorted(os.listdir(workers_dir)):
+        terminal_path = os.path.join(workers_dir, name, terminal_exe)
+        if os.path.isfile(terminal_path):
+            workers.append(TerminalWorker(name, terminal_path))
+    return workers
+
+
+class BacktestWorkerPool:
+    """Fan backtest periods out across several terminal instances.
+
+    Each job runs on whichever worker is idle, writing its own .ini and report
+    inside that worker's data directory, so no two concurrent runs share files.
+    With a scheduler, runs first wait for a slot from it, so concurrent jobs
+    take workers in priority order rather than first come, first served.
+    With run_cached, results are looked up before any of that, so a cache hit
+    never waits behind terminals that are busy.
+    """
+
+    def __init__(self, workers, run_backtest, scheduler=None, run_cached=None):
+        if not workers:
+            raise ValueError("Worker pool needs at least one terminal worker")
+        self.workers = list(workers)
+        self.run_backtest = run_backtest
+        self.scheduler = scheduler
+        self.run_cached = run_cached
+        self._idle = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+
+    @property
+    def size(self):
+        return len(self.workers)
+
+    def add_worker(self, worker):
+        """Make another terminal available; jobs already running keep their concurrency"""
+        self.workers.append(worker)
+        self._idle.put(worker)
+
+    @property
+    def busy(self):
+        """Workers currently running a backtest"""
+        return self.size - self._idle.qsize()
+
+    def run_periods(self, date_ranges, base_report, on_result=None, ticket=None, **common_params):
+        """Run every (period_name, start_date, end_date) and return results in period order.
+
+        on_result(index, result) is called as each period completes, in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [
+                executor.submit(self._run_period, index, period_name, start_date, end_date,
+                                base_report, common_params, on_result, ticket)
+                for index, (period_name, start_date, end_date) in enumerate(date_ranges)
+            ]
+            return [future.result() for future in futures]
+
+    def run_single(self, report_name, from_date, to_date, run_backtest=None, ticket=None, **params):
+        """Run one backtest on the next idle worker (once the scheduler grants ticket a slot).
+
+        Without an explicit run_backtest the result cache is consulted first;
+        passing one bypasses the cache.
+        """
+        if run_backtest is None and self.run_cached:
+            return self.run_cached(report_name, from_date, to_date, ticket=ticket, launch=self._launch, **params)
+        return self._launch(report_name, from_date, to_date, run_backtest=run_backtest, ticket=ticket, **params)
+
+    def _launch(self, report_name, from_date, to_date, run_backtest=None, ticket=None, **params):
+        run_backtest = run_backtest or self.run_backtest
+        with self.scheduler.slot(ticket) if self.scheduler else nullcontext():
+            return self._run_on_worker(report_name, from_date, to_date, run_backtest, params)
+
+    def _run_on_worker(self, report_name, from_date, to_date, run_backtest, params):
+        worker = self._idle.get()
+        try:
+            result = run_backtest(
+                report_name=report_name,
+                from_date=from_date,
+                to_date=to_date,
+                terminal_path=worker.terminal_path,
+                data_dir=worker.data_dir,
+                ini_path=worker.ini_path(report_name),
+                portable=True,
+                **params
+            )
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': f'Worker {worker.worker_id} failed: {str(e)}',
+                'period': f"{from_date} to {to_date}"
+            }
+        finally:
+            self._idle.put(worker)
+        result['worker'] = worker.worker_id
+        return result
+
+    def _run_period(self, index, period_name, start_date, end_date, base_report, common_params, on_result,
+                    ticket=None):
+        report_name = f"{base_report.split('.')[0]}_{period_name}.htm"
+        result = self.run_single(report_name, start_date, end_date, ticket=ticket, **common_params)
+        result['period_name'] = period_name
+        result['start_date'] = start_date
+        result['end_date'] = end_date
+        if on_result:
+            on_result(index, result)
+        return result